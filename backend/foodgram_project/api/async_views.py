@@ -0,0 +1,86 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from .views import IngredientViewSet, RecipeViewSet, TagViewSet
+
+READ_METHODS = ("GET", "HEAD")
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_READ_WORKERS,
+                thread_name_prefix="async-read",
+            )
+        return _executor
+
+
+def respond(view, request, *args, **kwargs):
+    """Выполняет синхронное представление в потоке пула и рендерит ответ.
+
+    Потоки пула живут дольше запроса, поэтому соединения с базой
+    закрываются здесь так же, как обработчики request_started и
+    request_finished делают это для обычных запросов.
+    """
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_read_view(viewset, actions):
+    """Асинхронное представление для чтения поверх ViewSet.
+
+    В Django 3.2 нет асинхронного ORM, а синхронные представления под ASGI
+    выполняются по очереди в одном общем потоке. Поэтому чтение уходит в
+    отдельный пул из ASYNC_READ_WORKERS потоков и идёт параллельно, а
+    остальные методы выполняет обычное синхронное представление.
+    """
+    read = viewset.as_view(
+        {method: action for method, action in actions.items()
+         if method == "get"}
+    )
+    write = sync_to_async(viewset.as_view(actions))
+
+    async def view(request, *args, **kwargs):
+        if request.method not in READ_METHODS:
+            return await write(request, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(
+            get_executor(), partial(respond, read, request, *args, **kwargs)
+        )
+
+    view.csrf_exempt = True
+    return view
+
+
+tag_list = async_read_view(TagViewSet, {"get": "list"})
+tag_detail = async_read_view(TagViewSet, {"get": "retrieve"})
+ingredient_list = async_read_view(IngredientViewSet, {"get": "list"})
+ingredient_detail = async_read_view(IngredientViewSet, {"get": "retrieve"})
+recipe_list = async_read_view(
+    RecipeViewSet, {"get": "list", "post": "create"}
+)
+recipe_detail = async_read_view(
+    RecipeViewSet,
+    {
+        "get": "retrieve",
+        "put": "update",
+        "patch": "partial_update",
+        "delete": "destroy",
+    },
+)
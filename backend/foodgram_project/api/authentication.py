@@ -0,0 +1,151 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from users.models import User
+
+from .cache import TOKENS
+
+
+class LocalCache:
+    """Ограниченный LRU-кэш в памяти процесса, записи живут timeout
+    секунд."""
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, values = entry
+            if expires <= monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return values
+
+    def set(self, key, values):
+        with self.lock:
+            self.entries[key] = (monotonic() + self.timeout, values)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class TokenCache:
+    """Кэш «токен → поля пользователя».
+
+    Первый уровень — LRU в памяти процесса с коротким TTL, второй —
+    общий кэш Django, если включён TOKEN_CACHE_SHARED. Хранятся значения
+    полей, а не объект: на каждый запрос собирается новый экземпляр
+    User. Счётчики и хэш пароля не кэшируются и при обращении читаются
+    из базы.
+
+    Записи сбрасываются по ключу токена. Общий кэш и память текущего
+    процесса очищаются сразу, а другие процессы могут видеть старую
+    запись ещё TOKEN_CACHE_LOCAL_TIMEOUT секунд.
+    """
+
+    uncached_fields = (*User.counter_fields, "password")
+
+    def __init__(self, timeout, local_size, local_timeout):
+        self.timeout = timeout
+        self.local = LocalCache(local_size, local_timeout)
+
+    @property
+    def enabled(self):
+        return settings.TOKEN_CACHE_ENABLED
+
+    @property
+    def shared(self):
+        return settings.TOKEN_CACHE_SHARED
+
+    @staticmethod
+    def make_key(key):
+        return f"{TOKENS}:{key}"
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        values = self.local.get(key)
+        if values is None and self.shared:
+            values = cache.get(self.make_key(key))
+            if values is not None:
+                self.local.set(key, values)
+        if values is None:
+            return None
+        names = [
+            field.attname
+            for field in User._meta.concrete_fields
+            if field.attname in values
+        ]
+        return User.from_db(
+            DEFAULT_DB_ALIAS, names, [values[name] for name in names]
+        )
+
+    def set(self, key, user):
+        if not self.enabled:
+            return
+        values = {
+            field.attname: getattr(user, field.attname)
+            for field in User._meta.concrete_fields
+            if field.name not in self.uncached_fields
+        }
+        self.local.set(key, values)
+        if self.shared:
+            cache.set(self.make_key(key), values, self.timeout)
+
+    def forget(self, *keys):
+        """Сбрасывает записи только в памяти процесса."""
+        self.local.delete_many(keys)
+
+    def invalidate(self, *keys):
+        self.forget(*keys)
+        cache.delete_many([self.make_key(key) for key in keys])
+
+
+token_cache = TokenCache(
+    settings.TOKEN_CACHE_TIMEOUT,
+    settings.TOKEN_CACHE_LOCAL_SIZE,
+    settings.TOKEN_CACHE_LOCAL_TIMEOUT,
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication, который не ходит в базу за известным токеном."""
+
+    def authenticate_credentials(self, key):
+        user = token_cache.get(key)
+        if user is None:
+            try:
+                token = Token.objects.select_related("user").get(key=key)
+            except Token.DoesNotExist:
+                raise AuthenticationFailed(_("Invalid token."))
+            user = token.user
+            if user.is_active:
+                token_cache.set(key, user)
+        if not user.is_active:
+            raise AuthenticationFailed(_("User inactive or deleted."))
+        return user, Token(key=key, user_id=user.pk)
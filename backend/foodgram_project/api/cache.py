@@ -0,0 +1,96 @@
+from hashlib import md5
+from time import time_ns
+
+from django.core.cache import cache
+from django.utils.http import parse_etags, parse_http_date_safe
+
+TAGS = "tags"
+INGREDIENTS = "ingredients"
+RECIPES = "recipes"
+SCORES = "scores"
+TOKENS = "tokens"
+
+
+def recipe_namespace(pk):
+    return f"recipe-{pk}"
+
+
+def viewer_namespace(user_id):
+    return f"viewer-{user_id}"
+
+
+def version_key(namespace):
+    return f"{namespace}:version"
+
+
+def get_version(namespace):
+    key = version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time_ns() // 1000, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(*namespaces):
+    keys = [version_key(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    return ".".join(
+        str(found[key]) if key in found else str(get_version(namespace))
+        for key, namespace in zip(keys, namespaces)
+    )
+
+
+def bump_version(namespace):
+    key = version_key(namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, time_ns() // 1000, timeout=None)
+        return cache.get(key)
+
+
+def make_etag(namespace, version, renderer_format=None):
+    if renderer_format is None:
+        return f'"{namespace}-{version}"'
+    return f'"{namespace}-{version}-{renderer_format}"'
+
+
+def etag_matches(request, etag):
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return "*" in etags or etag in etags
+
+
+def matches_any(request):
+    """If-None-Match: * — совпадает с любым существующим объектом."""
+    return "*" in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+
+
+def not_modified(request, etag, last_modified=None):
+    """Проверяет условия запроса; If-None-Match важнее If-Modified-Since."""
+    if request.META.get("HTTP_IF_NONE_MATCH"):
+        return etag_matches(request, etag)
+    if last_modified is None:
+        return False
+    since = parse_http_date_safe(
+        request.META.get("HTTP_IF_MODIFIED_SINCE", "")
+    )
+    return since is not None and int(last_modified.timestamp()) <= since
+
+
+def response_key(namespace, version, request, view_name="", params=None):
+    query = "&".join(
+        f"{key}={value}"
+        for key in sorted(request.query_params)
+        if params is None or key in params
+        for value in sorted(request.query_params.getlist(key))
+    )
+    digest = md5(
+        f"{view_name}:{request.get_host()}{request.path}?{query}".encode(
+            "utf-8"
+        )
+    ).hexdigest()
+    return f"{namespace}:{version}:{digest}"
@@ -0,0 +1,54 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Subscription, User
+
+COUNTERS = {
+    Favorite: ("recipe_id", Recipe, "favorites_count"),
+    ShoppingCart: ("recipe_id", Recipe, "shopping_cart_count"),
+    Recipe: ("author_id", User, "recipes_count"),
+    Subscription: ("user_id", User, "subscribers_count"),
+}
+
+
+def change_counter(instance, delta):
+    """Сдвигает счётчик родителя одним UPDATE с F(), без чтения строки."""
+    column, model, field = COUNTERS[type(instance)]
+    queryset = model.objects.filter(pk=getattr(instance, column))
+    if delta < 0:
+        queryset = queryset.filter(**{f"{field}__gt": 0})
+    queryset.update(**{field: F(field) + delta})
+
+
+def actual_count(child, column):
+    return Coalesce(
+        Subquery(
+            child.objects.filter(**{column: OuterRef("pk")})
+            .order_by()
+            .values(column)
+            .annotate(total=Count("pk"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def repair_counters(dry_run=False):
+    """Пересчитывает счётчики, которые разошлись с данными.
+
+    Возвращает число исправленных строк по каждому счётчику.
+    """
+    drift = {}
+    for child, (column, model, field) in COUNTERS.items():
+        broken = model.objects.annotate(
+            actual=actual_count(child, column)
+        ).exclude(**{field: F("actual")})
+        pks = list(broken.values_list("pk", flat=True))
+        if pks and not dry_run:
+            model.objects.filter(pk__in=pks).update(
+                **{field: actual_count(child, column)}
+            )
+        drift[f"{model.__name__}.{field}"] = len(pks)
+    return drift
@@ -0,0 +1,131 @@
+from itertools import islice
+
+from django.conf import settings
+
+from recipes.models import FeedEntry, Recipe
+from users.models import Subscription, User
+
+BATCH_SIZE = 1000
+
+
+def subscribers_count(author_id):
+    subscribers = (
+        User.objects.filter(pk=author_id)
+        .values_list("subscribers_count", flat=True)
+        .first()
+    )
+    return subscribers or 0
+
+
+def is_pulled(author_id):
+    """Рецепты авторов с огромным числом подписчиков не раскладываются по
+    лентам при записи, а подтягиваются при чтении."""
+    return subscribers_count(author_id) > settings.FEED_FANOUT_LIMIT
+
+
+def create_entries(rows):
+    rows = iter(rows)
+    batch = list(islice(rows, BATCH_SIZE))
+    while batch:
+        FeedEntry.objects.bulk_create(
+            (
+                FeedEntry(user_id=user, recipe_id=recipe, author_id=author)
+                for user, recipe, author in batch
+            ),
+            ignore_conflicts=True,
+        )
+        batch = list(islice(rows, BATCH_SIZE))
+
+
+def push_author(author_id):
+    """Раскладывает все рецепты автора по лентам всех его подписчиков."""
+    create_entries(
+        Subscription.objects.filter(
+            user=author_id, user__recipes__isnull=False
+        )
+        .values_list("subscriber_id", "user__recipes__id", "user_id")
+        .iterator()
+    )
+
+
+def fan_out(recipe):
+    if is_pulled(recipe.author_id):
+        return
+    create_entries(
+        (subscriber, recipe.pk, recipe.author_id)
+        for subscriber in Subscription.objects.filter(
+            user=recipe.author_id
+        ).values_list("subscriber_id", flat=True).iterator()
+    )
+
+
+def backfill(subscription):
+    """Вызывается после того, как счётчик подписчиков уже увеличен.
+
+    Если эта подписка перевела автора за FEED_FANOUT_LIMIT, его рецепты
+    убираются из всех лент: дальше они подтягиваются при чтении.
+    """
+    subscribers = subscribers_count(subscription.user_id)
+    if subscribers > settings.FEED_FANOUT_LIMIT:
+        if subscribers == settings.FEED_FANOUT_LIMIT + 1:
+            FeedEntry.objects.filter(author=subscription.user_id).delete()
+        return
+    create_entries(
+        (subscription.subscriber_id, recipe, subscription.user_id)
+        for recipe in Recipe.objects.filter(
+            author=subscription.user_id
+        ).values_list("id", flat=True).iterator()
+    )
+
+
+def prune(subscription):
+    """Вызывается после того, как счётчик подписчиков уже уменьшен.
+
+    Если автор вернулся на FEED_FANOUT_LIMIT, его рецепты снова
+    раскладываются по лентам оставшихся подписчиков.
+    """
+    FeedEntry.objects.filter(
+        user=subscription.subscriber_id, author=subscription.user_id
+    ).delete()
+    if subscribers_count(subscription.user_id) == settings.FEED_FANOUT_LIMIT:
+        push_author(subscription.user_id)
+
+
+def get_feed_ids(user, before=None, limit=10):
+    """Id рецептов ленты по убыванию, строго меньше before.
+
+    Берёт верх ленты из таблицы FeedEntry и верх рецептов авторов в
+    режиме чтения и сливает их, так что каждый источник читается по
+    индексу не дальше limit строк.
+    """
+    timeline = FeedEntry.objects.filter(user=user)
+    pulled = Recipe.objects.filter(
+        author__in=Subscription.objects.filter(
+            subscriber=user,
+            user__subscribers_count__gt=settings.FEED_FANOUT_LIMIT,
+        ).values("user")
+    )
+    if before is not None:
+        timeline = timeline.filter(recipe_id__lt=before)
+        pulled = pulled.filter(pk__lt=before)
+    ids = set(
+        timeline.order_by("-recipe_id").values_list("recipe_id", flat=True)[
+            :limit
+        ]
+    )
+    ids.update(pulled.order_by("-id").values_list("id", flat=True)[:limit])
+    return sorted(ids, reverse=True)[:limit]
+
+
+def rebuild_feeds():
+    """Собирает все ленты заново по текущим подпискам."""
+    FeedEntry.objects.all().delete()
+    create_entries(
+        Subscription.objects.filter(
+            user__subscribers_count__lte=settings.FEED_FANOUT_LIMIT,
+            user__recipes__isnull=False,
+        )
+        .values_list("subscriber_id", "user__recipes__id", "user_id")
+        .iterator()
+    )
+    return FeedEntry.objects.count()
@@ -0,0 +1,80 @@
+import base64
+import binascii
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from drf_extra_fields.fields import Base64ImageField
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+
+from .images import variant_url
+
+
+class RecipeImageField(Base64ImageField):
+    """Картинка рецепта в base64.
+
+    При записи читается только заголовок картинки: формат и размер.
+    Полное декодирование и уменьшенные копии делает фоновый обработчик
+    (api.images). При чтении отдаётся копия `variant`, а пока её нет —
+    оригинал.
+    """
+
+    def __init__(self, *args, variant=None, **kwargs):
+        self.variant = variant
+        super().__init__(*args, **kwargs)
+
+    def to_internal_value(self, data):
+        if data in self.EMPTY_VALUES:
+            return None
+        if not isinstance(data, str):
+            raise ValidationError(self.INVALID_FILE_MESSAGE)
+        if ";base64," in data:
+            data = data.split(";base64,", 1)[1]
+        try:
+            decoded = base64.b64decode(data)
+            with Image.open(BytesIO(decoded)) as image:
+                image_format = image.format
+                width, height = image.size
+        except (
+            binascii.Error, ValueError, OSError, Image.DecompressionBombError
+        ):
+            raise ValidationError(self.INVALID_FILE_MESSAGE)
+        extension = "jpg" if image_format == "JPEG" else image_format.lower()
+        if extension not in self.ALLOWED_TYPES:
+            raise ValidationError(self.INVALID_TYPE_MESSAGE)
+        if width * height > Image.MAX_IMAGE_PIXELS:
+            raise ValidationError(self.INVALID_FILE_MESSAGE)
+        return SimpleUploadedFile(
+            name=f"{self.get_file_name(decoded)}.{extension}",
+            content=decoded,
+            content_type=Image.MIME.get(image_format),
+        )
+
+    def build_url(self, value, variant):
+        url = variant_url(value, variant) if variant else value.url
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        return self.build_url(
+            value, self.variant or self.context.get("image_variant", "detail")
+        )
+
+
+class RecipeImageVariantsField(RecipeImageField):
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        urls = {
+            variant: self.build_url(value, variant)
+            for variant in settings.RECIPE_IMAGE_VARIANTS
+        }
+        urls["original"] = self.build_url(value, None)
+        return urls
@@ -1,30 +1,95 @@
+from django.db.models import Count, Exists, OuterRef
 from django_filters.rest_framework import FilterSet, filters
 from rest_framework.filters import SearchFilter
 
-from recipes.models import Recipe
+from recipes.models import Amount, Recipe, Tag
+
+from .search import search_recipes
 
 
 class IngredientSearchFilter(SearchFilter):
     search_param = 'name'
 
 
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    pass
+
+
 class RecipeFilter(FilterSet):
-    tags = filters.AllValuesMultipleFilter(field_name='tags__slug')
+    tags = filters.ModelMultipleChoiceFilter(
+        field_name='tags__slug',
+        to_field_name='slug',
+        queryset=Tag.objects.all(),
+    )
     is_favorited = filters.BooleanFilter(method='filter_is_favorited')
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_is_in_shopping_cart'
     )
+    search = filters.CharFilter(method='filter_search')
+    ingredients = NumberInFilter(method='filter_ingredients')
+    ingredients_any = NumberInFilter(method='filter_ingredients_any')
+    exclude_ingredients = NumberInFilter(method='filter_exclude_ingredients')
+    ordering = filters.ChoiceFilter(
+        choices=(
+            ('popular', 'Популярные'),
+            ('trending', 'Популярные за неделю'),
+        ),
+        method='filter_ordering',
+    )
 
     class Meta:
         model = Recipe
-        fields = ('tags', 'author', 'is_favorited', 'is_in_shopping_cart')
+        fields = (
+            'tags',
+            'author',
+            'is_favorited',
+            'is_in_shopping_cart',
+            'search',
+            'ingredients',
+            'ingredients_any',
+            'exclude_ingredients',
+            'ordering',
+        )
+
+    @staticmethod
+    def amounts(value):
+        return Amount.objects.filter(ingredient__in=value)
+
+    def filter_ingredients(self, queryset, name, value):
+        ids = {int(pk) for pk in value}
+        return queryset.filter(
+            pk__in=self.amounts(ids)
+            .values('recipe')
+            .annotate(found=Count('ingredient'))
+            .filter(found=len(ids))
+            .values('recipe')
+        )
+
+    def filter_ingredients_any(self, queryset, name, value):
+        return queryset.filter(pk__in=self.amounts(value).values('recipe'))
+
+    def filter_exclude_ingredients(self, queryset, name, value):
+        return queryset.filter(
+            ~Exists(self.amounts(value).filter(recipe=OuterRef('pk')))
+        )
+
+    def filter_ordering(self, queryset, name, value):
+        return queryset.filter(score__isnull=False).order_by(
+            f'-score__{value}', '-id'
+        )
+
+    def filter_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
 
     def filter_is_favorited(self, queryset, name, value):
-        if value:
-            return queryset.filter(favorites__user=self.request.user)
-        return queryset
+        return self.filter_user_flag(queryset, name, value)
 
     def filter_is_in_shopping_cart(self, queryset, name, value):
-        if value:
-            return queryset.filter(shopping_cart__user=self.request.user)
-        return queryset
+        return self.filter_user_flag(queryset, name, value)
+
+    def filter_user_flag(self, queryset, name, value):
+        if not value:
+            return queryset
+        if self.request.user.is_anonymous:
+            return queryset.none()
+        return queryset.filter(**{name: True})
@@ -0,0 +1,96 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+from sorl.thumbnail import get_thumbnail
+
+from recipes.models import Recipe
+
+from .cache import RECIPES, bump_version, recipe_namespace
+
+SOURCE = "source"
+
+logger = logging.getLogger(__name__)
+_executor = None
+_executor_lock = Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.RECIPE_IMAGE_WORKERS,
+                thread_name_prefix="recipe-images",
+            )
+        return _executor
+
+
+def needs_processing(recipe):
+    return bool(recipe.image) and (
+        recipe.image_variants.get(SOURCE) != recipe.image.name
+    )
+
+
+def build_variants(image):
+    variants = {SOURCE: image.name}
+    for name, (geometry, options) in settings.RECIPE_IMAGE_VARIANTS.items():
+        variants[name] = get_thumbnail(
+            image,
+            geometry,
+            format=settings.RECIPE_IMAGE_FORMAT,
+            quality=settings.RECIPE_IMAGE_QUALITY,
+            **options,
+        ).name
+    return variants
+
+
+def process_recipe_image(pk):
+    """Строит уменьшенные копии картинки рецепта и сохраняет их имена."""
+    try:
+        recipe = Recipe.objects.only("id", "image", "image_variants").get(
+            pk=pk
+        )
+        if not needs_processing(recipe):
+            return
+        variants = build_variants(recipe.image)
+        updated = Recipe.objects.filter(
+            pk=pk, image=recipe.image.name
+        ).update(image_variants=variants, modified=timezone.now())
+        if updated:
+            bump_version(recipe_namespace(pk))
+            bump_version(RECIPES)
+    except Recipe.DoesNotExist:
+        pass
+    except Exception:
+        logger.exception("Не удалось обработать картинку рецепта %s", pk)
+
+
+def process_in_worker(pk):
+    try:
+        process_recipe_image(pk)
+    finally:
+        connection.close()
+
+
+def schedule(pk):
+    """Ставит обработку картинки в очередь после фиксации транзакции.
+
+    При RECIPE_IMAGE_WORKERS = 0 картинка обрабатывается сразу, в том же
+    потоке.
+    """
+    if settings.RECIPE_IMAGE_WORKERS:
+        task = partial(get_executor().submit, process_in_worker, pk)
+    else:
+        task = partial(process_recipe_image, pk)
+    transaction.on_commit(task)
+
+
+def variant_url(image, variant):
+    name = image.instance.image_variants.get(variant)
+    return default_storage.url(name) if name else image.url
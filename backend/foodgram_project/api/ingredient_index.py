@@ -0,0 +1,79 @@
+from bisect import bisect_left, bisect_right
+from threading import Lock
+
+from recipes.models import Ingredient
+
+from .cache import INGREDIENTS, get_version
+
+SEPARATOR = "\n"
+
+
+class IngredientIndex:
+    """Отсортированный в памяти процесса индекс названий ингредиентов.
+
+    Строится лениво при первом поиске и перестраивается, когда меняется
+    версия ингредиентов в общем кэше, так что изменения видят все процессы.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._state = None
+
+    def invalidate(self):
+        with self._lock:
+            self._state = None
+
+    def build(self, version=None):
+        rows = sorted(
+            (name.casefold(), pk, name, measurement_unit)
+            for pk, name, measurement_unit in Ingredient.objects.values_list(
+                "id", "name", "measurement_unit"
+            ).iterator()
+        )
+        keys = [row[0] for row in rows]
+        offsets = []
+        position = 0
+        for key in keys:
+            offsets.append(position)
+            position += len(key) + len(SEPARATOR)
+        state = (keys, rows, SEPARATOR.join(keys), offsets, version)
+        with self._lock:
+            self._state = state
+        return state
+
+    def _get(self):
+        with self._lock:
+            state = self._state
+        version = get_version(INGREDIENTS)
+        if state is None or state[-1] != version:
+            return self.build(version)
+        return state
+
+    def search(self, query, limit=None):
+        query = query.strip().casefold()
+        keys, rows, text, offsets, _ = self._get()
+        found = []
+        position = bisect_left(keys, query)
+        while (
+            position < len(keys)
+            and keys[position].startswith(query)
+            and len(found) != limit
+        ):
+            found.append(rows[position])
+            position += 1
+        if query and SEPARATOR not in query:
+            position = text.find(query)
+            while position != -1 and len(found) != limit:
+                index = bisect_right(offsets, position) - 1
+                if position != offsets[index]:
+                    found.append(rows[index])
+                position = text.find(
+                    query, offsets[index] + len(keys[index])
+                )
+        return [
+            Ingredient(id=pk, name=name, measurement_unit=measurement_unit)
+            for _, pk, name, measurement_unit in found
+        ]
+
+
+ingredient_index = IngredientIndex()
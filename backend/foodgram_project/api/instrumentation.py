@@ -0,0 +1,62 @@
+import re
+from collections import Counter
+from contextlib import ExitStack
+from hashlib import md5
+from time import perf_counter
+
+from django.db import connections
+
+PLACEHOLDER_LISTS = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+
+
+def fingerprint(sql):
+    return PLACEHOLDER_LISTS.sub("(%s, ...)", sql)
+
+
+class QueryRecorder:
+    """Считает запросы ко всем базам внутри блока with."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.samples = {}
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - started
+            self.count += 1
+            key = md5(fingerprint(sql).encode("utf-8")).hexdigest()[:12]
+            self.fingerprints[key] += 1
+            self.samples.setdefault(key, sql)
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    @property
+    def repeated(self):
+        return {
+            key: count for key, count in self.fingerprints.items() if count > 1
+        }
+
+    def as_dict(self):
+        return {
+            "queries": self.count,
+            "db_time_ms": round(self.duration * 1000, 2),
+            "repeated": [
+                {"fingerprint": key, "count": count, "sql": self.samples[key]}
+                for key, count in sorted(
+                    self.repeated.items(), key=lambda item: -item[1]
+                )
+            ],
+        }
@@ -0,0 +1,170 @@
+import os
+import socket
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from statistics import median
+from threading import local
+from time import perf_counter, sleep
+
+import requests
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from api.management.commands.benchmark import percentile
+from recipes.models import Ingredient, Recipe, Tag
+from users.models import User
+
+WSGI = ["foodgram_project.wsgi:application", "--worker-class", "gthread"]
+ASGI = [
+    "foodgram_project.asgi:application",
+    "--worker-class",
+    "uvicorn.workers.UvicornWorker",
+]
+SERVERS = {
+    "wsgi": (WSGI, {}),
+    "asgi": (ASGI, {"ASYNC_READ_VIEWS": "True"}),
+    "asgi-sync": (ASGI, {"ASYNC_READ_VIEWS": "False"}),
+}
+
+
+def get_scenarios():
+    recipe = Recipe.objects.order_by("-id").values_list("id", flat=True)[0]
+    tag = Tag.objects.values_list("id", flat=True)[0]
+    ingredient = Ingredient.objects.values_list("name", flat=True)[0]
+    return [
+        ("recipes-list", "/api/recipes/"),
+        ("recipes-detail", f"/api/recipes/{recipe}/"),
+        ("tags-list", "/api/tags/"),
+        ("tags-detail", f"/api/tags/{tag}/"),
+        ("ingredients-search", f"/api/ingredients/?name={ingredient[:2]}"),
+    ]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает пропускную способность эндпоинтов чтения под WSGI "
+        "(gunicorn, gthread) и ASGI (gunicorn с воркерами uvicorn) при "
+        "конкурентных запросах. asgi-sync — ASGI без асинхронных "
+        "представлений, для сравнения. Серверы запускаются на текущей базе "
+        "(см. generate_data) и останавливаются после замера."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=settings.ASYNC_READ_WORKERS,
+            help="Потоков на воркер WSGI; под ASGI их роль играет пул "
+            "ASYNC_READ_WORKERS.",
+        )
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument(
+            "--anonymous",
+            action="store_true",
+            help="Без токена: ответы берутся из кэша.",
+        )
+        parser.add_argument(
+            "--servers", nargs="+", choices=SERVERS, default=list(SERVERS)
+        )
+
+    def handle(self, *args, **options):
+        headers = {}
+        if not options["anonymous"]:
+            user = User.objects.order_by("id").first()
+            if user is None:
+                raise CommandError(
+                    "Нет пользователей, запустите generate_data"
+                )
+            token, _ = Token.objects.get_or_create(user=user)
+            headers["Authorization"] = f"Token {token.key}"
+        scenarios = get_scenarios()
+        self.stdout.write(
+            f"{'server':<10} {'scenario':<20} {'req/s':>9} "
+            f"{'p50, ms':>9} {'p95, ms':>9} {'errors':>7}"
+        )
+        for server in options["servers"]:
+            port = free_port()
+            process = self.start(server, port, options)
+            try:
+                for label, path in scenarios:
+                    rate, p50, p95, errors = self.load(
+                        f"http://127.0.0.1:{port}{path}", headers, options
+                    )
+                    self.stdout.write(
+                        f"{server:<10} {label:<20} {rate:>9.1f} "
+                        f"{p50:>9.2f} {p95:>9.2f} {errors:>7}"
+                    )
+            finally:
+                process.terminate()
+                process.wait()
+
+    def start(self, server, port, options):
+        arguments, env = SERVERS[server]
+        command = [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            *arguments,
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(options["workers"]),
+            "--threads",
+            str(options["threads"]),
+            "--log-level",
+            "warning",
+        ]
+        process = subprocess.Popen(
+            command,
+            cwd=settings.BASE_DIR,
+            env={
+                **os.environ,
+                **env,
+                "ASYNC_READ_WORKERS": str(options["threads"]),
+            },
+        )
+        for _ in range(100):
+            try:
+                requests.get(f"http://127.0.0.1:{port}/api/tags/", timeout=1)
+                return process
+            except requests.ConnectionError:
+                if process.poll() is not None:
+                    break
+                sleep(0.1)
+        process.terminate()
+        raise CommandError(f"Сервер {server} не запустился")
+
+    def load(self, url, headers, options):
+        sessions = local()
+
+        def fetch(_):
+            if not hasattr(sessions, "session"):
+                sessions.session = requests.Session()
+                sessions.session.headers.update(headers)
+            started = perf_counter()
+            response = sessions.session.get(url)
+            return perf_counter() - started, response.status_code
+
+        with ThreadPoolExecutor(options["concurrency"]) as pool:
+            list(pool.map(fetch, range(options["concurrency"])))
+            started = perf_counter()
+            results = list(pool.map(fetch, range(options["requests"])))
+            elapsed = perf_counter() - started
+        timings = [timing * 1000 for timing, _ in results]
+        errors = sum(status != 200 for _, status in results)
+        return (
+            len(results) / elapsed,
+            median(timings),
+            percentile(timings, 95),
+            errors,
+        )
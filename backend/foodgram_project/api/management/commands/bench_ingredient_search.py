@@ -0,0 +1,100 @@
+import os
+import random
+from csv import DictReader
+from statistics import median
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from api.cache import INGREDIENTS, bump_version
+from api.ingredient_index import ingredient_index
+from api.views import IngredientViewSet
+from recipes.models import Ingredient
+
+SOURCE = os.path.join(settings.BASE_DIR, "data", "ingredients.csv")
+
+
+class UncachedIngredientViewSet(IngredientViewSet):
+    cache_namespace = None
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает поиск ингредиентов через БД и через индекс в памяти. "
+        "Все данные откатываются после замера."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[10000, 100000]
+        )
+        parser.add_argument("--queries", type=int, default=50)
+        parser.add_argument("--limit", type=int, default=None)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(**options)
+            transaction.set_rollback(True)
+        bump_version(INGREDIENTS)
+
+    def run(self, sizes, queries, limit, seed, **options):
+        with open(SOURCE, encoding="utf-8") as file:
+            source = list(DictReader(file))
+        rng = random.Random(seed)
+        view = UncachedIngredientViewSet.as_view({"get": "list"})
+        factory = APIRequestFactory()
+        loaded = Ingredient.objects.count()
+        self.stdout.write(
+            f"{'rows':>8} {'build, ms':>10} {'db, ms':>8} {'index, ms':>10}"
+        )
+        for size in sorted(sizes):
+            Ingredient.objects.bulk_create(
+                (
+                    Ingredient(
+                        name=f"{row['name']} {i}",
+                        measurement_unit=row["measurement_unit"],
+                    )
+                    for i, row in (
+                        (i, source[i % len(source)])
+                        for i in range(loaded, size)
+                    )
+                ),
+                batch_size=5000,
+            )
+            loaded = max(loaded, size)
+            version = bump_version(INGREDIENTS)
+            terms = [
+                rng.choice(source)["name"][: rng.randint(1, 3)]
+                for _ in range(queries)
+            ]
+            started = perf_counter()
+            ingredient_index.build(version)
+            build = perf_counter() - started
+            timings = {}
+            for enabled in (False, True):
+                with override_settings(INGREDIENT_INDEX_ENABLED=enabled):
+                    timings[enabled] = self.measure(
+                        view, factory, terms, limit
+                    )
+            self.stdout.write(
+                f"{loaded:>8} {build * 1000:>10.1f} "
+                f"{timings[False] * 1000:>8.2f} {timings[True] * 1000:>10.2f}"
+            )
+
+    @staticmethod
+    def measure(view, factory, terms, limit):
+        params = {"limit": limit} if limit else {}
+        timings = []
+        for term in terms:
+            request = factory.get(
+                "/api/ingredients/", {"name": term, **params}
+            )
+            started = perf_counter()
+            view(request).render()
+            timings.append(perf_counter() - started)
+        return median(timings)
@@ -0,0 +1,116 @@
+import base64
+from io import BytesIO
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Tag
+from users.models import User
+
+
+def make_image():
+    buffer = BytesIO()
+    Image.new("RGB", (64, 64), "orange").save(buffer, "PNG")
+    return "data:image/png;base64," + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет число запросов и время создания и изменения рецепта "
+        "в зависимости от числа ингредиентов. Все данные откатываются "
+        "после замера, картинки пишутся во временную папку."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[1, 5, 10, 25, 50]
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with TemporaryDirectory() as media, override_settings(
+            MEDIA_ROOT=media
+        ), transaction.atomic():
+            self.run(**options)
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def check(response, status_code):
+        if response.status_code != status_code:
+            raise CommandError(
+                f"Ожидался ответ {status_code}, получен "
+                f"{response.status_code}: {response.content.decode()}"
+            )
+
+    def run(self, sizes, repeat, **options):
+        user = User.objects.create(
+            username="bench_recipe_write",
+            email="bench_recipe_write@example.com",
+        )
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f"bench-write-{i}", measurement_unit="г")
+            for i in range(max(sizes) * 2)
+        )
+        pool = list(
+            Ingredient.objects.filter(
+                name__startswith="bench-write-"
+            ).values_list("id", flat=True)
+        )
+        tag, _ = Tag.objects.get_or_create(
+            slug="bench-write",
+            defaults={"name": "bench-write", "color": "#E26C2D"},
+        )
+        client = APIClient(SERVER_NAME="localhost")
+        client.force_authenticate(user)
+        image = make_image()
+        self.stdout.write(
+            f"{'ingredients':>11} {'create q':>9} {'create, ms':>11} "
+            f"{'update q':>9} {'update, ms':>11}"
+        )
+        for size in sorted(sizes):
+            create, update = [], []
+            for attempt in range(repeat):
+                data = {
+                    "name": f"bench-write-{size}-{attempt}",
+                    "text": "bench",
+                    "cooking_time": 10,
+                    "tags": [tag.pk],
+                    "image": image,
+                    "ingredients": [
+                        {"id": pk, "amount": 1} for pk in pool[:size]
+                    ],
+                }
+                with CaptureQueriesContext(connection) as create_queries:
+                    started = perf_counter()
+                    response = client.post(
+                        "/api/recipes/", data, format="json"
+                    )
+                    create.append(perf_counter() - started)
+                self.check(response, 201)
+                data.pop("image")
+                data["ingredients"] = [
+                    {"id": pk, "amount": 2} for pk in pool[size // 2:][:size]
+                ]
+                with CaptureQueriesContext(connection) as update_queries:
+                    started = perf_counter()
+                    response = client.patch(
+                        f"/api/recipes/{response.data['id']}/",
+                        data,
+                        format="json",
+                    )
+                    update.append(perf_counter() - started)
+                self.check(response, 200)
+            self.stdout.write(
+                f"{size:>11} {len(create_queries):>9} "
+                f"{median(create) * 1000:>11.2f} "
+                f"{len(update_queries):>9} {median(update) * 1000:>11.2f}"
+            )
@@ -0,0 +1,101 @@
+from statistics import median
+from time import perf_counter
+
+from django.core.management import BaseCommand, CommandError
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.instrumentation import QueryRecorder
+from api.renderers import ORJSONRenderer
+from recipes.models import Recipe
+from users.models import Subscription
+
+CARD_FIELDS = "id,name,image,cooking_time,is_favorited,is_in_shopping_cart"
+
+
+def get_scenarios(recipe):
+    return [
+        ("recipes-list", reverse("api:recipes-list"), {}),
+        (
+            "recipes-list-card",
+            reverse("api:recipes-list"),
+            {"fields": CARD_FIELDS},
+        ),
+        ("recipes-detail", reverse("api:recipes-detail", args=[recipe]), {}),
+        ("users-list", reverse("api:users-list"), {}),
+        (
+            "users-list-names",
+            reverse("api:users-list"),
+            {"fields": "id,username"},
+        ),
+        (
+            "users-subscriptions",
+            reverse("api:users-subscriptions"),
+            {"recipes_limit": 3},
+        ),
+        (
+            "users-subscriptions-count",
+            reverse("api:users-subscriptions"),
+            {"fields": "id,username,recipes_count"},
+        ),
+    ]
+
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = perf_counter()
+        result = function()
+        timings.append(perf_counter() - started)
+    return result, median(timings) * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает время ответа, число запросов и размер ответа с полным "
+        "набором полей и с ?fields=, а также время рендера JSON "
+        "стандартным JSONRenderer и ORJSONRenderer на текущих данных "
+        "(см. generate_data)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        subscription = (
+            Subscription.objects.select_related("subscriber")
+            .order_by("subscriber")
+            .first()
+        )
+        recipe = Recipe.objects.values_list("id", flat=True).first()
+        if subscription is None or recipe is None:
+            raise CommandError("Нет данных, запустите generate_data")
+        client = APIClient(SERVER_NAME="localhost")
+        client.force_authenticate(subscription.subscriber)
+        self.stdout.write(
+            f"{'scenario':<26} {'queries':>7} {'request, ms':>11} "
+            f"{'json, ms':>9} {'orjson, ms':>10} {'bytes':>9}"
+        )
+        for name, url, params in get_scenarios(recipe):
+            params = {"limit": options["limit"], **params}
+            with QueryRecorder() as queries:
+                response = client.get(url, params)
+            if response.status_code != 200:
+                raise CommandError(f"{name}: {response.status_code}")
+            _, request_time = measure(
+                lambda: client.get(url, params), options["repeat"]
+            )
+            _, json_time = measure(
+                lambda: JSONRenderer().render(response.data),
+                options["repeat"],
+            )
+            payload, orjson_time = measure(
+                lambda: ORJSONRenderer().render(response.data),
+                options["repeat"],
+            )
+            self.stdout.write(
+                f"{name:<26} {queries.count:>7} {request_time:>11.2f} "
+                f"{json_time:>9.3f} {orjson_time:>10.3f} {len(payload):>9}"
+            )
@@ -0,0 +1,101 @@
+from statistics import median
+from time import perf_counter
+
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.shopping_list import refresh_items
+from api.views import RecipeViewSet
+from recipes.models import Amount, Ingredient, Recipe, ShoppingCart
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет число запросов и время выгрузки списка покупок "
+        "при росте корзины. Все данные откатываются после замера."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[1, 10, 30, 100]
+        )
+        parser.add_argument("--ingredients", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            default="txt",
+            choices=("txt", "csv", "pdf"),
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(**options)
+            transaction.set_rollback(True)
+
+    def run(self, sizes, ingredients, repeat, file_format, **options):
+        user = User.objects.create(
+            username="bench_shopping_cart",
+            email="bench_shopping_cart@example.com",
+        )
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f"bench-{i}", measurement_unit="г")
+            for i in range(ingredients * 3)
+        )
+        pool = list(Ingredient.objects.filter(name__startswith="bench-"))
+        view = RecipeViewSet.as_view(
+            {"get": "download_shopping_cart"},
+            **RecipeViewSet.download_shopping_cart.kwargs,
+        )
+        factory = APIRequestFactory()
+        in_cart = 0
+        self.stdout.write(f"{'recipes':>8} {'queries':>8} {'median, ms':>11}")
+        for size in sorted(sizes):
+            self.fill_cart(user, pool, ingredients, size - in_cart)
+            in_cart = size
+            timings = []
+            for _ in range(repeat):
+                request = factory.get(
+                    "/api/recipes/download_shopping_cart/",
+                    {"format": file_format},
+                )
+                force_authenticate(request, user=user)
+                with CaptureQueriesContext(connection) as queries:
+                    started = perf_counter()
+                    response = view(request)
+                    b"".join(response)
+                    timings.append(perf_counter() - started)
+            self.stdout.write(
+                f"{size:>8} {len(queries):>8} "
+                f"{median(timings) * 1000:>11.2f}"
+            )
+
+    @staticmethod
+    def fill_cart(user, pool, ingredients, count):
+        Recipe.objects.bulk_create(
+            Recipe(
+                name=f"bench-{i}", text="bench", author=user, cooking_time=1
+            )
+            for i in range(count)
+        )
+        recipes = list(
+            Recipe.objects.filter(author=user).exclude(
+                shopping_cart__user=user
+            )
+        )
+        Amount.objects.bulk_create(
+            Amount(
+                recipe=recipe,
+                ingredient=pool[(recipe.pk + i) % len(pool)],
+                amount=i + 1,
+            )
+            for recipe in recipes
+            for i in range(ingredients)
+        )
+        ShoppingCart.objects.bulk_create(
+            ShoppingCart(user=user, recipe=recipe) for recipe in recipes
+        )
+        refresh_items([user.pk])
@@ -0,0 +1,199 @@
+import json
+import tracemalloc
+from datetime import datetime, timezone
+from math import ceil
+from statistics import median
+from time import perf_counter
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.instrumentation import QueryRecorder
+from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from users.models import Subscription, User
+
+
+def percentile(values, percent):
+    """Перцентиль по ближайшему рангу: statistics.quantiles нет в 3.7."""
+    ordered = sorted(values)
+    rank = ceil(len(ordered) * percent / 100)
+    return ordered[max(rank, 1) - 1]
+
+
+def get_scenarios(recipe, tag, ingredient):
+    return [
+        ("recipes-list", True, reverse("api:recipes-list"), {}),
+        ("recipes-list", False, reverse("api:recipes-list"), {}),
+        (
+            "recipes-list-tags",
+            False,
+            reverse("api:recipes-list"),
+            {"tags": tag},
+        ),
+        (
+            "recipes-list-favorited",
+            False,
+            reverse("api:recipes-list"),
+            {"is_favorited": 1},
+        ),
+        (
+            "recipes-detail",
+            False,
+            reverse("api:recipes-detail", args=[recipe]),
+            {},
+        ),
+        (
+            "users-subscriptions",
+            False,
+            reverse("api:users-subscriptions"),
+            {"recipes_limit": 3},
+        ),
+        (
+            "recipes-download-shopping-cart",
+            False,
+            reverse("api:recipes-download-shopping-cart"),
+            {},
+        ),
+        ("recipes-feed", False, reverse("api:recipes-feed"), {}),
+        ("users-list", False, reverse("api:users-list"), {}),
+        (
+            "ingredients-search",
+            True,
+            reverse("api:ingredients-list"),
+            {"name": ingredient[:2]},
+        ),
+        ("tags-list", True, reverse("api:tags-list"), {}),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Прогоняет основные эндпоинты через тестовый клиент на текущих "
+        "данных (см. generate_data) и пишет p50/p95, число запросов и "
+        "пиковую память в JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument(
+            "--viewer",
+            help="Имя пользователя, от которого идут запросы. По умолчанию "
+            "пользователь с наибольшим числом подписок.",
+        )
+        parser.add_argument(
+            "--only", nargs="+", help="Запустить только эти сценарии."
+        )
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Файл для результатов, по умолчанию "
+            "benchmark-<время>.json в текущей папке.",
+        )
+
+    def handle(self, *args, **options):
+        viewer = self.get_viewer(options["viewer"])
+        recipe = Recipe.objects.order_by("-id").values_list("id", flat=True)
+        tag = Tag.objects.values_list("slug", flat=True)
+        ingredient = Ingredient.objects.values_list("name", flat=True)
+        if not (recipe.exists() and tag.exists() and ingredient.exists()):
+            raise CommandError("Нет данных, сначала запустите generate_data")
+        client = APIClient(SERVER_NAME="localhost")
+        results = []
+        for name, anonymous, url, params in get_scenarios(
+            recipe.first(), tag.first(), ingredient.first()
+        ):
+            label = f"{name}{' (anonymous)' if anonymous else ''}"
+            if options["only"] and name not in options["only"]:
+                continue
+            client.force_authenticate(None if anonymous else viewer)
+            result = self.measure(
+                client, url, params, options["iterations"], options["warmup"]
+            )
+            results.append({"name": label, "url": url, **result})
+            self.stdout.write(
+                f"{label:<42} {result['status']:>4} "
+                f"p50 {result['p50_ms']:>8.2f} ms  "
+                f"p95 {result['p95_ms']:>8.2f} ms  "
+                f"{result['queries']:>4} q  "
+                f"{result['peak_memory_kb']:>8.1f} KiB"
+            )
+        report = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "database": connection.vendor,
+            "viewer": viewer.username,
+            "iterations": options["iterations"],
+            "dataset": self.get_dataset(),
+            "results": results,
+        }
+        output = options["output"] or (
+            f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json"
+        )
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        self.stdout.write(
+            self.style.SUCCESS(f"Результаты записаны в {output}")
+        )
+
+    @staticmethod
+    def request(client, url, params):
+        response = client.get(url, params)
+        if response.streaming:
+            return response, len(b"".join(response.streaming_content))
+        return response, len(response.content)
+
+    def measure(self, client, url, params, iterations, warmup):
+        for _ in range(warmup):
+            self.request(client, url, params)
+        timings = []
+        for _ in range(iterations):
+            with QueryRecorder() as recorder:
+                started = perf_counter()
+                response, size = self.request(client, url, params)
+                timings.append((perf_counter() - started) * 1000)
+        tracemalloc.start()
+        self.request(client, url, params)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            "status": response.status_code,
+            "p50_ms": round(median(timings), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "queries": recorder.count,
+            "db_time_ms": round(recorder.duration * 1000, 3),
+            "peak_memory_kb": round(peak / 1024, 1),
+            "response_bytes": size,
+        }
+
+    @staticmethod
+    def get_viewer(username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f"Пользователь {username} не найден")
+        viewer = (
+            User.objects.annotate(total=Count("subscriber"))
+            .order_by("-total", "id")
+            .first()
+        )
+        if viewer is None:
+            raise CommandError("Нет данных, сначала запустите generate_data")
+        return viewer
+
+    @staticmethod
+    def get_dataset():
+        return {
+            model.__name__: model.objects.count()
+            for model in (
+                User,
+                Recipe,
+                Ingredient,
+                Favorite,
+                ShoppingCart,
+                Subscription,
+            )
+        }
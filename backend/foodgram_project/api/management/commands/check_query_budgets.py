@@ -0,0 +1,126 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.feed import rebuild_feeds
+from api.query_budget import QUERY_BUDGETS, QueryBudgetExceeded, query_budget
+from api.shopping_list import refresh_items
+from recipes.models import Amount, Ingredient, Recipe, ShoppingCart, Tag
+from users.models import Subscription, User
+
+PREFIX = "budget"
+
+
+def seed(authors, recipes, ingredients):
+    """Создаёт авторов с рецептами и зрителя, подписанного на всех и
+    положившего все рецепты в корзину. Возвращает (зритель, рецепт)."""
+    User.objects.bulk_create(
+        User(username=f"{PREFIX}-{i}", email=f"{PREFIX}-{i}@example.com")
+        for i in range(authors + 1)
+    )
+    viewer, *users = User.objects.filter(
+        username__startswith=f"{PREFIX}-"
+    ).order_by("id")
+    tags = [
+        Tag.objects.create(
+            name=f"{PREFIX}-{i}", slug=f"{PREFIX}-{i}", color="#E26C2D"
+        )
+        for i in range(2)
+    ]
+    Ingredient.objects.bulk_create(
+        Ingredient(name=f"{PREFIX}-{i}", measurement_unit="г")
+        for i in range(ingredients)
+    )
+    pool = list(Ingredient.objects.filter(name__startswith=f"{PREFIX}-"))
+    Recipe.objects.bulk_create(
+        Recipe(name=f"{PREFIX}-{i}", text=PREFIX, author=user)
+        for user in users
+        for i in range(recipes)
+    )
+    created = list(Recipe.objects.filter(author__in=users))
+    Amount.objects.bulk_create(
+        Amount(recipe=recipe, ingredient=ingredient, amount=1)
+        for recipe in created
+        for ingredient in pool
+    )
+    Recipe.tags.through.objects.bulk_create(
+        Recipe.tags.through(recipe=recipe, tag=tag)
+        for recipe in created
+        for tag in tags
+    )
+    Subscription.objects.bulk_create(
+        Subscription(subscriber=viewer, user=user) for user in users
+    )
+    rebuild_feeds()
+    ShoppingCart.objects.bulk_create(
+        ShoppingCart(user=viewer, recipe=recipe) for recipe in created
+    )
+    refresh_items([viewer.pk])
+    return viewer, created[0]
+
+
+def budget_requests(recipe):
+    """Имя бюджета → (url, параметры) запроса, который он ограничивает."""
+    return {
+        "recipes-list": (reverse("api:recipes-list"), {"limit": 20}),
+        "recipes-detail": (
+            reverse("api:recipes-detail", args=[recipe.pk]),
+            {},
+        ),
+        "recipes-download-shopping-cart": (
+            reverse("api:recipes-download-shopping-cart"),
+            {},
+        ),
+        "recipes-shopping-list": (
+            reverse("api:recipes-shopping-list"),
+            {},
+        ),
+        "recipes-feed": (reverse("api:recipes-feed"), {"limit": 20}),
+        "users-list": (reverse("api:users-list"), {"limit": 20}),
+        "users-subscriptions": (
+            reverse("api:users-subscriptions"),
+            {"limit": 20},
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Прогоняет основные эндпоинты на тестовых данных и падает, если "
+        "число запросов превышает бюджет из api.query_budget. "
+        "Данные откатываются после проверки."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--authors", type=int, default=10)
+        parser.add_argument("--recipes", type=int, default=3)
+        parser.add_argument("--ingredients", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            failed = self.run(**options)
+            transaction.set_rollback(True)
+        if failed:
+            raise CommandError("\n\n".join(failed))
+        self.stdout.write(self.style.SUCCESS("Все бюджеты соблюдены"))
+
+    def run(self, authors, recipes, ingredients, **options):
+        viewer, recipe = seed(authors, recipes, ingredients)
+        client = APIClient(SERVER_NAME="localhost")
+        client.force_authenticate(viewer)
+        failed = []
+        for name, (url, params) in budget_requests(recipe).items():
+            try:
+                with query_budget(name) as recorder:
+                    response = client.get(url, params)
+                    if response.streaming:
+                        b"".join(response.streaming_content)
+            except QueryBudgetExceeded as error:
+                failed.append(str(error))
+                continue
+            self.stdout.write(
+                f"{name}: {response.status_code}, "
+                f"{recorder.count}/{QUERY_BUDGETS[name]} запросов"
+            )
+        return failed
@@ -0,0 +1,114 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+
+from api.filters import RecipeFilter
+from recipes.models import Amount, Favorite, Recipe, ShoppingCart
+from users.models import Subscription
+
+
+def filter_recipes(**params):
+    return RecipeFilter(params, queryset=Recipe.objects.all()).qs
+
+
+def get_checks(user_id, recipe_id):
+    return [
+        (
+            "Рецепт уже в избранном",
+            Favorite.objects.filter(user=user_id, recipe=recipe_id),
+            ("user_id", "recipe_id"),
+        ),
+        (
+            "Рецепт уже в списке покупок",
+            ShoppingCart.objects.filter(user=user_id, recipe=recipe_id),
+            ("user_id", "recipe_id"),
+        ),
+        (
+            "Подписка на автора",
+            Subscription.objects.filter(subscriber=user_id, user=user_id),
+            ("subscriber_id", "user_id"),
+        ),
+        (
+            "Ингредиенты рецепта",
+            Amount.objects.filter(recipe=recipe_id),
+            ("recipe_id",),
+        ),
+        (
+            "Фильтр is_favorited",
+            Recipe.objects.filter(
+                Exists(
+                    Favorite.objects.filter(
+                        user=user_id, recipe=OuterRef("pk")
+                    )
+                )
+            ),
+            ("user_id", "recipe_id"),
+        ),
+        (
+            "Фильтр ingredients",
+            filter_recipes(ingredients="1,2"),
+            ("ingredient_id",),
+        ),
+        (
+            "Фильтр ingredients_any",
+            filter_recipes(ingredients_any="1,2"),
+            ("ingredient_id",),
+        ),
+        (
+            "Фильтр exclude_ingredients",
+            filter_recipes(exclude_ingredients="1,2"),
+            ("recipe_id", "ingredient_id"),
+        ),
+    ]
+
+
+def uses_index(plan, columns):
+    if connection.vendor == "postgresql":
+        lines = [line for line in plan.splitlines() if "Index Cond" in line]
+    elif connection.vendor == "sqlite":
+        lines = [
+            line for line in plan.splitlines()
+            if "SEARCH" in line and "INDEX" in line
+        ]
+    else:
+        return None
+    return any(all(column in line for column in columns) for line in lines)
+
+
+class Command(BaseCommand):
+    help = (
+        "Выводит планы горячих запросов к избранному, списку покупок, "
+        "подпискам и ингредиентам и проверяет, что все условия поиска "
+        "покрыты одним индексом."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, default=1)
+        parser.add_argument("--recipe", type=int, default=1)
+        parser.add_argument(
+            "--force-index",
+            action="store_true",
+            help="Запретить seq scan в PostgreSQL, чтобы на маленьких "
+            "таблицах проверить пригодность индексов.",
+        )
+
+    def handle(self, *args, **options):
+        failed = []
+        with transaction.atomic():
+            if options["force_index"] and connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            for label, queryset, columns in get_checks(
+                options["user"], options["recipe"]
+            ):
+                plan = queryset.explain()
+                result = uses_index(plan, columns)
+                status = {True: "OK", False: "FAIL", None: "?"}[result]
+                self.stdout.write(f"[{status}] {label}\n{plan}\n")
+                if result is False:
+                    failed.append(label)
+        if failed:
+            raise CommandError(
+                "Без индекса выполняются: " + ", ".join(failed)
+            )
+        self.stdout.write(self.style.SUCCESS("Все запросы идут по индексам"))
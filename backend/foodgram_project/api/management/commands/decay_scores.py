@@ -0,0 +1,29 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from api.cache import RECIPES, bump_version
+from api.popularity import decay_scores, rebuild_scores
+
+
+class Command(BaseCommand):
+    help = (
+        "Применяет затухание к оценкам популярности рецептов. Запускается "
+        "периодически, например раз в час из cron; с --rebuild строит "
+        "оценки заново по счётчикам избранного и списков покупок."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Пересоздать оценки всех рецептов.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["rebuild"]:
+                rows = rebuild_scores()
+            else:
+                rows = decay_scores()
+            transaction.on_commit(lambda: bump_version(RECIPES))
+        self.stdout.write(self.style.SUCCESS(f"Обновлено оценок: {rows}"))
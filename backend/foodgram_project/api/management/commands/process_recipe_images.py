@@ -0,0 +1,27 @@
+from django.core.management import BaseCommand
+
+from api.images import needs_processing, process_recipe_image
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = (
+        "Строит уменьшенные копии картинок для рецептов, у которых их ещё "
+        "нет или картинка сменилась, например после сбоя фонового "
+        "обработчика."
+    )
+
+    def handle(self, *args, **options):
+        recipes = (
+            Recipe.objects.exclude(image="")
+            .exclude(image=None)
+            .only("id", "image", "image_variants")
+        )
+        processed = 0
+        for recipe in recipes.iterator():
+            if needs_processing(recipe):
+                process_recipe_image(recipe.pk)
+                processed += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Обработано картинок: {processed}")
+        )
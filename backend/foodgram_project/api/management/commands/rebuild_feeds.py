@@ -0,0 +1,16 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from api.feed import rebuild_feeds
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересобирает ленты подписок по текущим подпискам, например после "
+        "bulk_create или изменения FEED_FANOUT_LIMIT."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = rebuild_feeds()
+        self.stdout.write(self.style.SUCCESS(f"Записей в лентах: {total}"))
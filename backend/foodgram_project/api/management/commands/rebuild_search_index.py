@@ -0,0 +1,16 @@
+from django.core.management import BaseCommand
+
+from api.cache import RECIPES, bump_version
+from api.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересобирает полнотекстовый индекс рецептов, например после "
+        "массовой загрузки через bulk_create."
+    )
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        bump_version(RECIPES)
+        self.stdout.write(self.style.SUCCESS("Индекс пересобран"))
@@ -0,0 +1,30 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from api.counters import repair_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Сверяет счётчики избранного, списков покупок, рецептов и "
+        "подписчиков с данными и исправляет расхождения."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать расхождения, ничего не меняя.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drift = repair_counters(options["dry_run"])
+        for counter, rows in drift.items():
+            self.stdout.write(f"{counter}: {rows}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Расхождений: {sum(drift.values())}"
+                + (" (ничего не изменено)" if options["dry_run"] else "")
+            )
+        )
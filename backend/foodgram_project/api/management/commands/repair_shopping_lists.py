@@ -0,0 +1,41 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from api.shopping_list import rebuild_shopping_lists, repair_shopping_lists
+
+
+class Command(BaseCommand):
+    help = (
+        "Сверяет списки покупок с корзинами и пересчитывает разошедшиеся; "
+        "с --rebuild собирает все списки заново, например после "
+        "bulk_create корзин."
+    )
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать расхождения, ничего не меняя.",
+        )
+        group.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Пересобрать все списки покупок.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["rebuild"]:
+                total = rebuild_shopping_lists()
+                self.stdout.write(
+                    self.style.SUCCESS(f"Строк в списках покупок: {total}")
+                )
+                return
+            broken = repair_shopping_lists(options["dry_run"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Пользователей с расхождениями: {broken}"
+                + (" (ничего не изменено)" if options["dry_run"] else "")
+            )
+        )
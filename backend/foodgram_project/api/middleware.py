@@ -0,0 +1,39 @@
+import json
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .instrumentation import QueryRecorder
+
+logger = logging.getLogger("api.queries")
+
+
+class QueryInstrumentationMiddleware:
+    def __init__(self, get_response):
+        if not settings.QUERY_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        stats = recorder.as_dict()
+        response["X-DB-Query-Count"] = stats["queries"]
+        response["X-DB-Time-Ms"] = stats["db_time_ms"]
+        response["X-DB-Repeated-Queries"] = ",".join(
+            f"{item['fingerprint']}x{item['count']}"
+            for item in stats["repeated"]
+        )
+        logger.info(
+            json.dumps(
+                {
+                    "method": request.method,
+                    "path": request.get_full_path(),
+                    "status": response.status_code,
+                    **stats,
+                },
+                ensure_ascii=False,
+            )
+        )
+        return response
@@ -1,7 +1,17 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
+from django.utils.http import http_date
 from rest_framework import mixins, status, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.response import Response
 
+from .cache import (get_version, make_etag, matches_any, not_modified,
+                    response_key)
+from .pagination import CustomCursorPagination
+
 
 class CreateDestroyViewSet(
     mixins.CreateModelMixin, mixins.DestroyModelMixin, viewsets.GenericViewSet
@@ -29,7 +39,13 @@ class CreateDestroyViewSet(
     def create(self, request, id):
         serializer = self.get_serializer(id)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            raise ValidationError(
+                {serializer.attr_string_list[0]: serializer.error}
+            )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def delete(self, request, id):
@@ -54,3 +70,187 @@ class ListRetrieveViewSet(
     mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
 ):
     pass
+
+
+class CursorPaginationMixin:
+    """pagination=cursor включает курсорную пагинацию по id.
+
+    Параметры из cursor_conflicting_params задают свою сортировку, которую
+    курсор подменил бы на сортировку по id, поэтому вместе с ним они
+    отклоняются.
+    """
+
+    cursor_pagination_class = CustomCursorPagination
+    cursor_conflicting_params = ()
+
+    @property
+    def paginator(self):
+        if (
+            not hasattr(self, "_paginator")
+            and self.cursor_pagination_class.is_requested(self.request)
+        ):
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
+
+    def paginate_queryset(self, queryset):
+        if self.cursor_pagination_class.is_requested(self.request):
+            conflicts = {
+                param: "Курсорная пагинация идёт по id и не сочетается с "
+                "этой сортировкой."
+                for param in self.cursor_conflicting_params
+                if self.request.query_params.get(param, "").strip()
+            }
+            if conflicts:
+                raise ValidationError(conflicts)
+        return super().paginate_queryset(queryset)
+
+
+class SparseFieldsMixin:
+    """?fields=a,b оставляет в ответе только эти поля верхнего уровня.
+
+    Поля отбрасывает сериализатор, а вьюха по wants_field не загружает
+    то, что для них понадобилось бы. Действует только на чтение: у
+    записи сериализатор тот же, и отброшенные поля молча не сохранились
+    бы. Неизвестные имена полей — ошибка 400.
+    """
+
+    fields_query_param = "fields"
+
+    @property
+    def requested_fields(self):
+        if self.request.method not in SAFE_METHODS:
+            return set()
+        value = self.request.query_params.get(self.fields_query_param, "")
+        return {name for name in map(str.strip, value.split(",")) if name}
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        requested = self.requested_fields
+        if not requested:
+            return
+        unknown = requested - set(self.get_serializer_class()().fields)
+        if unknown:
+            names = ", ".join(sorted(unknown))
+            raise ValidationError(
+                {self.fields_query_param: f"Неизвестные поля: {names}."}
+            )
+
+    def wants_field(self, name):
+        requested = self.requested_fields
+        return not requested or name in requested
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.requested_fields
+        return context
+
+
+class VersionCachedMixin:
+    cache_namespace = None
+    cache_query_params = None
+    cache_timeout = settings.REFERENCE_CACHE_TIMEOUT
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def use_cache(self):
+        return self.cache_namespace is not None
+
+    def get_cache_version(self, **kwargs):
+        return get_version(self.cache_namespace)
+
+    def get_last_modified(self, **kwargs):
+        return None
+
+    def object_exists(self, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            return self.get_queryset().filter(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            ).exists()
+        except (TypeError, ValueError):
+            return False
+
+    def is_not_modified(self, request, etag, last_modified, **kwargs):
+        """«*» в If-None-Match даёт 304 только для существующего объекта,
+        иначе запрос доходит до 404."""
+        if not not_modified(request, etag, last_modified):
+            return False
+        return (
+            self.action != "retrieve"
+            or not matches_any(request)
+            or self.object_exists(**kwargs)
+        )
+
+    def cached_last_modified(self, version, request, **kwargs):
+        key = response_key(
+            self.cache_namespace,
+            version,
+            request,
+            f"last-modified:{self.action}:{sorted(kwargs.items())}",
+            (),
+        )
+        last_modified = cache.get(key)
+        if last_modified is None:
+            last_modified = self.get_last_modified(**kwargs)
+            if last_modified is not None:
+                cache.add(key, last_modified, self.cache_timeout)
+                last_modified = cache.get(key, last_modified)
+        return last_modified
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        """Отдаёт ответ с ETag и отвечает 304, не сериализуя данные.
+
+        Общие ответы (use_cache) ещё и кэшируются и получают
+        Last-Modified. Для остальных ETag строится из той же версии, а
+        тело собирается заново.
+        """
+        if self.cache_namespace is None:
+            return handler(request, *args, **kwargs)
+        version = self.get_cache_version(**kwargs)
+        renderer_format = request.accepted_renderer.format
+        shared = self.use_cache()
+        headers = {
+            "ETag": make_etag(self.cache_namespace, version, renderer_format),
+            "Cache-Control": "no-cache",
+            "Vary": "Accept, Authorization",
+        }
+        last_modified = None
+        if shared:
+            last_modified = self.cached_last_modified(
+                version, request, **kwargs
+            )
+        if last_modified is not None:
+            headers["Last-Modified"] = http_date(last_modified.timestamp())
+        if self.is_not_modified(
+            request, headers["ETag"], last_modified, **kwargs
+        ):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers=headers
+            )
+        if not shared:
+            response = handler(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                for header, value in headers.items():
+                    response[header] = value
+            return response
+        key = response_key(
+            self.cache_namespace,
+            version,
+            request,
+            f"{self.action}:{renderer_format}:{sorted(kwargs.items())}",
+            self.cache_query_params,
+        )
+        data = cache.get(key)
+        if data is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            data = response.data
+            cache.set(key, data, self.cache_timeout)
+        return Response(data, headers=headers)
@@ -1,5 +1,71 @@
-from rest_framework.pagination import PageNumberPagination
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.pagination import (BasePagination, CursorPagination,
+                                       PageNumberPagination)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPageNumberPagination(PageNumberPagination):
     page_size_query_param = 'limit'
+
+
+class CustomCursorPagination(CursorPagination):
+    page_size_query_param = 'limit'
+    ordering = '-id'
+    pagination_query_param = 'pagination'
+    pagination_query_value = 'cursor'
+
+    @classmethod
+    def is_requested(cls, request):
+        return (
+            request.query_params.get(cls.pagination_query_param)
+            == cls.pagination_query_value
+            or cls.cursor_query_param in request.query_params
+        )
+
+
+class FeedPagination(BasePagination):
+    """Keyset-пагинация ленты: cursor — id последнего показанного рецепта."""
+
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.REST_FRAMEWORK['PAGE_SIZE']
+        return min(max(size, 1), self.max_page_size)
+
+    def get_cursor(self, request):
+        try:
+            return int(request.query_params[self.cursor_query_param])
+        except (KeyError, ValueError):
+            return None
+
+    def paginate_ids(self, get_ids, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ids = get_ids(self.get_cursor(request), self.page_size + 1)
+        self.next_cursor = (
+            ids[self.page_size - 1] if len(ids) > self.page_size else None
+        )
+        return ids[:self.page_size]
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.next_cursor,
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
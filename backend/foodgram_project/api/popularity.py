@@ -0,0 +1,103 @@
+from itertools import islice
+from time import time
+
+from django.conf import settings
+from django.db.models import F, Value
+from django.db.models.functions import Greatest, Power
+
+from recipes.models import Favorite, Recipe, RecipeScore, ShoppingCart
+
+BATCH_SIZE = 1000
+DAY = 24 * 60 * 60
+
+WEIGHTS = {
+    Favorite: settings.RECIPE_SCORE_WEIGHTS["favorite"],
+    ShoppingCart: settings.RECIPE_SCORE_WEIGHTS["shopping_cart"],
+}
+HALF_LIVES = {
+    field: days * DAY
+    for field, days in settings.RECIPE_SCORE_HALF_LIFE_DAYS.items()
+}
+
+
+def decayed(field, now):
+    """Значение оценки, приведённое от decayed_at ко времени now.
+
+    В UPDATE обе части берутся из старой версии строки, поэтому выражение
+    можно присваивать вместе с новым decayed_at.
+    """
+    return F(field) * Power(
+        Value(0.5), (Value(now) - F("decayed_at")) / Value(HALF_LIVES[field])
+    )
+
+
+def change_score(instance, sign):
+    """Добавляет или снимает вес отметки одним UPDATE, заодно применяя
+    затухание, накопленное строкой с прошлого пересчёта."""
+    weight = sign * WEIGHTS[type(instance)]
+    now = time()
+    updated = RecipeScore.objects.filter(recipe=instance.recipe_id).update(
+        decayed_at=now,
+        **{
+            field: Greatest(decayed(field, now) + weight, Value(0.0))
+            for field in HALF_LIVES
+        },
+    )
+    if not updated and weight > 0:
+        RecipeScore.objects.bulk_create(
+            [
+                RecipeScore(
+                    recipe_id=instance.recipe_id,
+                    decayed_at=now,
+                    **{field: weight for field in HALF_LIVES},
+                )
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def create_score(recipe):
+    RecipeScore.objects.get_or_create(
+        recipe=recipe, defaults={"decayed_at": time()}
+    )
+
+
+def decay_scores():
+    """Приводит все оценки к текущему моменту, чтобы рецепты без новых
+    отметок опускались в рейтинге."""
+    now = time()
+    return RecipeScore.objects.update(
+        decayed_at=now,
+        **{field: decayed(field, now) for field in HALF_LIVES},
+    )
+
+
+def rebuild_scores():
+    """Строит оценки заново по счётчикам рецептов.
+
+    Время отметок не хранится, поэтому все существующие отметки считаются
+    сделанными сейчас.
+    """
+    now = time()
+    RecipeScore.objects.all().delete()
+    rows = Recipe.objects.values_list(
+        "id", "favorites_count", "shopping_cart_count"
+    ).iterator()
+    batch = list(islice(rows, BATCH_SIZE))
+    while batch:
+        scores = []
+        for recipe, favorites, shopping_cart in batch:
+            score = (
+                favorites * WEIGHTS[Favorite]
+                + shopping_cart * WEIGHTS[ShoppingCart]
+            )
+            scores.append(
+                RecipeScore(
+                    recipe_id=recipe,
+                    decayed_at=now,
+                    **{field: score for field in HALF_LIVES},
+                )
+            )
+        RecipeScore.objects.bulk_create(scores)
+        batch = list(islice(rows, BATCH_SIZE))
+    return RecipeScore.objects.count()
@@ -0,0 +1,38 @@
+from contextlib import contextmanager
+
+from .instrumentation import QueryRecorder
+
+QUERY_BUDGETS = {
+    "recipes-list": 5,
+    "recipes-detail": 4,
+    "recipes-download-shopping-cart": 1,
+    "recipes-shopping-list": 1,
+    "recipes-feed": 6,
+    "users-list": 2,
+    "users-subscriptions": 3,
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(name, budget=None):
+    """Падает, если запросов к БД в блоке больше, чем заявлено для name.
+
+    Бюджеты указаны без запроса аутентификации по токену.
+    """
+    if budget is None:
+        budget = QUERY_BUDGETS[name]
+    with QueryRecorder() as recorder:
+        yield recorder
+    if recorder.count > budget:
+        queries = "\n".join(
+            f"  x{item['count']} {item['sql']}"
+            for item in recorder.as_dict()["repeated"]
+        )
+        raise QueryBudgetExceeded(
+            f"{name}: {recorder.count} запросов при бюджете {budget}"
+            + (f"\nПовторяющиеся запросы:\n{queries}" if queries else "")
+        )
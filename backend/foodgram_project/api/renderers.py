@@ -0,0 +1,52 @@
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson.
+
+    Типы, которых orjson не знает (ленивые строки, Decimal, QuerySet),
+    передаются энкодеру DRF. orjson умеет только отступ в два пробела,
+    поэтому любой запрошенный отступ даёт его.
+    """
+
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        option = orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=self.encoder.default, option=option)
+
+
+class ShoppingListRenderer(BaseRenderer):
+    """Выбирает формат списка покупок через ?format= или заголовок Accept.
+
+    Сам список собирается во вьюхе потоково, через рендер проходят
+    только ответы с ошибками.
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = "\n".join(f"{key}: {value}" for key, value in data.items())
+        return str(data).encode("utf-8")
+
+
+class PlainTextRenderer(ShoppingListRenderer):
+    media_type = "text/plain"
+    format = "txt"
+
+
+class CSVRenderer(ShoppingListRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class PDFRenderer(ShoppingListRenderer):
+    media_type = "application/pdf"
+    format = "pdf"
@@ -0,0 +1,109 @@
+import re
+
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector)
+from django.db import connection
+from django.db.models import F, Q
+
+from recipes.models import Recipe
+
+CONFIG = "russian"
+FTS_TABLE = "recipes_recipe_fts"
+TOKEN = re.compile(r"\w+")
+
+
+def search_vector():
+    return SearchVector("name", weight="A", config=CONFIG) + SearchVector(
+        "text", weight="B", config=CONFIG
+    )
+
+
+def search_substring(queryset, query):
+    return queryset.filter(Q(name__icontains=query) | Q(text__icontains=query))
+
+
+def search_postgresql(queryset, tokens):
+    search_query = SearchQuery(
+        " & ".join(f"{token}:*" for token in tokens),
+        config=CONFIG,
+        search_type="raw",
+    )
+    return (
+        queryset.filter(search_vector=search_query)
+        .annotate(rank=SearchRank(F("search_vector"), search_query))
+        .order_by("-rank", "-id")
+    )
+
+
+def search_sqlite(queryset, tokens):
+    match = " ".join(f'"{token}"*' for token in tokens)
+    return queryset.extra(
+        select={"rank": f"-bm25({FTS_TABLE}, 10.0, 1.0)"},
+        tables=[FTS_TABLE],
+        where=[
+            f"{FTS_TABLE}.rowid = {Recipe._meta.db_table}.id",
+            f"{FTS_TABLE} MATCH %s",
+        ],
+        params=[match],
+    ).order_by("-rank", "-id")
+
+
+def search_recipes(queryset, query):
+    """Поиск по названию и описанию, лучшие совпадения первыми.
+
+    Каждое слово запроса ищется как префикс. На PostgreSQL поиск идёт по
+    search_vector с GIN-индексом, на SQLite — по таблице FTS5, на
+    остальных базах — по подстроке без ранжирования.
+    """
+    query = query.strip()
+    if not query:
+        return queryset
+    if connection.vendor not in ("postgresql", "sqlite"):
+        return search_substring(queryset, query)
+    tokens = TOKEN.findall(query.casefold())
+    if not tokens:
+        return queryset.none()
+    if connection.vendor == "postgresql":
+        return search_postgresql(queryset, tokens)
+    return search_sqlite(queryset, tokens)
+
+
+def index_recipe(recipe):
+    if connection.vendor == "postgresql":
+        Recipe.objects.filter(pk=recipe.pk).update(
+            search_vector=search_vector()
+        )
+        return
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", (recipe.pk,)
+        )
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, text) "
+            "VALUES (%s, %s, %s)",
+            (recipe.pk, recipe.name, recipe.text),
+        )
+
+
+def unindex_recipe(pk):
+    """На PostgreSQL вектор удаляется вместе со строкой рецепта."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", (pk,))
+
+
+def rebuild_index():
+    if connection.vendor == "postgresql":
+        Recipe.objects.update(search_vector=search_vector())
+        return
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, text) "
+            f"SELECT id, name, text FROM {Recipe._meta.db_table}"
+        )
@@ -1,15 +1,67 @@
+from collections import OrderedDict
+
 from django.contrib.auth import authenticate
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from djoser.serializers import (TokenCreateSerializer, UserCreateSerializer,
                                 UserSerializer)
-from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 
 from recipes.models import (Amount, Favorite, Ingredient, Recipe, ShoppingCart,
-                            Tag)
+                            ShoppingListItem, Tag)
 from users.models import Subscription, User
 
+from .fields import RecipeImageField, RecipeImageVariantsField
+from .shopping_list import recipe_changed
+
+VIEWER_RELATIONS = {
+    "subscriptions": (Subscription, "subscriber", "user_id"),
+    "favorites": (Favorite, "user", "recipe_id"),
+    "shopping_cart": (ShoppingCart, "user", "recipe_id"),
+}
+
+
+def get_viewer_ids(request, relation):
+    """Id авторов или рецептов, связанных с текущим пользователем.
+
+    Загружаются одним запросом и запоминаются на объекте запроса, так что
+    все сериализаторы одного ответа делят один набор.
+    """
+    memo = getattr(request, "_viewer_ids", None)
+    if memo is None:
+        memo = request._viewer_ids = {}
+    if relation not in memo:
+        model, field, column = VIEWER_RELATIONS[relation]
+        memo[relation] = set(
+            model.objects.filter(**{field: request.user}).values_list(
+                column, flat=True
+            )
+        )
+    return memo[relation]
+
+
+class SparseFieldsSerializerMixin:
+    """Оставляет поля из context["fields"] (см. SparseFieldsMixin).
+
+    Действует только на сериализатор верхнего уровня ответа: вложенные
+    сериализаторы отдаются целиком.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get("fields")
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if not requested or parent is not None:
+            return fields
+        return OrderedDict(
+            (name, field) for name, field in fields.items()
+            if name in requested
+        )
+
 
-class CustomUserSerializer(UserSerializer):
+class CustomUserSerializer(SparseFieldsSerializerMixin, UserSerializer):
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
@@ -24,10 +76,12 @@ class CustomUserSerializer(UserSerializer):
         )
 
     def get_is_subscribed(self, obj):
-        user = self.context.get("request").user
-        if user.is_anonymous:
+        request = self.context.get("request")
+        if request.user.is_anonymous:
             return False
-        return Subscription.objects.filter(subscriber=user, user=obj).exists()
+        if hasattr(obj, "is_subscribed"):
+            return obj.is_subscribed
+        return obj.pk in get_viewer_ids(request, "subscriptions")
 
 
 class CustomUserCreateSerializer(UserCreateSerializer):
@@ -62,8 +116,22 @@ class IngredientAmountSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "measurement_unit", "amount")
 
 
+class ShoppingListItemSerializer(
+    SparseFieldsSerializerMixin, serializers.ModelSerializer
+):
+    id = serializers.ReadOnlyField(source="ingredient.id")
+    name = serializers.ReadOnlyField(source="ingredient.name")
+    measurement_unit = serializers.ReadOnlyField(
+        source="ingredient.measurement_unit"
+    )
+
+    class Meta:
+        model = ShoppingListItem
+        fields = ("id", "name", "measurement_unit", "total")
+
+
 class AmountSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(queryset=Ingredient.objects.all())
+    id = serializers.IntegerField()
     amount = serializers.IntegerField()
 
     class Meta:
@@ -78,7 +146,9 @@ class IngredientSerializer(serializers.ModelSerializer):
         read_only_fields = ("__all__",)
 
 
-class RecipeListSerializer(serializers.ModelSerializer):
+class RecipeListSerializer(
+    SparseFieldsSerializerMixin, serializers.ModelSerializer
+):
     tags = TagSerializer(read_only=True, many=True)
     author = CustomUserSerializer(read_only=True)
     ingredients = IngredientAmountSerializer(
@@ -87,33 +157,41 @@ class RecipeListSerializer(serializers.ModelSerializer):
     )
     is_favorited = serializers.SerializerMethodField(read_only=True)
     is_in_shopping_cart = serializers.SerializerMethodField(read_only=True)
+    image = RecipeImageField(read_only=True)
+    images = RecipeImageVariantsField(source="image")
 
     class Meta:
         model = Recipe
-        fields = "__all__"
+        exclude = (
+            "image_variants",
+            "favorites_count",
+            "shopping_cart_count",
+            "search_vector",
+        )
 
     def get_is_favorited(self, obj):
         request = self.context.get("request")
         user = request.user
         if user.is_anonymous:
             return False
-        return Favorite.objects.filter(user=request.user, recipe=obj).exists()
+        if hasattr(obj, "is_favorited"):
+            return obj.is_favorited
+        return obj.pk in get_viewer_ids(request, "favorites")
 
     def get_is_in_shopping_cart(self, obj):
         request = self.context.get("request")
         user = request.user
         if user.is_anonymous:
             return False
-        return ShoppingCart.objects.filter(
-            user=request.user,
-            recipe=obj
-        ).exists()
+        if hasattr(obj, "is_in_shopping_cart"):
+            return obj.is_in_shopping_cart
+        return obj.pk in get_viewer_ids(request, "shopping_cart")
 
 
 class RecipeSerializer(serializers.ModelSerializer):
     ingredients = AmountSerializer(many=True)
     cooking_time = serializers.IntegerField(required=True)
-    image = Base64ImageField()
+    image = RecipeImageField()
 
     class Meta:
         model = Recipe
@@ -127,40 +205,41 @@ class RecipeSerializer(serializers.ModelSerializer):
         )
 
     def validate(self, data):
+        errors = {}
         ingredients = data["ingredients"]
         if not ingredients:
-            raise serializers.ValidationError(
-                {"ingredient:": "Список ингридиентов не может быть пустым."}
+            errors["ingredient:"] = "Список ингридиентов не может быть пустым."
+        ids = [ingredient["id"] for ingredient in ingredients]
+        found = Ingredient.objects.in_bulk(set(ids))
+        if len(set(ids)) != len(ids):
+            errors["ingredient"] = ["Ингредиенты должны быть уникальными."]
+        missing = [pk for pk in dict.fromkeys(ids) if pk not in found]
+        if missing:
+            errors.setdefault("ingredient", []).append(
+                "Ингредиенты не найдены: "
+                + ", ".join(str(pk) for pk in missing)
+            )
+        if any(ingredient["amount"] <= 0 for ingredient in ingredients):
+            errors["amount"] = (
+                "Количество ингредиентов должно быть больше нуля."
             )
-        ingredients_list = []
-        for ingredient in ingredients:
-            ingredient_id = ingredient['id']
-            if ingredient_id in ingredients_list:
-                raise serializers.ValidationError({
-                    'ingredient': 'Ингредиенты должны быть уникальными.'
-                })
-            ingredients_list.append(ingredient_id)
-            amount = ingredient['amount']
-            if int(amount) <= 0:
-                raise serializers.ValidationError({
-                    'amount':
-                    'Количество ингредиентов должно быть больше нуля.'
-                })
         if data["cooking_time"] < 0:
-            raise serializers.ValidationError({
-                "cooking_time":
+            errors["cooking_time"] = (
                 "Время приготовления не может быть отрицательным."
-            })
-        name = data["name"]
-        author = self.context.get("request").user
+            )
         if (
-            Recipe.objects.filter(name=name, author=author).exists()
-            and self.context.get("request").method != 'PATCH'
+            self.instance is None
+            and Recipe.objects.filter(
+                name=data["name"], author=self.context.get("request").user
+            ).exists()
         ):
-            raise serializers.ValidationError({
-                "validation_error:":
+            errors["validation_error:"] = (
                 "Вы уже создавали рецепт с таким названием."
-            })
+            )
+        if errors:
+            raise serializers.ValidationError(errors)
+        for ingredient in ingredients:
+            ingredient["id"] = found[ingredient["id"]]
         return data
 
     @staticmethod
@@ -176,6 +255,43 @@ class RecipeSerializer(serializers.ModelSerializer):
             ]
         )
 
+    @classmethod
+    def update_amounts(cls, recipe, amounts):
+        """Применяет к рецепту только разницу между старым и новым
+        списком ингредиентов."""
+        stored = {
+            amount.ingredient_id: amount
+            for amount in Amount.objects.filter(recipe=recipe)
+        }
+        submitted = {amount["id"].pk: amount for amount in amounts}
+        removed = stored.keys() - submitted.keys()
+        if removed:
+            Amount.objects.filter(
+                recipe=recipe, ingredient_id__in=removed
+            ).delete()
+        changed = []
+        for ingredient_id, amount in stored.items():
+            new_amount = submitted.get(ingredient_id, {}).get("amount")
+            if new_amount is not None and amount.amount != new_amount:
+                amount.amount = new_amount
+                changed.append(amount)
+        if changed:
+            Amount.objects.bulk_update(changed, ["amount"])
+        added = [
+            amount
+            for ingredient_id, amount in submitted.items()
+            if ingredient_id not in stored
+        ]
+        if added:
+            cls.create_amounts(recipe, added)
+        if changed or added:
+            recipe_changed(
+                recipe.pk,
+                [amount.ingredient_id for amount in changed]
+                + [amount["id"].pk for amount in added],
+            )
+
+    @transaction.atomic
     def create(self, validated_data):
         user = self.context.get("request").user
         amounts = validated_data.pop("ingredients")
@@ -185,22 +301,31 @@ class RecipeSerializer(serializers.ModelSerializer):
         self.create_amounts(recipe, amounts)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         amounts = validated_data.pop("ingredients")
         tags = validated_data.pop("tags")
-        Amount.objects.filter(recipe=instance).delete()
-        instance.tags.clear()
         instance.tags.set(tags)
-        self.create_amounts(instance, amounts)
+        self.update_amounts(instance, amounts)
         return super().update(instance, validated_data)
 
     def to_representation(self, instance):
         request = self.context.get("request")
         context = {"request": request}
+        prefetch_related_objects(
+            [instance],
+            "tags",
+            Prefetch(
+                "ingredient_recipe",
+                queryset=Amount.objects.select_related("ingredient"),
+            ),
+        )
         return RecipeListSerializer(instance, context=context).data
 
 
 class SmallRecipeSerializer(serializers.ModelSerializer):
+    image = RecipeImageField(read_only=True, variant="thumbnail")
+
     class Meta:
         model = Recipe
         fields = ("id", "name", "image", "cooking_time")
@@ -265,7 +390,7 @@ class SubscriptionSerializer(CustomSerializer):
 
 class SubscriptionListSerializer(CustomUserSerializer):
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
+    recipes_count = serializers.ReadOnlyField()
 
     class Meta:
         model = User
@@ -280,13 +405,25 @@ class SubscriptionListSerializer(CustomUserSerializer):
             "recipes_count",
         )
 
+    @staticmethod
+    def parse_recipes_limit(request):
+        try:
+            limit = int(request.query_params.get("recipes_limit", 0))
+        except (AttributeError, ValueError):
+            return None
+        return limit if limit > 0 else None
+
     def get_recipes(self, obj):
-        recipes = obj.recipes.only("id", "name", "image", "cooking_time")
+        recipes = getattr(obj, "recipes_page", None)
+        if recipes is None:
+            recipes = obj.recipes.only(
+                "id", "name", "image", "image_variants", "cooking_time"
+            ).order_by("-id")
+            limit = self.parse_recipes_limit(self.context.get("request"))
+            if limit:
+                recipes = recipes[:limit]
         return SmallRecipeSerializer(recipes, many=True).data
 
-    def get_recipes_count(self, obj):
-        return obj.recipes.count()
-
 
 class CustomTokenCreateSerializer(TokenCreateSerializer):
     email = serializers.CharField(
@@ -0,0 +1,247 @@
+import csv
+import os
+from io import BytesIO
+from itertools import islice
+from threading import local
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from recipes.models import Amount, ShoppingCart, ShoppingListItem
+from users.models import User
+
+CSV_HEADER = ("Ингредиент", "Единица измерения", "Количество")
+PDF_TITLE = "Список покупок"
+PDF_FONT = "ShoppingListFont"
+BATCH_SIZE = 1000
+USER_BATCH_SIZE = 100
+
+_pending = local()
+
+
+def get_shopping_list(user):
+    return (
+        ShoppingListItem.objects.filter(user=user)
+        .values("ingredient__name", "ingredient__measurement_unit", "total")
+        .order_by("ingredient__name", "ingredient__measurement_unit")
+    )
+
+
+def cart_totals(users=None, ingredients=None):
+    """Строки (пользователь, ингредиент, сумма) по рецептам из корзин."""
+    carts = {"recipe__shopping_cart__isnull": False}
+    if users is not None:
+        carts = {"recipe__shopping_cart__user__in": users}
+    amounts = Amount.objects.filter(**carts)
+    if ingredients is not None:
+        amounts = amounts.filter(ingredient__in=ingredients)
+    return (
+        amounts.values_list("recipe__shopping_cart__user", "ingredient")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+
+
+def create_items(rows):
+    rows = iter(rows)
+    batch = list(islice(rows, BATCH_SIZE))
+    while batch:
+        ShoppingListItem.objects.bulk_create(
+            ShoppingListItem(
+                user_id=user, ingredient_id=ingredient, total=total
+            )
+            for user, ingredient, total in batch
+        )
+        batch = list(islice(rows, BATCH_SIZE))
+
+
+def refresh_items(users, ingredients=None):
+    """Пересчитывает строки списков покупок users по ingredients (по всем,
+    если не заданы) из их корзин.
+
+    Строки пользователей блокируются, так что одновременные изменения
+    одной корзины пересчитываются по очереди.
+    """
+    with transaction.atomic():
+        users = list(
+            User.objects.select_for_update()
+            .filter(pk__in=users)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        if not users:
+            return
+        items = ShoppingListItem.objects.filter(user__in=users)
+        if ingredients is not None:
+            items = items.filter(ingredient__in=ingredients)
+        items.delete()
+        create_items(cart_totals(users, ingredients).iterator())
+
+
+def refresh_carts(recipe_id, ingredients=None):
+    """Пересчитывает списки всех, у кого рецепт в корзине.
+
+    Пользователи берутся пачками по USER_BATCH_SIZE, и каждая пачка
+    пересчитывается в своей короткой транзакции, так что популярный
+    рецепт не держит блокировки на всех сразу.
+    """
+    carts = (
+        ShoppingCart.objects.filter(recipe=recipe_id)
+        .order_by("user")
+        .values_list("user", flat=True)
+    )
+    batch = list(carts[:USER_BATCH_SIZE])
+    while batch:
+        refresh_items(batch, ingredients)
+        batch = list(carts.filter(user__gt=batch[-1])[:USER_BATCH_SIZE])
+
+
+def recipe_ingredients(recipe_ids):
+    return set(
+        Amount.objects.filter(recipe__in=recipe_ids).values_list(
+            "ingredient", flat=True
+        )
+    )
+
+
+def get_pending():
+    if not hasattr(_pending, "carts"):
+        _pending.carts, _pending.recipes = {}, {}
+    return _pending
+
+
+def flush_changes():
+    pending = get_pending()
+    carts, recipes = pending.carts, pending.recipes
+    if not carts and not recipes:
+        return
+    pending.carts, pending.recipes = {}, {}
+    for user, (recipe_ids, known) in carts.items():
+        ingredients = known | recipe_ingredients(recipe_ids)
+        if ingredients:
+            refresh_items([user], ingredients)
+    for recipe, ingredients in recipes.items():
+        refresh_carts(recipe, ingredients)
+
+
+def cart_changed(cart, ingredients=()):
+    """Пересчитывает после фиксации список покупок владельца корзины.
+
+    После фиксации видны и сама корзина, и последние ингредиенты
+    рецепта, даже если их меняли в соседней транзакции. ingredients —
+    ингредиенты, прочитанные до удаления корзины: рецепт может
+    удаляться вместе с ней.
+    """
+    recipes, known = get_pending().carts.setdefault(
+        cart.user_id, (set(), set())
+    )
+    recipes.add(cart.recipe_id)
+    known.update(ingredients)
+    transaction.on_commit(flush_changes)
+
+
+def recipe_changed(recipe_id, ingredients=None):
+    """Пересчитывает после фиксации списки покупок всех, у кого рецепт в
+    корзине. ingredients=None — по всем ингредиентам."""
+    recipes = get_pending().recipes
+    known = recipes.get(recipe_id, set())
+    if ingredients is None or known is None:
+        recipes[recipe_id] = None
+    else:
+        recipes[recipe_id] = known | set(ingredients)
+    transaction.on_commit(flush_changes)
+
+
+def rebuild_shopping_lists():
+    ShoppingListItem.objects.all().delete()
+    create_items(cart_totals().iterator())
+    return ShoppingListItem.objects.count()
+
+
+def repair_shopping_lists(dry_run=False):
+    """Сверяет списки покупок с корзинами и пересчитывает разошедшиеся.
+
+    Возвращает число пользователей, у которых нашлись расхождения.
+    """
+    broken = 0
+    users = (
+        User.objects.order_by("pk").values_list("pk", flat=True).iterator()
+    )
+    batch = list(islice(users, BATCH_SIZE))
+    while batch:
+        actual = set(cart_totals(batch))
+        stored = set(
+            ShoppingListItem.objects.filter(user__in=batch).values_list(
+                "user", "ingredient", "total"
+            )
+        )
+        drift = {user for user, _, _ in actual ^ stored}
+        if drift and not dry_run:
+            refresh_items(drift)
+        broken += len(drift)
+        batch = list(islice(users, BATCH_SIZE))
+    return broken
+
+
+def iter_rows(shopping_list):
+    for item in shopping_list.iterator():
+        yield (
+            item["ingredient__name"],
+            item["ingredient__measurement_unit"],
+            item["total"],
+        )
+
+
+def stream_txt(shopping_list):
+    for name, unit, total in iter_rows(shopping_list):
+        yield f"{name}({unit}) - {total}\n"
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(shopping_list):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for row in iter_rows(shopping_list):
+        yield writer.writerow(row)
+
+
+def get_pdf_font():
+    if PDF_FONT in pdfmetrics.getRegisteredFontNames():
+        return PDF_FONT
+    font_path = getattr(settings, "SHOPPING_LIST_FONT", None)
+    if not font_path or not os.path.exists(font_path):
+        return "Helvetica"
+    pdfmetrics.registerFont(TTFont(PDF_FONT, font_path))
+    return PDF_FONT
+
+
+def build_pdf(shopping_list):
+    font = get_pdf_font()
+    buffer = BytesIO()
+    page = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    margin = 50
+    line_height = 18
+    page.setFont(font, 16)
+    page.drawString(margin, height - margin, PDF_TITLE)
+    y = height - margin - 2 * line_height
+    page.setFont(font, 12)
+    for name, unit, total in iter_rows(shopping_list):
+        if y < margin:
+            page.showPage()
+            page.setFont(font, 12)
+            y = height - margin
+        page.drawString(margin, y, f"{name} ({unit}) - {total}")
+        y -= line_height
+    page.save()
+    buffer.seek(0)
+    return buffer
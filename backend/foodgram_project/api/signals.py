@@ -0,0 +1,267 @@
+from functools import partial
+from threading import local
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from recipes.models import (Amount, Favorite, Ingredient, Recipe, ShoppingCart,
+                            Tag)
+from users.models import Subscription, User
+
+from .authentication import token_cache
+from .cache import (INGREDIENTS, RECIPES, SCORES, TAGS, bump_version,
+                    recipe_namespace, version_key, viewer_namespace)
+from .counters import change_counter
+from .feed import backfill, fan_out, prune
+from .images import needs_processing, schedule
+from .ingredient_index import ingredient_index
+from .popularity import change_score, create_score
+from .search import index_recipe, unindex_recipe
+from .shopping_list import cart_changed, recipe_changed, recipe_ingredients
+
+AUTHOR_FIELDS = {"email", "username", "first_name", "last_name"}
+LOGIN_FIELDS = {"last_login"}
+
+
+_pending = local()
+
+
+def flush_recipe_versions():
+    changed = getattr(_pending, "changed", None)
+    deleted = getattr(_pending, "deleted", None)
+    if not changed and not deleted:
+        return
+    touched = _pending.touched - deleted
+    _pending.changed, _pending.deleted, _pending.touched = set(), set(), set()
+    if touched:
+        Recipe.objects.filter(pk__in=touched).update(modified=timezone.now())
+    for pk in changed - deleted:
+        bump_version(recipe_namespace(pk))
+    cache.delete_many(
+        [version_key(recipe_namespace(pk)) for pk in deleted]
+    )
+    bump_version(RECIPES)
+
+
+def invalidate_recipes(*pks, deleted=False, touched=False):
+    """Сбрасывает кэш рецептов после фиксации транзакции.
+
+    touched — изменились связанные данные рецепта, а не его строка, и
+    поле modified нужно сдвинуть отдельно.
+    """
+    if not hasattr(_pending, "changed"):
+        _pending.changed, _pending.deleted = set(), set()
+        _pending.touched = set()
+    (_pending.deleted if deleted else _pending.changed).update(pks)
+    if touched:
+        _pending.touched.update(pks)
+    transaction.on_commit(flush_recipe_versions)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_ingredients(**kwargs):
+    bump_version(INGREDIENTS)
+    ingredient_index.invalidate()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tags(**kwargs):
+    bump_version(TAGS)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(pre_delete, sender=Ingredient)
+def touch_ingredient_recipes(instance, created=False, **kwargs):
+    """Кэш рецептов сбрасывает версия INGREDIENTS, а modified, от которого
+    зависит Last-Modified, нужно сдвинуть у рецептов с ингредиентом."""
+    if not created:
+        Recipe.objects.filter(ingredient_recipe__ingredient=instance).update(
+            modified=timezone.now()
+        )
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def touch_tag_recipes(instance, created=False, **kwargs):
+    if not created:
+        Recipe.objects.filter(tags=instance).update(modified=timezone.now())
+
+
+@receiver(post_save, sender=Recipe)
+def invalidate_recipe(instance, **kwargs):
+    invalidate_recipes(instance.pk)
+
+
+@receiver(post_save, sender=Recipe)
+def schedule_recipe_image(instance, **kwargs):
+    if needs_processing(instance):
+        schedule(instance.pk)
+
+
+@receiver(post_save, sender=Recipe)
+def index_recipe_text(instance, **kwargs):
+    index_recipe(instance)
+
+
+@receiver(post_delete, sender=Recipe)
+def unindex_recipe_text(instance, **kwargs):
+    unindex_recipe(instance.pk)
+
+
+@receiver(post_delete, sender=Recipe)
+def forget_recipe(instance, **kwargs):
+    invalidate_recipes(instance.pk, deleted=True)
+
+
+@receiver(post_save, sender=Amount)
+@receiver(post_delete, sender=Amount)
+def invalidate_recipe_amount(instance, **kwargs):
+    invalidate_recipes(instance.recipe_id, touched=True)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipe_tags(instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith("post_"):
+            invalidate_recipes(instance.pk, touched=True)
+    elif action == "pre_clear":
+        invalidate_recipes(
+            *instance.recipe_set.values_list("pk", flat=True), touched=True
+        )
+    elif action in ("post_add", "post_remove"):
+        invalidate_recipes(*pk_set, touched=True)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_recipes(instance, created, update_fields, **kwargs):
+    if created or (
+        update_fields is not None
+        and not AUTHOR_FIELDS.intersection(update_fields)
+    ):
+        return
+    pks = list(instance.recipes.values_list("pk", flat=True))
+    if pks:
+        invalidate_recipes(*pks, touched=True)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_delete, sender=ShoppingCart)
+def invalidate_viewer(instance, **kwargs):
+    transaction.on_commit(
+        lambda: bump_version(viewer_namespace(instance.user_id))
+    )
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_subscriber(instance, **kwargs):
+    transaction.on_commit(
+        lambda: bump_version(viewer_namespace(instance.subscriber_id))
+    )
+
+
+@receiver(post_delete, sender=Token)
+def forget_token(instance, **kwargs):
+    token_cache.forget(instance.key)
+    transaction.on_commit(partial(token_cache.invalidate, instance.key))
+
+
+@receiver(post_save, sender=User)
+def forget_user_token(instance, created, update_fields, **kwargs):
+    if created or (
+        update_fields is not None and LOGIN_FIELDS.issuperset(update_fields)
+    ):
+        return
+    keys = list(
+        Token.objects.filter(user=instance).values_list("key", flat=True)
+    )
+    if keys:
+        token_cache.forget(*keys)
+        transaction.on_commit(partial(token_cache.invalidate, *keys))
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Subscription)
+def increment_counter(instance, created, **kwargs):
+    if created:
+        change_counter(instance, 1)
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Subscription)
+def decrement_counter(instance, **kwargs):
+    change_counter(instance, -1)
+
+
+@receiver(post_save, sender=Recipe)
+def fan_out_recipe(instance, created, **kwargs):
+    if created:
+        fan_out(instance)
+
+
+@receiver(post_save, sender=Subscription)
+def backfill_feed(instance, created, **kwargs):
+    if created:
+        backfill(instance)
+
+
+@receiver(post_delete, sender=Subscription)
+def prune_feed(instance, **kwargs):
+    prune(instance)
+
+
+@receiver(post_save, sender=Recipe)
+def create_recipe_score(instance, created, **kwargs):
+    if created:
+        create_score(instance)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+def raise_score(instance, created, **kwargs):
+    if created:
+        change_score(instance, 1)
+        transaction.on_commit(partial(bump_version, SCORES))
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+def lower_score(instance, **kwargs):
+    change_score(instance, -1)
+    transaction.on_commit(partial(bump_version, SCORES))
+
+
+@receiver(post_save, sender=ShoppingCart)
+def add_to_shopping_list(instance, created, **kwargs):
+    if created:
+        cart_changed(instance)
+
+
+@receiver(pre_delete, sender=ShoppingCart)
+def remove_from_shopping_list(instance, **kwargs):
+    cart_changed(instance, recipe_ingredients([instance.recipe_id]))
+
+
+@receiver(post_save, sender=Amount)
+def update_shopping_lists(instance, created, **kwargs):
+    recipe_changed(
+        instance.recipe_id, [instance.ingredient_id] if created else None
+    )
+
+
+@receiver(post_delete, sender=Amount)
+def shrink_shopping_lists(instance, **kwargs):
+    recipe_changed(instance.recipe_id, [instance.ingredient_id])
@@ -0,0 +1,73 @@
+import base64
+from io import BytesIO
+from itertools import count
+from tempfile import TemporaryDirectory
+
+from django.test import override_settings
+from PIL import Image
+
+from recipes.models import Amount, Ingredient, Recipe, Tag
+from users.models import User
+
+PASSWORD = "Tomato-Basil-42"
+
+_sequence = count()
+
+
+def create_user(**fields):
+    number = next(_sequence)
+    fields.setdefault("username", f"user{number}")
+    fields.setdefault("email", f"user{number}@example.com")
+    fields.setdefault("first_name", "Имя")
+    fields.setdefault("last_name", "Фамилия")
+    return User.objects.create_user(password=PASSWORD, **fields)
+
+
+def create_tag(**fields):
+    number = next(_sequence)
+    fields.setdefault("name", f"Тэг {number}")
+    fields.setdefault("slug", f"tag{number}")
+    fields.setdefault("color", "#E26C2D")
+    return Tag.objects.create(**fields)
+
+
+def create_ingredient(**fields):
+    number = next(_sequence)
+    fields.setdefault("name", f"ингредиент {number}")
+    fields.setdefault("measurement_unit", "г")
+    return Ingredient.objects.create(**fields)
+
+
+def create_recipe(author, ingredients=None, tags=(), **fields):
+    """ingredients — словарь {ингредиент: количество}."""
+    number = next(_sequence)
+    fields.setdefault("name", f"Рецепт {number}")
+    fields.setdefault("text", "Описание")
+    fields.setdefault("cooking_time", 10)
+    recipe = Recipe.objects.create(author=author, **fields)
+    recipe.tags.set(tags)
+    for ingredient, amount in (ingredients or {}).items():
+        Amount.objects.create(
+            recipe=recipe, ingredient=ingredient, amount=amount
+        )
+    return recipe
+
+
+def encode_image(image_format="PNG", size=(800, 600)):
+    buffer = BytesIO()
+    Image.new("RGB", size, "orange").save(buffer, image_format)
+    data = base64.b64encode(buffer.getvalue()).decode()
+    return f"data:image/{image_format.lower()};base64,{data}"
+
+
+def use_temporary_media(test_case):
+    """Сохраняет загрузки теста во временную папку и обрабатывает
+    картинки сразу, без фоновых потоков. Возвращает путь к папке."""
+    media = TemporaryDirectory()
+    test_case.addCleanup(media.cleanup)
+    settings = override_settings(
+        MEDIA_ROOT=media.name, RECIPE_IMAGE_WORKERS=0
+    )
+    settings.enable()
+    test_case.addCleanup(settings.disable)
+    return media.name
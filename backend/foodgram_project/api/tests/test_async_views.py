@@ -0,0 +1,87 @@
+import asyncio
+from importlib import reload
+
+from django.core.cache import cache
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from django.urls import clear_url_caches, resolve, reverse
+from rest_framework.authtoken.models import Token
+
+from api import async_views, urls
+from foodgram_project import urls as root_urls
+from recipes.models import Recipe
+
+from .factories import create_recipe, create_tag, create_user
+
+
+def load_urls(async_read_views):
+    # Корневой urls.py держит вложенный резолвер api/ со своим кэшем
+    # маршрутов, поэтому перезагружается вслед за api.urls.
+    with override_settings(ASYNC_READ_VIEWS=async_read_views):
+        reload(urls)
+        reload(root_urls)
+    clear_url_caches()
+
+
+class AsyncReadViewsTest(TransactionTestCase):
+    """Чтение идёт в потоках пула со своими соединениями, поэтому данные
+    теста должны быть зафиксированы: TransactionTestCase."""
+
+    def setUp(self):
+        cache.clear()
+        load_urls(True)
+        self.addCleanup(load_urls, False)
+        self.author = create_user()
+        self.token = Token.objects.create(user=self.author)
+        self.tag = create_tag(name="Ужин")
+        self.recipe = create_recipe(self.author, tags=[self.tag], name="Рагу")
+        self.client = AsyncClient()
+
+    def test_routes_use_async_views(self):
+        for path, view in (
+            (reverse("api:recipes-list"), async_views.recipe_list),
+            (
+                reverse("api:recipes-detail", args=[self.recipe.pk]),
+                async_views.recipe_detail,
+            ),
+            (reverse("api:tags-list"), async_views.tag_list),
+        ):
+            with self.subTest(path=path):
+                self.assertIs(resolve(path).func, view)
+
+    async def test_reads(self):
+        response = await self.client.get(reverse("api:recipes-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [recipe["name"] for recipe in response.json()["results"]],
+            ["Рагу"],
+        )
+        response = await self.client.get(
+            reverse("api:tags-detail", args=[self.tag.pk])
+        )
+        self.assertEqual(response.json()["name"], "Ужин")
+
+    async def test_concurrent_reads(self):
+        url = reverse("api:recipes-detail", args=[self.recipe.pk])
+        responses = await asyncio.gather(
+            *(self.client.get(url) for _ in range(8))
+        )
+        self.assertEqual(
+            {response.status_code for response in responses}, {200}
+        )
+
+    async def test_writes_go_through_sync_view(self):
+        response = await self.client.delete(
+            reverse("api:recipes-detail", args=[self.recipe.pk]),
+            authorization=f"Token {self.token.key}",
+        )
+        self.assertEqual(response.status_code, 204)
+        exists = await asyncio.get_running_loop().run_in_executor(
+            None, Recipe.objects.filter(pk=self.recipe.pk).exists
+        )
+        self.assertFalse(exists)
+
+    async def test_anonymous_write_is_rejected(self):
+        response = await self.client.delete(
+            reverse("api:recipes-detail", args=[self.recipe.pk])
+        )
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,168 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api import authentication
+from api.authentication import LocalCache, token_cache
+from users.models import Subscription
+
+from .factories import PASSWORD, create_user
+
+
+@override_settings(TOKEN_CACHE_ENABLED=True, TOKEN_CACHE_SHARED=True)
+class CachedTokenAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        token_cache.local.clear()
+        self.user = create_user()
+        self.token = Token.objects.create(user=self.user)
+        self.client = self.client_for(self.token)
+
+    @staticmethod
+    def client_for(token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        return client
+
+    def get_me(self, client=None):
+        return (client or self.client).get(reverse("api:users-me"))
+
+    def test_known_token_skips_lookup(self):
+        self.assertEqual(self.get_me().status_code, 200)
+        with self.assertNumQueries(1):
+            response = self.get_me()
+        self.assertEqual(response.json()["id"], self.user.pk)
+
+    def test_each_request_gets_fresh_user(self):
+        self.get_me()
+        first = token_cache.get(self.token.key)
+        second = token_cache.get(self.token.key)
+        self.assertEqual(first.pk, self.user.pk)
+        self.assertIsNot(first, second)
+
+    def test_counters_are_not_cached(self):
+        self.get_me()
+        Subscription.objects.create(subscriber=create_user(), user=self.user)
+        with self.assertNumQueries(1):
+            user = token_cache.get(self.token.key)
+            self.assertEqual(user.subscribers_count, 1)
+
+    def test_logout_drops_only_that_token(self):
+        other = Token.objects.create(user=create_user())
+        other_client = self.client_for(other)
+        self.get_me()
+        self.get_me(other_client)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("api:logout"))
+        self.assertEqual(response.status_code, 204)
+        self.assertIsNone(token_cache.get(self.token.key))
+        self.assertIsNotNone(token_cache.get(other.key))
+        self.assertEqual(self.get_me().status_code, 401)
+
+    def test_unknown_token(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Token " + "0" * 40)
+        self.assertEqual(self.get_me(client).status_code, 401)
+        self.assertIsNone(token_cache.get("0" * 40))
+
+    def test_token_from_login(self):
+        response = APIClient().post(
+            reverse("api:login"),
+            {"email": self.user.email, "password": PASSWORD},
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Token {response.json()['auth_token']}"
+        )
+        self.assertEqual(self.get_me(client).json()["id"], self.user.pk)
+
+    def test_profile_change_is_visible(self):
+        self.get_me()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = "Пётр"
+            self.user.save()
+        self.assertEqual(self.get_me().json()["first_name"], "Пётр")
+
+    def test_deactivated_user_is_rejected(self):
+        self.get_me()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.get_me().status_code, 401)
+
+    def test_login_does_not_drop_entry(self):
+        self.get_me()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save(update_fields=["last_login"])
+        self.assertIsNotNone(token_cache.get(self.token.key))
+
+    @override_settings(TOKEN_CACHE_ENABLED=False)
+    def test_disabled_cache_always_reads_database(self):
+        self.get_me()
+        self.assertIsNone(token_cache.get(self.token.key))
+        with self.assertNumQueries(2):
+            self.get_me()
+
+    def test_password_is_not_cached(self):
+        self.get_me()
+        values = cache.get(token_cache.make_key(self.token.key))
+        self.assertNotIn("password", values)
+        user = token_cache.get(self.token.key)
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password(PASSWORD))
+
+    def test_set_password_with_cached_user(self):
+        self.get_me()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("api:users-set-password"),
+                {"current_password": PASSWORD, "new_password": "Pear-Jam-73"},
+            )
+        self.assertEqual(response.status_code, 204, response.content)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("Pear-Jam-73"))
+
+    def test_shared_entry_fills_local_cache(self):
+        self.get_me()
+        token_cache.local.clear()
+        self.assertIsNotNone(token_cache.get(self.token.key))
+        self.assertIsNotNone(token_cache.local.get(self.token.key))
+
+    @override_settings(TOKEN_CACHE_SHARED=False)
+    def test_local_cache_alone(self):
+        self.get_me()
+        self.assertIsNone(cache.get(token_cache.make_key(self.token.key)))
+        with self.assertNumQueries(1):
+            self.get_me()
+
+    def test_change_drops_local_entry_before_commit(self):
+        self.get_me()
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(token_cache.local.get(self.token.key))
+
+
+class LocalCacheTest(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        local = LocalCache(size=2, timeout=60)
+        local.set("a", 1)
+        local.set("b", 2)
+        local.get("a")
+        local.set("c", 3)
+        self.assertIsNone(local.get("b"))
+        self.assertEqual((local.get("a"), local.get("c")), (1, 3))
+
+    def test_entries_expire(self):
+        local = LocalCache(size=2, timeout=5)
+        with mock.patch.object(authentication, "monotonic", return_value=0):
+            local.set("a", 1)
+        with mock.patch.object(authentication, "monotonic", return_value=4):
+            self.assertEqual(local.get("a"), 1)
+        with mock.patch.object(authentication, "monotonic", return_value=5):
+            self.assertIsNone(local.get("a"))
+        self.assertEqual(len(local.entries), 0)
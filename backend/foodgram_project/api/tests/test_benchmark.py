@@ -0,0 +1,142 @@
+import json
+import os
+from io import StringIO
+from tempfile import TemporaryDirectory
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api.management.commands.benchmark import percentile
+from recipes.models import Amount, Favorite, Recipe, ShoppingCart
+from users.models import Subscription, User
+
+
+class PercentileTest(SimpleTestCase):
+    def test_nearest_rank(self):
+        timings = [float(value) for value in range(100, 0, -1)]
+        self.assertEqual(percentile(timings, 50), 50.0)
+        self.assertEqual(percentile(timings, 95), 95.0)
+        self.assertEqual(percentile(timings, 100), 100.0)
+
+    def test_single_value(self):
+        self.assertEqual(percentile([7.5], 95), 7.5)
+        self.assertEqual(percentile([7.5], 0), 7.5)
+
+
+def generate(**options):
+    options = {
+        "users": 6,
+        "recipes_per_user": 2,
+        "ingredients_per_recipe": 3,
+        "favorites_per_user": 3,
+        "cart_per_user": 2,
+        "subscriptions_per_user": 2,
+        "stdout": StringIO(),
+        **options,
+    }
+    call_command("generate_data", **options)
+
+
+def relations():
+    """Связи без id: в названиях рецептов id автора меняется от запуска."""
+    recipe = ("recipe__author__username", "recipe__cooking_time")
+    return {
+        model.__name__: sorted(model.objects.values_list(*fields))
+        for model, fields in (
+            (Favorite, ("user__username", *recipe)),
+            (ShoppingCart, ("user__username", *recipe)),
+            (Subscription, ("subscriber__username", "user__username")),
+        )
+    }
+
+
+class GenerateDataTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_counts(self):
+        generate()
+        self.assertEqual(User.objects.count(), 6)
+        self.assertEqual(Recipe.objects.count(), 12)
+        self.assertEqual(Amount.objects.count(), 36)
+        self.assertEqual(Favorite.objects.count(), 18)
+        self.assertEqual(ShoppingCart.objects.count(), 12)
+        self.assertEqual(Subscription.objects.count(), 12)
+        self.assertFalse(
+            Subscription.objects.filter(subscriber=F("user")).exists()
+        )
+
+    def test_counters_are_consistent(self):
+        generate()
+        for recipe in Recipe.objects.annotate(rows=Count("favorites")):
+            self.assertEqual(recipe.favorites_count, recipe.rows)
+
+    def test_same_seed_gives_same_data(self):
+        generate(seed=3)
+        first = relations()
+        generate(seed=3, clear=True)
+        self.assertEqual(relations(), first)
+        generate(seed=4, clear=True)
+        self.assertNotEqual(relations(), first)
+
+
+class BenchmarkTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_report(self):
+        generate()
+        with TemporaryDirectory() as directory:
+            output = os.path.join(directory, "report.json")
+            call_command(
+                "benchmark",
+                iterations=2,
+                warmup=0,
+                output=output,
+                stdout=StringIO(),
+            )
+            with open(output, encoding="utf-8") as file:
+                report = json.load(file)
+        self.assertEqual(report["dataset"]["Recipe"], 12)
+        self.assertTrue(report["results"])
+        for result in report["results"]:
+            with self.subTest(name=result["name"]):
+                self.assertEqual(result["status"], 200)
+                self.assertLessEqual(result["p50_ms"], result["p95_ms"])
+
+    def test_only(self):
+        generate()
+        with TemporaryDirectory() as directory:
+            output = os.path.join(directory, "report.json")
+            call_command(
+                "benchmark",
+                iterations=1,
+                warmup=0,
+                only=["tags-list"],
+                output=output,
+                stdout=StringIO(),
+            )
+            with open(output, encoding="utf-8") as file:
+                names = [item["name"] for item in json.load(file)["results"]]
+        self.assertEqual(names, ["tags-list (anonymous)"])
+
+    def test_requires_data(self):
+        with self.assertRaises(CommandError):
+            call_command("benchmark", stdout=StringIO())
+
+
+class BenchRecipeWriteTest(TestCase):
+    def test_leaves_no_files_or_rows(self):
+        with TemporaryDirectory() as media:
+            with override_settings(MEDIA_ROOT=media):
+                call_command(
+                    "bench_recipe_write",
+                    sizes=[1, 2],
+                    repeat=1,
+                    stdout=StringIO(),
+                )
+            self.assertEqual(os.listdir(media), [])
+        self.assertFalse(Recipe.objects.exists())
+        self.assertFalse(User.objects.exists())
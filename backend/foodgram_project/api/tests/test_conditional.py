@@ -0,0 +1,152 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import images
+from recipes.models import Recipe
+
+from .factories import (create_ingredient, create_recipe, create_tag,
+                        create_user)
+
+
+class LastModifiedTest(TestCase):
+    """If-Modified-Since без ETag не должен отдавать 304 после изменений,
+    которые меняют представление рецепта, не трогая его строку."""
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag = create_tag(name="Завтрак")
+            self.ingredient = create_ingredient(name="овсянка")
+            self.recipe = create_recipe(
+                create_user(), {self.ingredient: 50}, tags=[self.tag]
+            )
+        Recipe.objects.update(modified=timezone.now() - timedelta(hours=1))
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse("api:recipes-detail", args=[self.recipe.pk])
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.since = response["Last-Modified"]
+
+    def get_since(self):
+        return self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=self.since)
+
+    def test_unchanged_recipe_is_not_modified(self):
+        self.assertEqual(self.get_since().status_code, 304)
+
+    def test_tag_rename(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.name = "Обед"
+            self.tag.save()
+        response = self.get_since()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["tags"][0]["name"], "Обед")
+
+    def test_ingredient_rename(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ingredient.name = "геркулес"
+            self.ingredient.save()
+        response = self.get_since()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["ingredients"][0]["name"], "геркулес"
+        )
+
+    def test_image_variants(self):
+        Recipe.objects.filter(pk=self.recipe.pk).update(
+            image="recipes/images/oats.jpg"
+        )
+        variants = {
+            images.SOURCE: "recipes/images/oats.jpg",
+            "card": "cache/oats.webp",
+        }
+        with mock.patch.object(
+            images, "build_variants", return_value=variants
+        ):
+            images.process_recipe_image(self.recipe.pk)
+        self.assertEqual(self.get_since().status_code, 200)
+
+
+class ETagTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author = create_user()
+            self.recipe = create_recipe(
+                self.author, {create_ingredient(): 100}, tags=[create_tag()]
+            )
+        self.url = reverse("api:recipes-detail", args=[self.recipe.pk])
+        self.client = APIClient()
+        self.reader = APIClient()
+        self.reader.force_authenticate(create_user())
+
+    def test_anonymous_match(self):
+        response = self.client.get(self.url)
+        self.assertIn("Last-Modified", response)
+        response = self.client.get(
+            self.url, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.content)
+
+    def test_any_etag_needs_existing_recipe(self):
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, 304)
+        missing = reverse("api:recipes-detail", args=[self.recipe.pk + 1])
+        for client in (self.client, self.reader):
+            response = client.get(missing, HTTP_IF_NONE_MATCH="*")
+            self.assertEqual(response.status_code, 404)
+
+    def test_etag_depends_on_renderer(self):
+        response = self.client.get(self.url)
+        self.assertIn("Accept", response["Vary"])
+        html = self.client.get(self.url, HTTP_ACCEPT="text/html")
+        self.assertEqual(html.status_code, 200)
+        self.assertTrue(html["Content-Type"].startswith("text/html"))
+        self.assertNotEqual(html["ETag"], response["ETag"])
+        response = self.client.get(
+            self.url, HTTP_ACCEPT="text/html",
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_wins_over_last_modified(self):
+        response = self.client.get(self.url)
+        response = self.client.get(
+            self.url,
+            HTTP_IF_NONE_MATCH='"stale"',
+            HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_recipe_tags_change(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.tags.add(create_tag(name="Ужин"))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.json()["tags"]), 2)
+
+    def test_authenticated_reader(self):
+        response = self.reader.get(self.url)
+        self.assertIn("Authorization", response["Vary"])
+        self.assertNotIn("Last-Modified", response)
+        etag = response["ETag"]
+        self.assertEqual(
+            self.reader.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code,
+            304,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reader.post(
+                reverse("api:favorite-list", args=[self.recipe.pk])
+            )
+        response = self.reader.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["is_favorited"])
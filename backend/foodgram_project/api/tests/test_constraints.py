@@ -0,0 +1,99 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.serializers import (FavoriteSerializer, ShoppingCartSerializer,
+                             SubscriptionSerializer)
+from recipes.models import Amount, Favorite, ShoppingCart
+from users.models import Subscription
+
+from .factories import create_ingredient, create_recipe, create_user
+
+
+def skip_validation(self, data):
+    return data
+
+
+class UniqueConstraintsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = create_user()
+        self.reader = create_user()
+        self.salt = create_ingredient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe = create_recipe(self.author, {self.salt: 5})
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def assert_duplicate_rejected(self, model, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            model.objects.create(**fields)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            model.objects.create(**fields)
+
+    def test_database_rejects_duplicates(self):
+        self.assert_duplicate_rejected(
+            Favorite, user=self.reader, recipe=self.recipe
+        )
+        self.assert_duplicate_rejected(
+            ShoppingCart, user=self.reader, recipe=self.recipe
+        )
+        self.assert_duplicate_rejected(
+            Subscription, subscriber=self.reader, user=self.author
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Amount.objects.create(
+                recipe=self.recipe, ingredient=self.salt, amount=1
+            )
+
+    def test_api_duplicate(self):
+        url = reverse("api:favorite-list", args=[self.recipe.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post(url).status_code, 201)
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(), {"user": ["Рецепт уже добавлен в избранное."]}
+        )
+
+    def test_concurrent_duplicate_is_a_validation_error(self):
+        """Дубль, проскочивший проверку в сериализаторе, ловит индекс."""
+        cases = (
+            (
+                FavoriteSerializer,
+                reverse("api:favorite-list", args=[self.recipe.pk]),
+                lambda: Favorite.objects.create(
+                    user=self.reader, recipe=self.recipe
+                ),
+            ),
+            (
+                ShoppingCartSerializer,
+                reverse("api:shopping_cart-list", args=[self.recipe.pk]),
+                lambda: ShoppingCart.objects.create(
+                    user=self.reader, recipe=self.recipe
+                ),
+            ),
+            (
+                SubscriptionSerializer,
+                reverse("api:subscribe-list", args=[self.author.pk]),
+                lambda: Subscription.objects.create(
+                    subscriber=self.reader, user=self.author
+                ),
+            ),
+        )
+        for serializer, url, create in cases:
+            with self.subTest(serializer=serializer.__name__):
+                with self.captureOnCommitCallbacks(execute=True):
+                    create()
+                with mock.patch.object(
+                    serializer, "validate", skip_validation
+                ):
+                    response = self.client.post(url)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(
+                    list(response.json()), [serializer.attr_string_list[0]]
+                )
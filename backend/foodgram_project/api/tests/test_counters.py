@@ -0,0 +1,134 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Subscription, User
+
+from .factories import PASSWORD, create_recipe, create_user
+
+
+class CounterOverwriteTest(TestCase):
+    def setUp(self):
+        self.author = create_user()
+        self.reader = create_user()
+
+    def test_stale_recipe_save_keeps_counters(self):
+        recipe = create_recipe(self.author)
+        stale = Recipe.objects.get(pk=recipe.pk)
+        Favorite.objects.create(user=self.reader, recipe=recipe)
+        ShoppingCart.objects.create(user=self.reader, recipe=recipe)
+
+        stale.name = "Новое название"
+        stale.save()
+
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.name, "Новое название")
+        self.assertEqual(recipe.favorites_count, 1)
+        self.assertEqual(recipe.shopping_cart_count, 1)
+
+    def test_explicit_update_fields_skip_counters(self):
+        stale = User.objects.get(pk=self.author.pk)
+        Subscription.objects.create(subscriber=self.reader, user=self.author)
+
+        stale.save(update_fields=["first_name", "subscribers_count"])
+
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.subscribers_count, 1)
+
+    def test_set_password_keeps_counters(self):
+        token = Token.objects.create(user=self.author)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        me = reverse("api:users-me")
+        self.assertEqual(client.get(me).status_code, 200)
+        create_recipe(self.author)
+        Subscription.objects.create(subscriber=self.reader, user=self.author)
+
+        response = client.post(
+            reverse("api:users-set-password"),
+            {"current_password": PASSWORD, "new_password": "Pepper-Salt-97"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.author.refresh_from_db()
+        self.assertTrue(self.author.check_password("Pepper-Salt-97"))
+        self.assertEqual(self.author.recipes_count, 1)
+        self.assertEqual(self.author.subscribers_count, 1)
+
+
+class CounterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = create_user()
+        self.reader = create_user()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe = create_recipe(self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def counters(self):
+        self.recipe.refresh_from_db()
+        self.author.refresh_from_db()
+        return (
+            self.recipe.favorites_count,
+            self.recipe.shopping_cart_count,
+            self.author.recipes_count,
+            self.author.subscribers_count,
+        )
+
+    def toggle(self, method, name, pk):
+        with self.captureOnCommitCallbacks(execute=True):
+            getattr(self.client, method)(reverse(name, args=[pk]))
+
+    def test_follow_relations(self):
+        self.assertEqual(self.counters(), (0, 0, 1, 0))
+        self.toggle("post", "api:favorite-list", self.recipe.pk)
+        self.toggle("post", "api:shopping_cart-list", self.recipe.pk)
+        self.toggle("post", "api:subscribe-list", self.author.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            create_recipe(self.author)
+        self.assertEqual(self.counters(), (1, 1, 2, 1))
+
+        self.toggle("delete", "api:favorite-list", self.recipe.pk)
+        self.toggle("delete", "api:shopping_cart-list", self.recipe.pk)
+        self.toggle("delete", "api:subscribe-list", self.author.pk)
+        self.assertEqual(self.counters(), (0, 0, 2, 0))
+
+    def test_never_negative(self):
+        favorite = Favorite.objects.create(
+            user=self.reader, recipe=self.recipe
+        )
+        Recipe.objects.filter(pk=self.recipe.pk).update(favorites_count=0)
+        favorite.delete()
+        self.assertEqual(self.counters()[0], 0)
+
+    def test_subscriptions_use_counter(self):
+        Subscription.objects.create(subscriber=self.reader, user=self.author)
+        User.objects.filter(pk=self.author.pk).update(recipes_count=7)
+        response = self.client.get(reverse("api:users-subscriptions"))
+        self.assertEqual(response.json()["results"][0]["recipes_count"], 7)
+
+    def test_repair_counters(self):
+        Favorite.objects.create(user=self.reader, recipe=self.recipe)
+        Recipe.objects.filter(pk=self.recipe.pk).update(favorites_count=5)
+        User.objects.filter(pk=self.author.pk).update(recipes_count=0)
+
+        output = StringIO()
+        call_command("repair_counters", dry_run=True, stdout=output)
+        self.assertIn("Recipe.favorites_count: 1", output.getvalue())
+        self.assertIn("User.recipes_count: 1", output.getvalue())
+        self.assertIn("(ничего не изменено)", output.getvalue())
+        self.assertEqual(self.counters(), (5, 0, 0, 0))
+
+        call_command("repair_counters", stdout=StringIO())
+        self.assertEqual(self.counters(), (1, 0, 1, 0))
+        output = StringIO()
+        call_command("repair_counters", stdout=output)
+        self.assertIn("Расхождений: 0", output.getvalue())
@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from users.models import Subscription
+
+from .factories import create_recipe, create_user
+
+
+class CursorPaginationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = create_user()
+        self.authors = [create_user() for _ in range(5)]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipes = [create_recipe(author) for author in self.authors]
+            Subscription.objects.bulk_create(
+                Subscription(subscriber=self.reader, user=author)
+                for author in self.authors
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def first_page(self, url, **params):
+        response = self.client.get(url, {"pagination": "cursor", **params})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("count", response.json())
+        return response.json()
+
+    def walk(self, page):
+        """Проходит страницы по ссылкам next и возвращает id."""
+        ids = [item["id"] for item in page["results"]]
+        while page["next"]:
+            page = self.client.get(page["next"]).json()
+            ids.extend(item["id"] for item in page["results"])
+        return ids
+
+    def test_recipes(self):
+        ids = self.walk(self.first_page(reverse("api:recipes-list"), limit=2))
+        self.assertEqual(
+            ids, sorted((recipe.pk for recipe in self.recipes), reverse=True)
+        )
+
+    def test_new_recipe_does_not_shift_pages(self):
+        page = self.first_page(reverse("api:recipes-list"), limit=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            create_recipe(self.authors[0])
+        self.assertEqual(
+            self.walk(page),
+            sorted((recipe.pk for recipe in self.recipes), reverse=True),
+        )
+
+    def test_subscriptions(self):
+        ids = self.walk(
+            self.first_page(reverse("api:users-subscriptions"), limit=2)
+        )
+        self.assertEqual(
+            ids, sorted((author.pk for author in self.authors), reverse=True)
+        )
+
+    def test_page_number_is_default(self):
+        response = self.client.get(reverse("api:recipes-list"), {"limit": 2})
+        self.assertEqual(response.json()["count"], 5)
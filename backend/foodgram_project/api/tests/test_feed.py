@@ -0,0 +1,137 @@
+from datetime import timedelta
+from io import StringIO
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from recipes.models import FeedEntry, Recipe
+from users.models import Subscription
+
+from .factories import create_recipe, create_user
+
+
+class FeedTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = create_user()
+        self.reader = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def feed(self, **params):
+        response = self.client.get(reverse("api:recipes-feed"), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def feed_names(self, **params):
+        return [recipe["name"] for recipe in self.feed(**params)["results"]]
+
+    def stored(self, user):
+        return set(
+            FeedEntry.objects.filter(user=user).values_list(
+                "recipe__name", flat=True
+            )
+        )
+
+
+class FeedTest(FeedTestCase):
+    def test_subscription_backfills_and_new_recipes_fan_out(self):
+        create_recipe(self.author, name="Старый")
+        Subscription.objects.create(subscriber=self.reader, user=self.author)
+        create_recipe(self.author, name="Новый")
+        create_recipe(create_user(), name="Чужой")
+        create_recipe(self.reader, name="Свой")
+        self.assertEqual(self.stored(self.reader), {"Старый", "Новый"})
+        self.assertEqual(self.feed_names(), ["Новый", "Старый"])
+
+    def test_unsubscribe_and_delete(self):
+        Subscription.objects.create(subscriber=self.reader, user=self.author)
+        first = create_recipe(self.author, name="Первый")
+        create_recipe(self.author, name="Второй")
+        first.delete()
+        self.assertEqual(self.feed_names(), ["Второй"])
+        Subscription.objects.filter(subscriber=self.reader).delete()
+        self.assertEqual(self.stored(self.reader), set())
+        self.assertEqual(self.feed_names(), [])
+
+    def test_requires_login(self):
+        response = APIClient().get(reverse("api:recipes-feed"))
+        self.assertEqual(response.status_code, 401)
+
+    def test_rebuild_feeds(self):
+        Subscription.objects.create(subscriber=self.reader, user=self.author)
+        create_recipe(self.author, name="Первый")
+        FeedEntry.objects.all().delete()
+        output = StringIO()
+        call_command("rebuild_feeds", stdout=output)
+        self.assertIn("Записей в лентах: 1", output.getvalue())
+        self.assertEqual(self.stored(self.reader), {"Первый"})
+
+
+@override_settings(FEED_FANOUT_LIMIT=1)
+class FanOutLimitTest(FeedTestCase):
+    def test_crossing_limit_moves_author_between_modes(self):
+        create_recipe(self.author, name="Первый")
+        Subscription.objects.create(subscriber=self.reader, user=self.author)
+        self.assertEqual(self.stored(self.reader), {"Первый"})
+
+        other = create_user()
+        Subscription.objects.create(subscriber=other, user=self.author)
+        self.assertFalse(
+            FeedEntry.objects.filter(author=self.author).exists()
+        )
+        create_recipe(self.author, name="Второй")
+        self.assertFalse(
+            FeedEntry.objects.filter(author=self.author).exists()
+        )
+        self.assertEqual(self.feed_names(), ["Второй", "Первый"])
+
+        Subscription.objects.filter(subscriber=other).delete()
+        self.assertEqual(self.stored(self.reader), {"Первый", "Второй"})
+        self.assertEqual(self.feed_names(), ["Второй", "Первый"])
+        create_recipe(self.author, name="Третий")
+        self.assertEqual(self.feed_names(), ["Третий", "Второй", "Первый"])
+
+    def test_below_limit_changes_touch_only_subscriber(self):
+        create_recipe(self.author, name="Первый")
+        Subscription.objects.create(subscriber=self.reader, user=self.author)
+        Subscription.objects.filter(subscriber=self.reader).delete()
+        self.assertEqual(self.stored(self.reader), set())
+        self.assertEqual(self.feed_names(), [])
+
+
+class FeedPaginationTest(FeedTestCase):
+    def setUp(self):
+        super().setUp()
+        Subscription.objects.create(subscriber=self.reader, user=self.author)
+        for number in range(1, 6):
+            create_recipe(self.author, name=f"Рецепт {number}")
+
+    def test_page_order_matches_cursor(self):
+        # Дата создания может расходиться с id, например после импорта.
+        Recipe.objects.filter(name="Рецепт 2").update(
+            created=timezone.now() + timedelta(days=1)
+        )
+        pages = []
+        params = {"limit": 2}
+        while True:
+            page = self.feed(**params)
+            pages.append([recipe["name"] for recipe in page["results"]])
+            if not page["next"]:
+                break
+            params["cursor"] = parse_qs(urlparse(page["next"]).query)[
+                "cursor"
+            ][0]
+        self.assertEqual(
+            pages,
+            [
+                ["Рецепт 5", "Рецепт 4"],
+                ["Рецепт 3", "Рецепт 2"],
+                ["Рецепт 1"],
+            ],
+        )
@@ -0,0 +1,111 @@
+import base64
+import os
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from api import images
+from recipes.models import Recipe
+
+from .factories import (create_ingredient, create_tag, create_user,
+                        encode_image, use_temporary_media)
+
+
+class RecipeImageTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = use_temporary_media(self)
+        self.tag = create_tag()
+        self.ingredient = create_ingredient()
+        self.client = APIClient()
+        self.client.force_authenticate(create_user())
+
+    def post(self, image, process=True):
+        with self.captureOnCommitCallbacks(execute=process):
+            return self.client.post(
+                reverse("api:recipes-list"),
+                {
+                    "name": "Апельсиновый пирог",
+                    "text": "Описание",
+                    "cooking_time": 40,
+                    "tags": [self.tag.pk],
+                    "ingredients": [{"id": self.ingredient.pk, "amount": 1}],
+                    "image": image,
+                },
+                format="json",
+            )
+
+    def test_variants_are_built_after_commit(self):
+        response = self.post(encode_image())
+        self.assertEqual(response.status_code, 201, response.content)
+        recipe = Recipe.objects.get()
+        variants = recipe.image_variants
+        self.assertEqual(variants[images.SOURCE], recipe.image.name)
+        for name in ("thumbnail", "card", "detail"):
+            with self.subTest(variant=name):
+                self.assertTrue(variants[name].endswith(".webp"))
+                path = os.path.join(self.media_root, variants[name])
+                self.assertTrue(os.path.exists(path))
+        for name, size in (("thumbnail", (200, 200)), ("card", (600, 400))):
+            path = os.path.join(self.media_root, variants[name])
+            with Image.open(path) as variant:
+                self.assertEqual(variant.size, size)
+
+    def test_urls_use_variants(self):
+        self.post(encode_image())
+        variants = Recipe.objects.get().image_variants
+        listed = self.client.get(reverse("api:recipes-list")).json()
+        self.assertTrue(
+            listed["results"][0]["image"].endswith(variants["card"])
+        )
+        detail = self.client.get(
+            reverse("api:recipes-detail", args=[Recipe.objects.get().pk])
+        ).json()
+        self.assertTrue(detail["image"].endswith(variants["detail"]))
+        self.assertTrue(
+            detail["images"]["thumbnail"].endswith(variants["thumbnail"])
+        )
+
+    def test_original_until_processed(self):
+        self.post(encode_image("JPEG"), process=False)
+        recipe = Recipe.objects.get()
+        self.assertEqual(recipe.image_variants, {})
+        detail = self.client.get(
+            reverse("api:recipes-detail", args=[recipe.pk])
+        ).json()
+        self.assertTrue(detail["image"].endswith(recipe.image.name))
+        self.assertTrue(detail["image"].endswith(".jpg"))
+
+    def test_invalid_image(self):
+        for image in (
+            "data:image/png;base64,не-base64",
+            base64.b64encode(b"not an image").decode(),
+            encode_image("BMP"),
+        ):
+            with self.subTest(image=image[:30]):
+                self.assertEqual(self.post(image).status_code, 400)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_replaced_image_is_not_overwritten(self):
+        self.post(encode_image(), process=False)
+        recipe = Recipe.objects.get()
+
+        def replace_image(image):
+            Recipe.objects.filter(pk=recipe.pk).update(image="recipes/new.png")
+            return {images.SOURCE: image.name}
+
+        with mock.patch.object(images, "build_variants", replace_image):
+            images.process_recipe_image(recipe.pk)
+        self.assertEqual(Recipe.objects.get().image_variants, {})
+
+    def test_failures_are_logged(self):
+        self.post(encode_image(), process=False)
+        with mock.patch.object(
+            images, "build_variants", side_effect=OSError("диск")
+        ), self.assertLogs("api.images", "ERROR"):
+            images.process_recipe_image(Recipe.objects.get().pk)
+        self.assertEqual(Recipe.objects.get().image_variants, {})
@@ -0,0 +1,144 @@
+import json
+import os
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from api.cache import INGREDIENTS, get_version
+from recipes.management.commands import import_data
+from recipes.models import Ingredient
+
+CSV = (
+    "name,measurement_unit\n"
+    "Соль,г\n"
+    "Сахар,г\n"
+    "Соль,г\n"
+    " ,г\n"
+    "Молоко,мл\n"
+)
+
+
+class ImportDataTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def load(self, path, **options):
+        output = StringIO()
+        call_command("import_data", path, stdout=output, **options)
+        return output.getvalue()
+
+    def stored(self):
+        return set(Ingredient.objects.values_list("name", "measurement_unit"))
+
+    def test_csv(self):
+        output = self.load(self.write("ingredients.csv", CSV), batch_size=2)
+        self.assertEqual(
+            self.stored(), {("Соль", "г"), ("Сахар", "г"), ("Молоко", "мл")}
+        )
+        self.assertIn("Прочитано 4 строк, добавлено 3", output)
+
+    def test_jsonl(self):
+        rows = [
+            {"name": "Соль", "measurement_unit": "г"},
+            {"name": "Яйцо", "measurement_unit": "шт"},
+        ]
+        path = self.write(
+            "ingredients.jsonl",
+            "\n".join(json.dumps(row, ensure_ascii=False) for row in rows)
+            + "\n\n",
+        )
+        self.load(path)
+        self.assertEqual(self.stored(), {("Соль", "г"), ("Яйцо", "шт")})
+
+    def test_format_option(self):
+        self.load(self.write("ingredients.txt", CSV), file_format="csv")
+        self.assertEqual(len(self.stored()), 3)
+
+    def test_rerun_changes_nothing(self):
+        path = self.write("ingredients.csv", CSV)
+        self.load(path)
+        before = list(Ingredient.objects.order_by("id").values_list())
+        output = self.load(path)
+        self.assertEqual(
+            list(Ingredient.objects.order_by("id").values_list()), before
+        )
+        self.assertIn("добавлено 0", output)
+
+    def test_bumps_ingredient_version(self):
+        version = get_version(INGREDIENTS)
+        self.load(self.write("ingredients.csv", CSV))
+        self.assertNotEqual(get_version(INGREDIENTS), version)
+
+    def test_errors(self):
+        cases = {
+            "unknown extension": self.write("ingredients.txt", CSV),
+            "missing file": os.path.join(self.directory, "missing.csv"),
+            "missing column": self.write("broken.csv", "name\nСоль\n"),
+            "broken json": self.write("broken.jsonl", "{\n"),
+        }
+        for case, path in cases.items():
+            with self.subTest(case=case):
+                with self.assertRaises(CommandError):
+                    self.load(path)
+        self.assertFalse(Ingredient.objects.exists())
+
+    def test_empty_unit(self):
+        path = self.write("ingredients.csv", "name,measurement_unit\nСоль,\n")
+        for options in ({}, {"no_copy": True}):
+            with self.subTest(**options):
+                self.load(path, **options)
+                self.assertEqual(self.stored(), {("Соль", "")})
+
+
+class FakeCursor:
+    def __init__(self):
+        self.statements = []
+        self.copied = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+
+    def copy_expert(self, sql, file):
+        self.statements.append(sql)
+        self.copied.append(file.read())
+
+
+class CopyTest(TestCase):
+    def test_copy_statements(self):
+        cursor = FakeCursor()
+        batches = [[("Соль", "г"), ("Сахар", "")], [("Лук, репчатый", "шт")]]
+        with mock.patch.object(
+            import_data.connection, "cursor", return_value=cursor
+        ):
+            total = import_data.Command.copy(iter(batches))
+        self.assertEqual(total, 3)
+        create, *copies, insert, drop = cursor.statements
+        self.assertIn(import_data.STAGING_TABLE, create)
+        self.assertEqual(len(copies), 2)
+        for sql in copies:
+            self.assertIn("FORCE_NOT_NULL (name, measurement_unit)", sql)
+        self.assertEqual(
+            cursor.copied,
+            ["Соль,г\r\nСахар,\r\n", '"Лук, репчатый",шт\r\n'],
+        )
+        self.assertIn("ON CONFLICT (name, measurement_unit)", insert)
+        self.assertEqual(drop, f"DROP TABLE {import_data.STAGING_TABLE}")
@@ -0,0 +1,85 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .factories import (create_ingredient, create_recipe, create_tag,
+                        create_user)
+
+
+class IngredientFilterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        author = create_user()
+        self.flour = create_ingredient(name="мука")
+        self.milk = create_ingredient(name="молоко")
+        self.egg = create_ingredient(name="яйцо")
+        self.tag = create_tag()
+        with self.captureOnCommitCallbacks(execute=True):
+            create_recipe(
+                author, {self.flour: 1, self.milk: 1}, [self.tag], name="Блины"
+            )
+            create_recipe(author, {self.flour: 1, self.egg: 1}, name="Лапша")
+            create_recipe(author, {self.milk: 1}, [self.tag], name="Какао")
+        self.client = APIClient()
+
+    def names(self, **params):
+        response = self.client.get(reverse("api:recipes-list"), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return sorted(recipe["name"] for recipe in response.json()["results"])
+
+    @staticmethod
+    def ids(*ingredients):
+        return ",".join(str(ingredient.pk) for ingredient in ingredients)
+
+    def test_all_of(self):
+        self.assertEqual(
+            self.names(ingredients=self.ids(self.flour, self.milk)), ["Блины"]
+        )
+        self.assertEqual(
+            self.names(ingredients=self.ids(self.flour, self.flour)),
+            ["Блины", "Лапша"],
+        )
+
+    def test_any_of(self):
+        self.assertEqual(
+            self.names(ingredients_any=self.ids(self.egg, self.milk)),
+            ["Блины", "Какао", "Лапша"],
+        )
+        self.assertEqual(
+            self.names(ingredients_any=self.ids(self.egg)), ["Лапша"]
+        )
+
+    def test_exclude(self):
+        self.assertEqual(
+            self.names(exclude_ingredients=self.ids(self.milk)), ["Лапша"]
+        )
+
+    def test_combined(self):
+        self.assertEqual(
+            self.names(
+                ingredients=self.ids(self.flour),
+                exclude_ingredients=self.ids(self.egg),
+            ),
+            ["Блины"],
+        )
+        self.assertEqual(
+            self.names(
+                tags=self.tag.slug, ingredients_any=self.ids(self.milk)
+            ),
+            ["Блины", "Какао"],
+        )
+
+    def test_unknown_ingredient(self):
+        self.assertEqual(self.names(ingredients="9001"), [])
+        self.assertEqual(
+            self.names(exclude_ingredients="9001"),
+            ["Блины", "Какао", "Лапша"],
+        )
+
+    def test_invalid_value(self):
+        response = self.client.get(
+            reverse("api:recipes-list"), {"ingredients": "мука"}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ingredients", response.json())
@@ -0,0 +1,80 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.ingredient_index import ingredient_index
+from recipes.models import Ingredient
+
+from .factories import create_ingredient
+
+
+class IngredientIndexTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        ingredient_index.invalidate()
+        for name in ("Сахар", "сахарная пудра", "Ванильный сахар", "Соль"):
+            create_ingredient(name=name)
+
+    def names(self, query, limit=None):
+        return [
+            ingredient.name
+            for ingredient in ingredient_index.search(query, limit)
+        ]
+
+    def test_prefix_matches_come_first(self):
+        self.assertEqual(
+            self.names("сах"),
+            ["Сахар", "сахарная пудра", "Ванильный сахар"],
+        )
+
+    def test_case_and_whitespace_are_ignored(self):
+        self.assertEqual(self.names("  СОЛ "), ["Соль"])
+
+    def test_limit(self):
+        self.assertEqual(
+            self.names("сах", limit=2), ["Сахар", "сахарная пудра"]
+        )
+
+    def test_substring_inside_word(self):
+        self.assertEqual(self.names("пудр"), ["сахарная пудра"])
+
+    def test_no_match(self):
+        self.assertEqual(self.names("перец"), [])
+
+    def test_built_once(self):
+        self.names("сах")
+        with self.assertNumQueries(0):
+            self.names("сол")
+
+    def test_rebuilt_after_ingredient_change(self):
+        self.names("сах")
+        create_ingredient(name="Сахарный сироп")
+        self.assertIn("Сахарный сироп", self.names("сах"))
+        Ingredient.objects.get(name="Соль").delete()
+        self.assertEqual(self.names("сол"), [])
+
+
+class IngredientSearchEndpointTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        ingredient_index.invalidate()
+        self.sugar = create_ingredient(name="Сахар", measurement_unit="г")
+        create_ingredient(name="Соль")
+        self.url = reverse("api:ingredients-list")
+
+    def test_search(self):
+        response = APIClient().get(self.url, {"name": "сах"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            [{"id": self.sugar.pk, "name": "Сахар", "measurement_unit": "г"}],
+        )
+
+    @override_settings(INGREDIENT_INDEX_ENABLED=False)
+    def test_database_search_when_disabled(self):
+        # LIKE в SQLite не сравнивает кириллицу без учёта регистра.
+        response = APIClient().get(self.url, {"name": "Сах"})
+        self.assertEqual(
+            [ingredient["name"] for ingredient in response.json()], ["Сахар"]
+        )
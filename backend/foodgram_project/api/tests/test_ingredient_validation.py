@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+
+from .factories import (create_ingredient, create_tag, create_user,
+                        encode_image, use_temporary_media)
+
+
+class IngredientValidationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        use_temporary_media(self)
+        self.tag = create_tag()
+        self.ingredients = [create_ingredient() for _ in range(5)]
+        self.client = APIClient()
+        self.client.force_authenticate(create_user())
+
+    def post(self, ingredients):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse("api:recipes-list"),
+                {
+                    "name": "Салат",
+                    "text": "Описание",
+                    "cooking_time": 10,
+                    "image": encode_image(size=(10, 10)),
+                    "tags": [self.tag.pk],
+                    "ingredients": [
+                        {"id": pk, "amount": amount}
+                        for pk, amount in ingredients
+                    ],
+                },
+                format="json",
+            )
+
+    def test_ingredients_are_loaded_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(
+                [(ingredient.pk, 10) for ingredient in self.ingredients]
+            )
+        self.assertEqual(response.status_code, 201, response.content)
+        lookups = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith("SELECT")
+            and 'FROM "recipes_ingredient"' in query["sql"]
+        ]
+        self.assertEqual(len(lookups), 1, lookups)
+
+    def test_missing_ingredients_are_listed(self):
+        response = self.post(
+            [(self.ingredients[0].pk, 10), (9001, 1), (9002, 1), (9001, 2)]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(
+            "Ингредиенты не найдены: 9001, 9002",
+            response.json()["ingredient"],
+        )
+        self.assertIn(
+            "Ингредиенты должны быть уникальными.",
+            response.json()["ingredient"],
+        )
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_amount_must_be_positive(self):
+        response = self.post([(self.ingredients[0].pk, 0)])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("amount", response.json())
+
+    def test_empty_list(self):
+        response = self.post([])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ingredient:", response.json())
@@ -0,0 +1,67 @@
+import json
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.instrumentation import QueryRecorder, fingerprint
+from users.models import User
+
+from .factories import create_tag
+
+
+class FingerprintTest(SimpleTestCase):
+    def test_in_lists_collapse(self):
+        self.assertEqual(
+            fingerprint('SELECT 1 WHERE "id" IN (%s, %s, %s)'),
+            fingerprint('SELECT 1 WHERE "id" IN (%s,%s)'),
+        )
+
+    def test_single_placeholder_is_kept(self):
+        sql = 'SELECT 1 WHERE "id" = %s'
+        self.assertEqual(fingerprint(sql), sql)
+
+
+class QueryRecorderTest(TestCase):
+    def test_counts_and_repeats(self):
+        with QueryRecorder() as recorder:
+            for pk in range(3):
+                User.objects.filter(pk=pk).exists()
+            User.objects.count()
+        stats = recorder.as_dict()
+        self.assertEqual(stats["queries"], 4)
+        [repeated] = stats["repeated"]
+        self.assertEqual(repeated["count"], 3)
+        self.assertIn("LIMIT 1", repeated["sql"])
+
+    def test_stops_recording_after_block(self):
+        with QueryRecorder() as recorder:
+            User.objects.count()
+        User.objects.count()
+        self.assertEqual(recorder.count, 1)
+
+
+class QueryInstrumentationMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        create_tag()
+        self.url = reverse("api:tags-list")
+
+    @override_settings(QUERY_INSTRUMENTATION=True)
+    def test_headers_and_log(self):
+        with self.assertLogs("api.queries", "INFO") as logs:
+            response = APIClient().get(self.url)
+        self.assertGreaterEqual(int(response["X-DB-Query-Count"]), 1)
+        self.assertIn("X-DB-Time-Ms", response)
+        self.assertEqual(response["X-DB-Repeated-Queries"], "")
+        [record] = logs.records
+        entry = json.loads(record.getMessage())
+        self.assertEqual(entry["path"], self.url)
+        self.assertEqual(entry["status"], 200)
+        self.assertEqual(entry["queries"], int(response["X-DB-Query-Count"]))
+
+    @override_settings(QUERY_INSTRUMENTATION=False)
+    def test_disabled(self):
+        response = APIClient().get(self.url)
+        self.assertNotIn("X-DB-Query-Count", response)
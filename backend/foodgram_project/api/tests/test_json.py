@@ -0,0 +1,91 @@
+import json
+from decimal import Decimal
+from io import BytesIO
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer
+
+from .factories import (create_ingredient, create_recipe, create_tag,
+                        create_user)
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    def test_matches_json_renderer(self):
+        data = {
+            "name": "Борщ",
+            "amount": Decimal("1.50"),
+            "label": gettext_lazy("Избранное"),
+            1: [None, True, 2.5],
+        }
+        self.assertEqual(
+            json.loads(ORJSONRenderer().render(data)),
+            json.loads(JSONRenderer().render(data)),
+        )
+
+    def test_none(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_indent(self):
+        rendered = ORJSONRenderer().render(
+            {"id": 1}, "application/json; indent=4"
+        )
+        self.assertEqual(rendered, b'{\n  "id": 1\n}')
+
+
+class ORJSONParserTest(SimpleTestCase):
+    def parse(self, body, encoding="utf-8"):
+        return ORJSONParser().parse(
+            BytesIO(body), parser_context={"encoding": encoding}
+        )
+
+    def test_utf8(self):
+        self.assertEqual(
+            self.parse('{"name": "Щи"}'.encode()), {"name": "Щи"}
+        )
+
+    def test_other_encoding(self):
+        self.assertEqual(
+            self.parse('{"name": "Щи"}'.encode("cp1251"), "cp1251"),
+            {"name": "Щи"},
+        )
+
+    def test_invalid(self):
+        with self.assertRaises(ParseError):
+            self.parse(b"{name}")
+
+
+class JSONResponseTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe = create_recipe(
+                create_user(),
+                {create_ingredient(): 100},
+                tags=[create_tag()],
+            )
+        self.client = APIClient()
+
+    def test_recipe_detail(self):
+        response = self.client.get(
+            reverse("api:recipes-detail", args=[self.recipe.pk])
+        )
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(json.loads(response.content), response.data)
+
+    def test_invalid_body(self):
+        client = APIClient()
+        client.force_authenticate(create_user())
+        response = client.post(
+            reverse("api:recipes-list"),
+            b"{name",
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
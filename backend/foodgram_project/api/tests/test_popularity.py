@@ -0,0 +1,151 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.popularity import DAY
+from recipes.models import Favorite, RecipeScore, ShoppingCart
+
+from .factories import create_recipe, create_user
+
+
+class PopularOrderingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        author = create_user()
+        self.quiet = create_recipe(author, name="Тихий")
+        self.liked = create_recipe(author, name="Любимый")
+        self.carted = create_recipe(author, name="В корзинах")
+        readers = [create_user() for _ in range(3)]
+        for reader in readers:
+            Favorite.objects.create(user=reader, recipe=self.liked)
+            ShoppingCart.objects.create(user=reader, recipe=self.carted)
+        for reader in readers[:2]:
+            Favorite.objects.create(user=reader, recipe=self.carted)
+        self.client = APIClient()
+
+    def names(self, **params):
+        response = self.client.get(reverse("api:recipes-list"), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [recipe["name"] for recipe in response.json()["results"]]
+
+    def test_popular_and_trending(self):
+        # 2 избранных и 3 корзины по 0.5 против 3 избранных.
+        expected = ["В корзинах", "Любимый", "Тихий"]
+        self.assertEqual(self.names(ordering="popular"), expected)
+        self.assertEqual(self.names(ordering="trending"), expected)
+
+    def test_new_marks_change_order_and_etag(self):
+        reader = create_user()
+        authenticated = APIClient()
+        authenticated.force_authenticate(reader)
+        url = reverse("api:recipes-list")
+        # Тихий обходит всех с 4 избранными, затем Любимый — с 5.
+        passes = ((self.client, self.quiet, 4), (authenticated, self.liked, 2))
+        for client, recipe, favorites in passes:
+            with self.subTest(anonymous=client is self.client):
+                before = client.get(url, {"ordering": "popular"})
+                with self.captureOnCommitCallbacks(execute=True):
+                    for _ in range(favorites):
+                        Favorite.objects.create(
+                            user=create_user(), recipe=recipe
+                        )
+                after = client.get(
+                    url,
+                    {"ordering": "popular"},
+                    HTTP_IF_NONE_MATCH=before["ETag"],
+                )
+                self.assertEqual(after.status_code, 200)
+                self.assertNotEqual(after["ETag"], before["ETag"])
+                self.assertNotEqual(
+                    after.json()["results"], before.json()["results"]
+                )
+        self.assertEqual(
+            self.names(ordering="popular"), ["Любимый", "Тихий", "В корзинах"]
+        )
+
+    def test_default_ordering_is_newest_first(self):
+        self.assertEqual(self.names(), ["В корзинах", "Любимый", "Тихий"])
+
+    def test_cursor_pagination_is_rejected(self):
+        response = self.client.get(
+            reverse("api:recipes-list"),
+            {"ordering": "popular", "pagination": "cursor"},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ordering", response.json())
+
+
+class ScoreTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = create_user()
+        self.reader = create_user()
+        self.recipe = create_recipe(self.author)
+
+    def score(self, recipe=None):
+        return RecipeScore.objects.get(recipe=recipe or self.recipe)
+
+    def age(self, days):
+        """Сдвигает время последнего пересчёта оценок в прошлое."""
+        RecipeScore.objects.update(decayed_at=F("decayed_at") - days * DAY)
+
+    def test_new_recipe_has_zero_score(self):
+        score = self.score()
+        self.assertEqual((score.popular, score.trending), (0, 0))
+
+    def test_marks_add_and_remove_weight(self):
+        favorite = Favorite.objects.create(
+            user=self.reader, recipe=self.recipe
+        )
+        cart = ShoppingCart.objects.create(
+            user=self.reader, recipe=self.recipe
+        )
+        self.assertAlmostEqual(self.score().popular, 1.5, places=3)
+        favorite.delete()
+        self.assertAlmostEqual(self.score().popular, 0.5, places=3)
+        cart.delete()
+        self.assertAlmostEqual(self.score().popular, 0, places=3)
+
+    def test_never_negative(self):
+        favorite = Favorite.objects.create(
+            user=self.reader, recipe=self.recipe
+        )
+        RecipeScore.objects.update(popular=0.2, trending=0.2)
+        favorite.delete()
+        score = self.score()
+        self.assertEqual((score.popular, score.trending), (0, 0))
+
+    def test_decay_halves_per_half_life(self):
+        Favorite.objects.create(user=self.reader, recipe=self.recipe)
+        self.age(3.5)
+        output = StringIO()
+        call_command("decay_scores", stdout=output)
+        self.assertIn("Обновлено оценок: 1", output.getvalue())
+        score = self.score()
+        self.assertAlmostEqual(score.trending, 0.5, places=3)
+        self.assertAlmostEqual(score.popular, 0.5 ** (3.5 / 30), places=3)
+
+    def test_fresh_marks_win_trending(self):
+        old = self.recipe
+        Favorite.objects.create(user=self.reader, recipe=old)
+        Favorite.objects.create(user=create_user(), recipe=old)
+        self.age(14)
+        new = create_recipe(self.author)
+        Favorite.objects.create(user=self.reader, recipe=new)
+        call_command("decay_scores", stdout=StringIO())
+        self.assertGreater(self.score(old).popular, self.score(new).popular)
+        self.assertLess(self.score(old).trending, self.score(new).trending)
+
+    def test_rebuild(self):
+        Favorite.objects.create(user=self.reader, recipe=self.recipe)
+        ShoppingCart.objects.create(user=self.reader, recipe=self.recipe)
+        RecipeScore.objects.all().delete()
+        call_command("decay_scores", rebuild=True, stdout=StringIO())
+        score = self.score()
+        self.assertAlmostEqual(score.popular, 1.5)
+        self.assertAlmostEqual(score.trending, 1.5)
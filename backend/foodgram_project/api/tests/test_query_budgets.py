@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.management.commands.check_query_budgets import budget_requests, seed
+from api.query_budget import QUERY_BUDGETS, QueryBudgetExceeded, query_budget
+from users.models import User
+
+
+class QueryBudgetTest(TestCase):
+    """Число запросов не растёт с данными: бюджет одинаков для любого
+    объёма, поэтому N+1 в любом эндпоинте сразу его превысит."""
+
+    def check_budgets(self, authors, recipes):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            viewer, recipe = seed(authors, recipes, ingredients=4)
+        client = APIClient()
+        client.force_authenticate(viewer)
+        requests = budget_requests(recipe)
+        self.assertEqual(set(requests), set(QUERY_BUDGETS))
+        for name, (url, params) in requests.items():
+            with self.subTest(name=name, authors=authors):
+                with query_budget(name):
+                    response = client.get(url, params)
+                    if response.streaming:
+                        b"".join(response.streaming_content)
+                self.assertEqual(response.status_code, 200)
+
+    def test_small(self):
+        self.check_budgets(authors=2, recipes=1)
+
+    def test_large(self):
+        self.check_budgets(authors=12, recipes=3)
+
+    def test_exceeded(self):
+        with self.assertRaisesMessage(
+            QueryBudgetExceeded, "users-list: 3 запросов при бюджете 2"
+        ):
+            with query_budget("users-list", budget=2):
+                for _ in range(3):
+                    User.objects.count()
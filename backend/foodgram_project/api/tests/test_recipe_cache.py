@@ -0,0 +1,86 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from recipes.models import Favorite
+
+from .factories import create_ingredient, create_recipe, create_user
+
+
+class AnonymousRecipeCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = create_user(username="chef")
+        self.salt = create_ingredient(name="соль")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.soup = create_recipe(self.author, {self.salt: 5}, name="Суп")
+            self.salad = create_recipe(self.author, name="Салат")
+        self.client = APIClient()
+        self.list_url = reverse("api:recipes-list")
+
+    def detail_url(self, recipe):
+        return reverse("api:recipes-detail", args=[recipe.pk])
+
+    def names(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, 200)
+        return [recipe["name"] for recipe in response.json()["results"]]
+
+    def test_repeated_requests_skip_the_database(self):
+        for url in (self.list_url, self.detail_url(self.soup)):
+            with self.subTest(url=url):
+                first = self.client.get(url).json()
+                with self.assertNumQueries(0):
+                    self.assertEqual(self.client.get(url).json(), first)
+
+    def test_new_recipe_appears(self):
+        self.names()
+        with self.captureOnCommitCallbacks(execute=True):
+            create_recipe(self.author, name="Каша")
+        self.assertEqual(self.names(), ["Каша", "Салат", "Суп"])
+
+    def test_edit_invalidates_only_that_recipe(self):
+        self.client.get(self.detail_url(self.soup))
+        self.client.get(self.detail_url(self.salad))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.soup.name = "Борщ"
+            self.soup.save()
+        response = self.client.get(self.detail_url(self.soup))
+        self.assertEqual(response.json()["name"], "Борщ")
+        with self.assertNumQueries(0):
+            self.client.get(self.detail_url(self.salad))
+        self.assertEqual(self.names(), ["Салат", "Борщ"])
+
+    def test_delete(self):
+        self.client.get(self.detail_url(self.soup))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.soup.delete()
+        response = self.client.get(self.detail_url(self.soup))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.names(), ["Салат"])
+
+    def test_related_changes(self):
+        self.client.get(self.detail_url(self.soup))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.username = "cook"
+            self.author.save()
+            amount = self.soup.ingredient_recipe.get()
+            amount.amount = 7
+            amount.save()
+        recipe = self.client.get(self.detail_url(self.soup)).json()
+        self.assertEqual(recipe["author"]["username"], "cook")
+        self.assertEqual(recipe["ingredients"][0]["amount"], 7)
+
+    def test_authenticated_users_bypass_the_shared_cache(self):
+        self.client.get(self.detail_url(self.soup))
+        reader = create_user()
+        with self.captureOnCommitCallbacks(execute=True):
+            Favorite.objects.create(user=reader, recipe=self.soup)
+        with self.assertNumQueries(0):
+            anonymous = self.client.get(self.detail_url(self.soup)).json()
+        self.assertFalse(anonymous["is_favorited"])
+        client = APIClient()
+        client.force_authenticate(reader)
+        response = client.get(self.detail_url(self.soup))
+        self.assertTrue(response.json()["is_favorited"])
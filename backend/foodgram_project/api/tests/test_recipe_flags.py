@@ -0,0 +1,92 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from recipes.models import Favorite, ShoppingCart
+
+from .factories import (create_ingredient, create_recipe, create_tag,
+                        create_user)
+
+
+class RecipeFlagsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = create_user()
+        self.reader = create_user()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.favorite = create_recipe(self.author, name="Плов")
+            self.in_cart = create_recipe(self.author, name="Шарлотка")
+            self.plain = create_recipe(self.author, name="Окрошка")
+            Favorite.objects.create(user=self.reader, recipe=self.favorite)
+            ShoppingCart.objects.create(user=self.reader, recipe=self.in_cart)
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def flags(self, client, **params):
+        response = client.get(reverse("api:recipes-list"), params)
+        self.assertEqual(response.status_code, 200)
+        return {
+            recipe["name"]: (
+                recipe["is_favorited"], recipe["is_in_shopping_cart"]
+            )
+            for recipe in response.json()["results"]
+        }
+
+    def test_list(self):
+        self.assertEqual(
+            self.flags(self.client),
+            {
+                "Плов": (True, False),
+                "Шарлотка": (False, True),
+                "Окрошка": (False, False),
+            },
+        )
+
+    def test_detail(self):
+        response = self.client.get(
+            reverse("api:recipes-detail", args=[self.in_cart.pk])
+        )
+        self.assertFalse(response.json()["is_favorited"])
+        self.assertTrue(response.json()["is_in_shopping_cart"])
+
+    def test_flags_are_per_viewer(self):
+        other = APIClient()
+        other.force_authenticate(self.author)
+        self.assertEqual(set(self.flags(other).values()), {(False, False)})
+
+    def test_anonymous(self):
+        self.assertEqual(
+            set(self.flags(APIClient()).values()), {(False, False)}
+        )
+        self.assertEqual(self.flags(APIClient(), is_favorited=1), {})
+
+    def test_filters(self):
+        self.assertEqual(
+            list(self.flags(self.client, is_favorited=1)), ["Плов"]
+        )
+        self.assertEqual(
+            list(self.flags(self.client, is_in_shopping_cart=1)),
+            ["Шарлотка"],
+        )
+        self.assertEqual(len(self.flags(self.client, is_favorited=0)), 3)
+
+    def test_query_count_does_not_grow_with_page(self):
+        tag = create_tag()
+        ingredient = create_ingredient()
+
+        def count_queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.flags(self.client)
+            return len(queries)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_recipe(self.author, {ingredient: 1}, tags=[tag])
+        before = count_queries()
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(5):
+                create_recipe(self.author, {ingredient: 1}, tags=[tag])
+        self.assertEqual(count_queries(), before)
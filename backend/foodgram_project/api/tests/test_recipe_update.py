@@ -0,0 +1,94 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from recipes.models import Amount, Recipe
+
+from .factories import (create_ingredient, create_recipe, create_tag,
+                        create_user)
+
+
+class RecipeUpdateTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = create_user()
+        self.flour = create_ingredient(name="мука")
+        self.milk = create_ingredient(name="молоко")
+        self.egg = create_ingredient(name="яйцо")
+        self.breakfast = create_tag()
+        self.dinner = create_tag()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe = create_recipe(
+                self.author,
+                {self.flour: 200, self.milk: 300},
+                tags=[self.breakfast],
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def patch(self, ingredients, tags):
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(
+                    reverse("api:recipes-detail", args=[self.recipe.pk]),
+                    {
+                        "name": self.recipe.name,
+                        "text": "Новое описание",
+                        "cooking_time": 20,
+                        "tags": [tag.pk for tag in tags],
+                        "ingredients": [
+                            {"id": ingredient.pk, "amount": amount}
+                            for ingredient, amount in ingredients.items()
+                        ],
+                    },
+                    format="json",
+                )
+        self.assertEqual(response.status_code, 200, response.content)
+        return [query["sql"] for query in queries.captured_queries]
+
+    def amounts(self):
+        return {
+            amount.ingredient_id: (amount.pk, amount.amount)
+            for amount in Amount.objects.filter(recipe=self.recipe)
+        }
+
+    def tag_rows(self):
+        return dict(
+            Recipe.tags.through.objects.filter(recipe=self.recipe).values_list(
+                "tag_id", "pk"
+            )
+        )
+
+    def writes_to(self, queries, table):
+        return [
+            sql for sql in queries
+            if table in sql and sql.startswith(("INSERT", "UPDATE", "DELETE"))
+        ]
+
+    def test_unchanged_ingredients_and_tags_are_not_written(self):
+        amounts, tags = self.amounts(), self.tag_rows()
+        queries = self.patch(
+            {self.flour: 200, self.milk: 300}, [self.breakfast]
+        )
+        self.assertEqual(self.amounts(), amounts)
+        self.assertEqual(self.tag_rows(), tags)
+        self.assertEqual(self.writes_to(queries, '"recipes_amount"'), [])
+        self.assertEqual(self.writes_to(queries, '"recipes_recipe_tags"'), [])
+
+    def test_diff_is_applied(self):
+        before = self.amounts()
+        queries = self.patch({self.flour: 250, self.egg: 2}, [self.dinner])
+        self.assertEqual(len(self.writes_to(queries, '"recipes_amount"')), 3)
+        after = self.amounts()
+        self.assertEqual(set(after), {self.flour.pk, self.egg.pk})
+        self.assertEqual(after[self.flour.pk], (before[self.flour.pk][0], 250))
+        self.assertEqual(after[self.egg.pk][1], 2)
+        self.assertEqual(list(self.tag_rows()), [self.dinner.pk])
+
+    def test_kept_tag_rows_survive(self):
+        kept = self.tag_rows()[self.breakfast.pk]
+        self.patch({self.flour: 200}, [self.breakfast, self.dinner])
+        self.assertEqual(self.tag_rows()[self.breakfast.pk], kept)
@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.ingredient_index import ingredient_index
+
+from .factories import create_ingredient, create_tag
+
+
+class ReferenceCacheTest(TestCase):
+    """Тэги и ингредиенты отдаются из кэша с ETag по версии справочника."""
+
+    def setUp(self):
+        cache.clear()
+        ingredient_index.invalidate()
+        self.tag = create_tag(name="Завтрак")
+        self.salt = create_ingredient(name="Соль")
+        create_ingredient(name="Сахар")
+        self.client = APIClient()
+
+    def test_headers(self):
+        for url in (
+            reverse("api:tags-list"),
+            reverse("api:tags-detail", args=[self.tag.pk]),
+            reverse("api:ingredients-list"),
+            reverse("api:ingredients-detail", args=[self.salt.pk]),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response["ETag"])
+                self.assertEqual(response["Cache-Control"], "no-cache")
+
+    def test_if_none_match(self):
+        url = reverse("api:tags-list")
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(response.content)
+
+    def test_cached_body_without_queries(self):
+        url = reverse("api:tags-list")
+        first = self.client.get(url).json()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).json(), first)
+
+    def test_tag_change_invalidates(self):
+        url = reverse("api:tags-list")
+        etag = self.client.get(url)["ETag"]
+        self.tag.name = "Ужин"
+        self.tag.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()[0]["name"], "Ужин")
+
+    def test_ingredient_change_invalidates(self):
+        url = reverse("api:ingredients-list")
+        etag = self.client.get(url)["ETag"]
+        create_ingredient(name="Перец")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 3)
+
+    def test_query_params_are_cached_separately(self):
+        url = reverse("api:ingredients-list")
+        self.assertEqual(len(self.client.get(url).json()), 2)
+        found = self.client.get(url, {"name": "сол"}).json()
+        self.assertEqual([item["name"] for item in found], ["Соль"])
+
+    def test_tags_do_not_invalidate_ingredients(self):
+        url = reverse("api:ingredients-list")
+        etag = self.client.get(url)["ETag"]
+        create_tag()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
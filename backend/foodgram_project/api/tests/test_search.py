@@ -0,0 +1,184 @@
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.postgresql.base import DatabaseWrapper
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api import search
+from recipes.models import Recipe
+
+from .factories import create_recipe, create_user
+
+
+class RecipeSearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        author = create_user()
+        self.borscht = create_recipe(
+            author, name="Борщ", text="Свёкла, капуста и говядина."
+        )
+        self.soup = create_recipe(
+            author, name="Суп с фрикадельками", text="Почти как борщ."
+        )
+        self.salad = create_recipe(
+            author, name="Винегрет", text="Свёкла и огурцы."
+        )
+        self.client = APIClient()
+
+    def search(self, query, **params):
+        return self.client.get(
+            reverse("api:recipes-list"), {"search": query, **params}
+        )
+
+    def names(self, response):
+        self.assertEqual(response.status_code, 200, response.content)
+        return [recipe["name"] for recipe in response.json()["results"]]
+
+    def test_name_match_ranks_first(self):
+        self.assertEqual(
+            self.names(self.search("борщ")), ["Борщ", "Суп с фрикадельками"]
+        )
+
+    def test_prefix_and_case(self):
+        self.assertEqual(
+            self.names(self.search("СВЁК")), ["Винегрет", "Борщ"]
+        )
+
+    def test_no_match(self):
+        self.assertEqual(self.names(self.search("пицца")), [])
+
+    def test_punctuation_only_query(self):
+        self.assertEqual(self.names(self.search("?!")), [])
+
+    def test_index_follows_updates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.salad.name = "Селёдка под шубой"
+            self.salad.text = "Рыба и овощи."
+            self.salad.save()
+        self.assertEqual(self.names(self.search("селёдка")), [self.salad.name])
+        self.assertEqual(self.names(self.search("огурцы")), [])
+
+    def test_deleted_recipe_leaves_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.borscht.delete()
+        self.assertEqual(
+            self.names(self.search("борщ")), ["Суп с фрикадельками"]
+        )
+        if connection.vendor != "sqlite":
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT count(*) FROM {search.FTS_TABLE} WHERE rowid = %s",
+                (self.borscht.pk,),
+            )
+            self.assertEqual(cursor.fetchone(), (0,))
+
+    def test_rebuild_command(self):
+        if connection.vendor == "postgresql":
+            Recipe.objects.update(search_vector=None)
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {search.FTS_TABLE}")
+        self.assertEqual(self.names(self.search("борщ")), [])
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(
+            self.names(self.search("борщ")), ["Борщ", "Суп с фрикадельками"]
+        )
+
+    def test_blank_query_returns_everything(self):
+        self.assertEqual(len(self.names(self.search("  "))), 3)
+
+    def test_cursor_pagination_is_rejected(self):
+        response = self.search("борщ", pagination="cursor")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("search", response.json())
+        self.assertEqual(
+            len(self.names(self.search("", pagination="cursor"))), 3
+        )
+
+    def test_sqlite_joins_fts_table_once(self):
+        with mock.patch.object(search.connection, "vendor", "sqlite"):
+            queryset = search.search_recipes(Recipe.objects.all(), "борщ")
+        sql = str(queryset.query)
+        self.assertEqual(sql.count("MATCH"), 1)
+        self.assertEqual(sql.count(search.FTS_TABLE), 4)
+
+    def test_postgresql_query(self):
+        with mock.patch.object(search.connection, "vendor", "postgresql"):
+            queryset = search.search_recipes(
+                Recipe.objects.all(), "Свёкла, КАПУСТ"
+            )
+        pg = DatabaseWrapper(
+            {**connection.settings_dict, "NAME": "", "OPTIONS": {}}
+        )
+        sql, params = queryset.query.get_compiler(connection=pg).as_sql()
+        self.assertIn(
+            '"recipes_recipe"."search_vector" @@ '
+            "to_tsquery(%s::regconfig, %s)",
+            sql,
+        )
+        self.assertIn("ts_rank(", sql)
+        self.assertTrue(
+            sql.endswith('ORDER BY "rank" DESC, "recipes_recipe"."id" DESC')
+        )
+        self.assertNotIn("LIKE", sql)
+        self.assertIn("свёкла:* & капуст:*", params)
+
+    def test_vector_is_not_exposed(self):
+        url = reverse("api:recipes-detail", args=[self.borscht.pk])
+        with CaptureQueriesContext(connection) as queries:
+            listed = self.client.get(reverse("api:recipes-list")).json()
+            detail = self.client.get(url).json()
+        for recipe in (*listed["results"], detail):
+            self.assertNotIn("search_vector", recipe)
+        self.assertFalse(
+            any("search_vector" in query["sql"] for query in queries)
+        )
+        response = self.client.get(url, {"fields": "search_vector"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_save_does_not_write_vector(self):
+        recipe = Recipe.objects.get(pk=self.salad.pk)
+        with CaptureQueriesContext(connection) as queries:
+            recipe.save()
+        updates = [
+            query["sql"] for query in queries
+            if query["sql"].startswith("UPDATE")
+        ]
+        self.assertIn('"name"', updates[0])
+        self.assertNotIn("search_vector", updates[0])
+
+    def test_other_databases_fall_back_to_substring(self):
+        with mock.patch.object(search.connection, "vendor", "mysql"):
+            names = self.names(self.search("Свёкла"))
+        self.assertEqual(names, ["Винегрет", "Борщ"])
+
+
+@skipUnless(connection.vendor == "postgresql", "нужен PostgreSQL")
+class PostgreSQLSearchTest(TestCase):
+    def setUp(self):
+        author = create_user()
+        self.recipe = create_recipe(
+            author, name="Пирожки с капустой", text="Тесто и начинка."
+        )
+
+    def test_vector_follows_saves(self):
+        self.recipe.refresh_from_db()
+        self.assertIn("'пирожк':1A", self.recipe.search_vector)
+        self.recipe.text = "Тесто и капуста."
+        self.recipe.save()
+        self.recipe.refresh_from_db()
+        self.assertIn("'капуст':3A,6B", self.recipe.search_vector)
+
+    def test_search_uses_gin_index(self):
+        queryset = search.search_recipes(Recipe.objects.all(), "капуста")
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        self.assertIn("recipes_recipe_search_vector_gin", queryset.explain())
+        self.assertEqual(list(queryset), [self.recipe])
@@ -0,0 +1,290 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api import shopping_list
+from recipes.models import Amount, ShoppingCart, ShoppingListItem
+
+from .factories import (create_ingredient, create_recipe, create_tag,
+                        create_user)
+
+
+def stored_list(user):
+    return dict(
+        ShoppingListItem.objects.filter(user=user).values_list(
+            "ingredient", "total"
+        )
+    )
+
+
+def expected_list(user):
+    return dict(
+        Amount.objects.filter(recipe__shopping_cart__user=user)
+        .values_list("ingredient")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+
+
+class ShoppingListTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = create_user()
+        self.flour = create_ingredient(name="мука")
+        self.milk = create_ingredient(name="молоко", measurement_unit="мл")
+        self.egg = create_ingredient(name="яйцо", measurement_unit="шт")
+        self.tag = create_tag()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe = create_recipe(
+                self.author, {self.flour: 200, self.milk: 300}, [self.tag]
+            )
+
+    def add_to_cart(self, user, recipe=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            ShoppingCart.objects.create(
+                user=user, recipe=recipe or self.recipe
+            )
+
+    def assert_list(self, user, expected):
+        self.assertEqual(stored_list(user), expected)
+        self.assertEqual(stored_list(user), expected_list(user))
+
+
+class RecipeEditTest(ShoppingListTestCase):
+    def update_recipe(self, ingredients):
+        client = APIClient()
+        client.force_authenticate(self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.patch(
+                reverse("api:recipes-detail", args=[self.recipe.pk]),
+                {
+                    "name": self.recipe.name,
+                    "text": self.recipe.text,
+                    "cooking_time": self.recipe.cooking_time,
+                    "tags": [self.tag.pk],
+                    "ingredients": [
+                        {"id": ingredient.pk, "amount": amount}
+                        for ingredient, amount in ingredients.items()
+                    ],
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def test_edit_updates_every_cart(self):
+        readers = [create_user() for _ in range(5)]
+        for reader in readers:
+            self.add_to_cart(reader)
+        with self.captureOnCommitCallbacks(execute=True):
+            other = create_recipe(self.author, {self.flour: 50})
+        self.add_to_cart(readers[0], other)
+
+        self.update_recipe({self.flour: 100, self.egg: 2})
+
+        self.assert_list(
+            readers[0], {self.flour.pk: 150, self.egg.pk: 2}
+        )
+        for reader in readers[1:]:
+            self.assert_list(reader, {self.flour.pk: 100, self.egg.pk: 2})
+
+    def test_edit_refreshes_users_in_batches(self):
+        readers = [create_user() for _ in range(5)]
+        for reader in readers:
+            self.add_to_cart(reader)
+        refresh = mock.Mock(wraps=shopping_list.refresh_items)
+
+        with mock.patch.object(shopping_list, "USER_BATCH_SIZE", 2), \
+                mock.patch.object(shopping_list, "refresh_items", refresh):
+            self.update_recipe({self.flour: 100})
+
+        self.assertEqual(
+            [list(call.args[0]) for call in refresh.call_args_list],
+            [
+                [reader.pk for reader in readers[:2]],
+                [reader.pk for reader in readers[2:4]],
+                [readers[4].pk],
+            ],
+        )
+        for reader in readers:
+            self.assert_list(reader, {self.flour.pk: 100})
+
+    def test_cart_added_while_recipe_changes(self):
+        reader = create_user()
+        with self.captureOnCommitCallbacks(execute=True):
+            ShoppingCart.objects.create(user=reader, recipe=self.recipe)
+            # Правка рецепта, зафиксированная соседней транзакцией до
+            # фиксации корзины: её сигналы корзину ещё не видели.
+            Amount.objects.filter(
+                recipe=self.recipe, ingredient=self.flour
+            ).update(amount=500)
+            Amount.objects.create(
+                recipe=self.recipe, ingredient=self.egg, amount=3
+            )
+
+        self.assert_list(
+            reader, {self.flour.pk: 500, self.milk.pk: 300, self.egg.pk: 3}
+        )
+
+
+class CartTest(ShoppingListTestCase):
+    def setUp(self):
+        super().setUp()
+        self.reader = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pancakes = create_recipe(
+                self.author, {self.flour: 100, self.egg: 2}
+            )
+
+    def cart_url(self, recipe):
+        return reverse("api:shopping_cart-list", args=[recipe.pk])
+
+    def test_add_and_remove_through_api(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.cart_url(self.recipe))
+            self.client.post(self.cart_url(self.pancakes))
+        self.assert_list(
+            self.reader,
+            {self.flour.pk: 300, self.milk.pk: 300, self.egg.pk: 2},
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(self.cart_url(self.recipe))
+        self.assertEqual(response.status_code, 204)
+        self.assert_list(self.reader, {self.flour.pk: 100, self.egg.pk: 2})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(self.cart_url(self.pancakes))
+        self.assert_list(self.reader, {})
+
+    def test_recipe_delete_cascades_to_lists(self):
+        self.add_to_cart(self.reader)
+        self.add_to_cart(self.reader, self.pancakes)
+        author = APIClient()
+        author.force_authenticate(self.author)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = author.delete(
+                reverse("api:recipes-detail", args=[self.pancakes.pk])
+            )
+
+        self.assertEqual(response.status_code, 204)
+        self.assert_list(self.reader, {self.flour.pk: 200, self.milk.pk: 300})
+
+    def test_json_endpoint(self):
+        self.add_to_cart(self.reader)
+        self.add_to_cart(self.reader, self.pancakes)
+
+        response = self.client.get(reverse("api:recipes-shopping-list"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            [
+                {
+                    "id": self.milk.pk,
+                    "name": "молоко",
+                    "measurement_unit": "мл",
+                    "total": 300,
+                },
+                {
+                    "id": self.flour.pk,
+                    "name": "мука",
+                    "measurement_unit": "г",
+                    "total": 300,
+                },
+                {
+                    "id": self.egg.pk,
+                    "name": "яйцо",
+                    "measurement_unit": "шт",
+                    "total": 2,
+                },
+            ],
+        )
+
+    def test_json_endpoint_sparse_fields(self):
+        self.add_to_cart(self.reader)
+
+        response = self.client.get(
+            reverse("api:recipes-shopping-list"), {"fields": "id,total"}
+        )
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            response.json(),
+            [
+                {"id": self.milk.pk, "total": 300},
+                {"id": self.flour.pk, "total": 200},
+            ],
+        )
+        response = self.client.get(
+            reverse("api:recipes-shopping-list"), {"fields": "cooking_time"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_json_endpoint_requires_login(self):
+        response = APIClient().get(reverse("api:recipes-shopping-list"))
+        self.assertEqual(response.status_code, 401)
+
+    def test_download_reads_stored_list(self):
+        self.add_to_cart(self.reader)
+        ShoppingListItem.objects.filter(
+            user=self.reader, ingredient=self.flour
+        ).update(total=1)
+
+        response = self.client.get(
+            reverse("api:recipes-download-shopping-cart"), {"format": "txt"}
+        )
+
+        self.assertEqual(
+            b"".join(response.streaming_content).decode(),
+            "молоко(мл) - 300\nмука(г) - 1\n",
+        )
+
+
+class RepairShoppingListsTest(ShoppingListTestCase):
+    def setUp(self):
+        super().setUp()
+        self.reader = create_user()
+        self.add_to_cart(self.reader)
+        self.other = create_user()
+        self.add_to_cart(self.other)
+        ShoppingListItem.objects.filter(
+            user=self.reader, ingredient=self.flour
+        ).update(total=1)
+        ShoppingListItem.objects.filter(
+            user=self.other, ingredient=self.milk
+        ).delete()
+
+    def repair(self, *args):
+        output = StringIO()
+        call_command("repair_shopping_lists", *args, stdout=output)
+        return output.getvalue()
+
+    def test_dry_run_reports_without_changes(self):
+        output = self.repair("--dry-run")
+
+        self.assertIn("Пользователей с расхождениями: 2", output)
+        self.assertEqual(
+            stored_list(self.reader),
+            {self.flour.pk: 1, self.milk.pk: 300},
+        )
+        self.assertEqual(stored_list(self.other), {self.flour.pk: 200})
+
+    def test_repair_fixes_drift(self):
+        self.assertIn("Пользователей с расхождениями: 2", self.repair())
+        expected = {self.flour.pk: 200, self.milk.pk: 300}
+        self.assert_list(self.reader, expected)
+        self.assert_list(self.other, expected)
+        self.assertIn("Пользователей с расхождениями: 0", self.repair())
+
+    def test_rebuild(self):
+        self.assertIn("Строк в списках покупок: 4", self.repair("--rebuild"))
+        self.assert_list(self.reader, {self.flour.pk: 200, self.milk.pk: 300})
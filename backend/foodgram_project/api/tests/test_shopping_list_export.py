@@ -0,0 +1,87 @@
+import csv
+from io import StringIO
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from recipes.models import ShoppingCart
+
+from .factories import create_ingredient, create_recipe, create_user
+
+
+class DownloadShoppingCartTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        author = create_user()
+        self.reader = create_user()
+        flour = create_ingredient(name="мука")
+        milk = create_ingredient(name="молоко", measurement_unit="мл")
+        egg = create_ingredient(name="яйцо", measurement_unit="шт")
+        with self.captureOnCommitCallbacks(execute=True):
+            for recipe in (
+                create_recipe(author, {flour: 200, milk: 300}),
+                create_recipe(author, {flour: 100, egg: 2}),
+            ):
+                ShoppingCart.objects.create(user=self.reader, recipe=recipe)
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+        self.url = reverse("api:recipes-download-shopping-cart")
+
+    def download(self, **extra):
+        response = self.client.get(self.url, **extra)
+        self.assertEqual(response.status_code, 200)
+        if response.streaming:
+            return b"".join(response.streaming_content)
+        return response.content
+
+    def test_txt_sums_ingredients_across_recipes(self):
+        content = self.download()
+        self.assertEqual(
+            content.decode(),
+            "молоко(мл) - 300\nмука(г) - 300\nяйцо(шт) - 2\n",
+        )
+
+    def test_csv(self):
+        response = self.client.get(self.url, {"format": "csv"})
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn(
+            'filename="shopping_list.csv"', response["Content-Disposition"]
+        )
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.reader(StringIO(content)))
+        self.assertEqual(
+            rows,
+            [
+                ["Ингредиент", "Единица измерения", "Количество"],
+                ["молоко", "мл", "300"],
+                ["мука", "г", "300"],
+                ["яйцо", "шт", "2"],
+            ],
+        )
+
+    def test_format_from_accept_header(self):
+        content = self.download(HTTP_ACCEPT="text/csv")
+        self.assertTrue(content.decode().startswith("Ингредиент,"))
+
+    def test_pdf(self):
+        response = self.client.get(self.url, {"format": "pdf"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertIn("shopping_list.pdf", response["Content-Disposition"])
+        content = b"".join(response.streaming_content)
+        self.assertTrue(content.startswith(b"%PDF"))
+
+    def test_empty_cart(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ShoppingCart.objects.filter(user=self.reader).delete()
+        self.assertEqual(self.download(), b"")
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            self.download()
+
+    def test_requires_login(self):
+        response = APIClient().get(self.url)
+        self.assertEqual(response.status_code, 401)
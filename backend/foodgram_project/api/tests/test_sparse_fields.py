@@ -0,0 +1,94 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from users.models import Subscription
+
+from .factories import (create_ingredient, create_recipe, create_tag,
+                        create_user)
+
+
+class SparseFieldsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag = create_tag()
+            self.ingredient = create_ingredient()
+            self.recipe = create_recipe(
+                self.user, {self.ingredient: 100}, tags=[self.tag]
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list_keeps_requested_fields(self):
+        response = self.client.get(
+            reverse("api:recipes-list"), {"fields": "id, name"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": self.recipe.pk, "name": self.recipe.name}],
+        )
+
+    def test_nested_serializers_are_complete(self):
+        response = self.client.get(
+            reverse("api:recipes-detail", args=[self.recipe.pk]),
+            {"fields": "author"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("is_subscribed", response.json()["author"])
+
+    def test_subscriptions(self):
+        author = create_user()
+        with self.captureOnCommitCallbacks(execute=True):
+            create_recipe(author)
+            Subscription.objects.create(subscriber=self.user, user=author)
+        response = self.client.get(
+            reverse("api:users-subscriptions"), {"fields": "id,recipes"}
+        )
+        self.assertEqual(response.status_code, 200)
+        [row] = response.json()["results"]
+        self.assertEqual(set(row), {"id", "recipes"})
+        self.assertEqual(len(row["recipes"]), 1)
+
+    def test_unknown_field(self):
+        for url in (
+            reverse("api:recipes-list"),
+            reverse("api:recipes-detail", args=[self.recipe.pk]),
+            reverse("api:users-me"),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url, {"fields": "id,secret"})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("secret", response.json()["fields"])
+
+    def test_write_ignores_fields(self):
+        response = self.client.patch(
+            reverse("api:users-me") + "?fields=id",
+            {"first_name": "Пётр"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()["first_name"], "Пётр")
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Пётр")
+
+    def test_recipe_write_ignores_fields(self):
+        response = self.client.patch(
+            reverse("api:recipes-detail", args=[self.recipe.pk])
+            + "?fields=id",
+            {
+                "name": "Новое имя",
+                "text": "Новое описание",
+                "cooking_time": 15,
+                "tags": [self.tag.pk],
+                "ingredients": [{"id": self.ingredient.pk, "amount": 50}],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()["name"], "Новое имя")
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.name, "Новое имя")
@@ -0,0 +1,91 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from users.models import Subscription
+
+from .factories import create_recipe, create_user
+
+
+class SubscriptionsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+        self.url = reverse("api:users-subscriptions")
+
+    def subscribe_to_new_author(self, recipes=3):
+        author = create_user()
+        with self.captureOnCommitCallbacks(execute=True):
+            created = [create_recipe(author) for _ in range(recipes)]
+            Subscription.objects.create(subscriber=self.reader, user=author)
+        return author, created
+
+    def get(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def test_recipes_limit_keeps_newest(self):
+        author, recipes = self.subscribe_to_new_author()
+        [row] = self.get(recipes_limit=2)
+        self.assertEqual(row["id"], author.pk)
+        self.assertTrue(row["is_subscribed"])
+        self.assertEqual(row["recipes_count"], 3)
+        self.assertEqual(
+            [recipe["id"] for recipe in row["recipes"]],
+            [recipes[2].pk, recipes[1].pk],
+        )
+        self.assertEqual(
+            set(row["recipes"][0]), {"id", "name", "image", "cooking_time"}
+        )
+
+    def test_limit_is_per_author(self):
+        self.subscribe_to_new_author(recipes=1)
+        self.subscribe_to_new_author(recipes=3)
+        self.assertEqual(
+            [len(row["recipes"]) for row in self.get(recipes_limit=2)],
+            [2, 1],
+        )
+
+    def test_invalid_limit_returns_everything(self):
+        self.subscribe_to_new_author()
+        for value in ("", "0", "-1", "много"):
+            with self.subTest(recipes_limit=value):
+                [row] = self.get(recipes_limit=value)
+                self.assertEqual(len(row["recipes"]), 3)
+
+    def test_only_own_subscriptions(self):
+        author, _ = self.subscribe_to_new_author()
+        other = create_user()
+        Subscription.objects.create(subscriber=author, user=other)
+        self.assertEqual([row["id"] for row in self.get()], [author.pk])
+
+    def test_subscribe_response_honours_limit(self):
+        author = create_user()
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(3):
+                create_recipe(author)
+        response = self.client.post(
+            reverse("api:subscribe-list", args=[author.pk])
+            + "?recipes_limit=1"
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(len(response.json()["recipes"]), 1)
+        self.assertEqual(response.json()["recipes_count"], 3)
+
+    def test_query_count_does_not_grow_with_authors(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.get(recipes_limit=2)
+            return len(queries)
+
+        self.subscribe_to_new_author()
+        before = count_queries()
+        for _ in range(4):
+            self.subscribe_to_new_author()
+        self.assertEqual(count_queries(), before)
@@ -0,0 +1,42 @@
+from importlib import reload
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import clear_url_caches, resolve, reverse
+
+from api import urls
+
+
+def collection_actions():
+    """Пары (имя маршрута, путь) для всех @action(detail=False)."""
+    for prefix, viewset, basename in urls.router.registry:
+        for action in viewset.get_extra_actions():
+            if action.detail:
+                continue
+            name = f"{basename}-{action.url_name}"
+            yield name, reverse(name, urlconf=urls)
+
+
+class CollectionActionsRoutingTest(SimpleTestCase):
+    def tearDown(self):
+        reload(urls)
+        clear_url_caches()
+
+    def assert_actions_resolve(self):
+        actions = list(collection_actions())
+        self.assertIn("recipes-feed", dict(actions))
+        for name, path in actions:
+            with self.subTest(path=path):
+                self.assertEqual(resolve(path, urlconf=urls).url_name, name)
+
+    def test_sync_routes(self):
+        with override_settings(ASYNC_READ_VIEWS=False):
+            reload(urls)
+        clear_url_caches()
+        self.assert_actions_resolve()
+
+    def test_async_routes_do_not_shadow_actions(self):
+        with override_settings(ASYNC_READ_VIEWS=True):
+            reload(urls)
+        clear_url_caches()
+        self.assert_actions_resolve()
+        self.assertIsNone(resolve("/recipes/1/", urlconf=urls).url_name)
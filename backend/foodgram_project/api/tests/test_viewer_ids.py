@@ -0,0 +1,97 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api.serializers import (CustomUserSerializer, RecipeListSerializer,
+                             get_viewer_ids)
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Subscription, User
+
+from .factories import create_recipe, create_user
+
+
+class ViewerIdsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.viewer = create_user()
+        self.authors = [create_user() for _ in range(3)]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipes = [create_recipe(author) for author in self.authors]
+            Subscription.objects.create(
+                subscriber=self.viewer, user=self.authors[0]
+            )
+            Favorite.objects.create(user=self.viewer, recipe=self.recipes[1])
+            ShoppingCart.objects.create(
+                user=self.viewer, recipe=self.recipes[2]
+            )
+
+    def make_request(self, user=None):
+        request = Request(APIRequestFactory().get("/"))
+        request.user = user or self.viewer
+        return request
+
+    def test_loaded_once_per_relation(self):
+        request = self.make_request()
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                get_viewer_ids(request, "subscriptions"), {self.authors[0].pk}
+            )
+            get_viewer_ids(request, "subscriptions")
+        with self.assertNumQueries(2):
+            self.assertEqual(
+                get_viewer_ids(request, "favorites"), {self.recipes[1].pk}
+            )
+            self.assertEqual(
+                get_viewer_ids(request, "shopping_cart"), {self.recipes[2].pk}
+            )
+
+    def test_memo_is_per_request(self):
+        get_viewer_ids(self.make_request(), "subscriptions")
+        with self.assertNumQueries(1):
+            ids = get_viewer_ids(
+                self.make_request(self.authors[0]), "subscriptions"
+            )
+        self.assertEqual(ids, set())
+
+    def test_users_without_annotation(self):
+        users = list(User.objects.filter(recipes__isnull=False).order_by("id"))
+        context = {"request": self.make_request()}
+        with self.assertNumQueries(1):
+            data = CustomUserSerializer(users, many=True, context=context).data
+        self.assertEqual(
+            [row["is_subscribed"] for row in data], [True, False, False]
+        )
+
+    def test_recipes_without_annotation(self):
+        recipes = list(
+            Recipe.objects.order_by("id")
+            .select_related("author")
+            .prefetch_related("tags", "ingredient_recipe")
+        )
+        serializer = RecipeListSerializer(
+            recipes, many=True, context={"request": self.make_request()}
+        )
+        with self.assertNumQueries(3):
+            data = serializer.data
+        self.assertEqual(
+            [
+                (
+                    row["author"]["is_subscribed"],
+                    row["is_favorited"],
+                    row["is_in_shopping_cart"],
+                )
+                for row in data
+            ],
+            [(True, False, False), (False, True, False), (False, False, True)],
+        )
+
+    def test_subscribe_response(self):
+        client = APIClient()
+        client.force_authenticate(self.viewer)
+        response = client.post(
+            reverse("api:subscribe-list", args=[self.authors[1].pk])
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.json()["is_subscribed"])
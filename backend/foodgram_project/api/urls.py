@@ -1,4 +1,5 @@
-from django.urls import include, path
+from django.conf import settings
+from django.urls import include, path, re_path
 from rest_framework import routers
 
 from .views import (CustomUserViewSet, FavoriveViewSet, IngredientViewSet,
@@ -29,3 +30,17 @@ urlpatterns = [
     path("", include(router.urls)),
     path("auth/", include("djoser.urls.authtoken")),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    from . import async_views
+
+    # pk только из цифр: иначе эти маршруты, стоящие перед роутером,
+    # перехватят действия вроде recipes/feed/.
+    urlpatterns = [
+        re_path(r"^tags/$", async_views.tag_list),
+        re_path(r"^tags/(?P<pk>\d+)/$", async_views.tag_detail),
+        re_path(r"^ingredients/$", async_views.ingredient_list),
+        re_path(r"^ingredients/(?P<pk>\d+)/$", async_views.ingredient_detail),
+        re_path(r"^recipes/$", async_views.recipe_list),
+        re_path(r"^recipes/(?P<pk>\d+)/$", async_views.recipe_detail),
+    ] + urlpatterns
@@ -1,30 +1,62 @@
-from django.http import HttpResponse
+from functools import partial
+
+from django.conf import settings
+from django.db.models import (BooleanField, Exists, OuterRef, Prefetch,
+                              Subquery, Value)
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
 
 from recipes.models import (Amount, Favorite, Ingredient, Recipe, ShoppingCart,
-                            Tag)
+                            ShoppingListItem, Tag)
 from users.models import Subscription, User
 
+from .cache import (INGREDIENTS, RECIPES, SCORES, TAGS, get_versions,
+                    recipe_namespace, viewer_namespace)
+from .feed import get_feed_ids
 from .filters import IngredientSearchFilter, RecipeFilter
-from .mixins import CreateDestroyViewSet, ListRetrieveViewSet
-from .pagination import CustomPageNumberPagination
+from .ingredient_index import ingredient_index
+from .mixins import (CreateDestroyViewSet, CursorPaginationMixin,
+                     ListRetrieveViewSet, SparseFieldsMixin,
+                     VersionCachedMixin)
+from .pagination import CustomPageNumberPagination, FeedPagination
+from .renderers import CSVRenderer, PDFRenderer, PlainTextRenderer
 from .serializers import (CustomUserCreateSerializer, CustomUserSerializer,
                           FavoriteSerializer, IngredientSerializer,
                           RecipeListSerializer, RecipeSerializer,
-                          ShoppingCartSerializer, SubscriptionListSerializer,
-                          SubscriptionSerializer, TagSerializer)
+                          ShoppingCartSerializer, ShoppingListItemSerializer,
+                          SubscriptionListSerializer, SubscriptionSerializer,
+                          TagSerializer)
+from .shopping_list import (build_pdf, get_shopping_list, stream_csv,
+                            stream_txt)
 
 
-class CustomUserViewSet(UserViewSet):
+class CustomUserViewSet(
+    SparseFieldsMixin, CursorPaginationMixin, UserViewSet
+):
     queryset = User.objects.all()
     serializer_class = CustomUserSerializer
     pagination_class = CustomPageNumberPagination
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        queryset = super().get_queryset().order_by("id")
+        user = self.request.user
+        if user.is_anonymous or not self.wants_field("is_subscribed"):
+            return queryset
+        return queryset.annotate(
+            is_subscribed=Exists(
+                Subscription.objects.filter(
+                    subscriber=user, user=OuterRef("pk")
+                )
+            )
+        )
+
     def get_serializer_class(self):
         if self.action == "create":
             return CustomUserCreateSerializer
@@ -42,26 +74,47 @@ class CustomUserViewSet(UserViewSet):
         detail=False,
     )
     def subscriptions(self, request):
-        user = request.user
-        queryset = User.objects.filter(subscribing_to__subscriber=user)
-        serializer = self.get_serializer(
-            queryset, many=True, context={"request": request}
+        recipes = Recipe.objects.only(
+            "id", "name", "image", "image_variants", "cooking_time", "author"
+        ).order_by("-id")
+        limit = SubscriptionListSerializer.parse_recipes_limit(request)
+        if limit:
+            recipes = recipes.filter(
+                pk__in=Subquery(
+                    Recipe.objects.filter(author=OuterRef("author"))
+                    .order_by("-id")
+                    .values("pk")[:limit]
+                )
+            )
+        queryset = (
+            User.objects.filter(subscribing_to__subscriber=request.user)
+            .annotate(
+                is_subscribed=Value(True, output_field=BooleanField()),
+            )
+            .order_by("-id")
         )
+        if self.wants_field("recipes"):
+            queryset = queryset.prefetch_related(
+                Prefetch("recipes", queryset=recipes, to_attr="recipes_page")
+            )
         page = self.paginate_queryset(queryset)
-        if page:
+        if page is not None:
             serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(queryset, many=True)
-        return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
 
 
-class TagViewSet(ListRetrieveViewSet):
+class TagViewSet(VersionCachedMixin, ListRetrieveViewSet):
+    cache_namespace = TAGS
     queryset = Tag.objects.all()
     permission_classes = (AllowAny,)
     serializer_class = TagSerializer
     pagination_class = None
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(VersionCachedMixin, viewsets.ReadOnlyModelViewSet):
+    cache_namespace = INGREDIENTS
     queryset = Ingredient.objects.all()
     permission_classes = (AllowAny,)
     serializer_class = IngredientSerializer
@@ -69,47 +122,198 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ('^name',)
     pagination_class = None
 
+    def filter_queryset(self, queryset):
+        name = self.request.query_params.get(
+            IngredientSearchFilter.search_param
+        )
+        if (
+            self.action != "list"
+            or not name
+            or not settings.INGREDIENT_INDEX_ENABLED
+        ):
+            return super().filter_queryset(queryset)
+        return ingredient_index.search(name, limit=self.get_search_limit())
+
+    def get_search_limit(self):
+        try:
+            limit = int(self.request.query_params["limit"])
+        except (KeyError, ValueError):
+            return settings.INGREDIENT_SEARCH_LIMIT
+        return limit if limit > 0 else settings.INGREDIENT_SEARCH_LIMIT
 
-class RecipeViewSet(viewsets.ModelViewSet):
+
+class RecipeViewSet(
+    VersionCachedMixin,
+    SparseFieldsMixin,
+    CursorPaginationMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Recipe.objects.all()
     filter_backends = [DjangoFilterBackend]
     filterset_class = RecipeFilter
     pagination_class = CustomPageNumberPagination
+    cache_namespace = RECIPES
+    cache_query_params = (
+        "tags",
+        "author",
+        "is_favorited",
+        "is_in_shopping_cart",
+        "search",
+        "ingredients",
+        "ingredients_any",
+        "exclude_ingredients",
+        "ordering",
+        "fields",
+        "page",
+        "limit",
+        "pagination",
+        "cursor",
+    )
+    cache_timeout = settings.RECIPE_CACHE_TIMEOUT
+    cursor_conflicting_params = ("search", "ordering")
+
+    def use_cache(self):
+        return self.request.user.is_anonymous
+
+    def get_cache_version(self, **kwargs):
+        if self.action == "retrieve":
+            namespaces = [recipe_namespace(kwargs["pk"]), TAGS, INGREDIENTS]
+        else:
+            namespaces = [RECIPES, TAGS, INGREDIENTS]
+            if "ordering" in self.request.query_params:
+                namespaces.append(SCORES)
+        if not self.request.user.is_anonymous:
+            namespaces.append(viewer_namespace(self.request.user.pk))
+        return get_versions(*namespaces)
+
+    def get_last_modified(self, **kwargs):
+        """Для рецепта — его поле modified, для списка — момент, когда
+        впервые отдана текущая версия: так удаление рецепта тоже сдвигает
+        дату."""
+        if self.action != "retrieve":
+            return timezone.now()
+        try:
+            return (
+                Recipe.objects.filter(pk=kwargs["pk"])
+                .values_list("modified", flat=True)
+                .first()
+            )
+        except (TypeError, ValueError):
+            return None
+
+    def get_queryset(self):
+        user = self.request.user
+        if self.action not in ("list", "retrieve", "feed"):
+            return Recipe.objects.defer("search_vector")
+        queryset = Recipe.objects.defer("search_vector").order_by(
+            "-created", "-id"
+        )
+        if not self.wants_field("text"):
+            queryset = queryset.defer("text")
+        if self.wants_field("tags"):
+            queryset = queryset.prefetch_related("tags")
+        if self.wants_field("ingredients"):
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "ingredient_recipe",
+                    queryset=Amount.objects.select_related("ingredient"),
+                )
+            )
+        if user.is_anonymous:
+            if self.wants_field("author"):
+                queryset = queryset.select_related("author")
+            return queryset
+        if self.wants_field("author"):
+            authors = User.objects.annotate(
+                is_subscribed=Exists(
+                    Subscription.objects.filter(
+                        subscriber=user, user=OuterRef("pk")
+                    )
+                )
+            )
+            queryset = queryset.prefetch_related(
+                Prefetch("author", queryset=authors)
+            )
+        flags = {"is_favorited": Favorite, "is_in_shopping_cart": ShoppingCart}
+        return queryset.annotate(
+            **{
+                name: Exists(
+                    model.objects.filter(user=user, recipe=OuterRef("pk"))
+                )
+                for name, model in flags.items()
+                if self.wants_field(name) or name in self.request.query_params
+            }
+        )
 
     def get_serializer_class(self):
-        if self.action in ("list", "retrieve"):
+        if self.action in ("list", "retrieve", "feed"):
             return RecipeListSerializer
+        if self.action == "shopping_list":
+            return ShoppingListItemSerializer
         return RecipeSerializer
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ("list", "feed"):
+            context["image_variant"] = "card"
+        return context
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        permission_classes=[IsAuthenticated],
+    )
+    def feed(self, request):
+        paginator = FeedPagination()
+        ids = paginator.paginate_ids(
+            partial(get_feed_ids, request.user), request
+        )
+        recipes = self.get_queryset().filter(pk__in=ids).order_by("-id")
+        serializer = self.get_serializer(recipes, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        permission_classes=[IsAuthenticated],
+    )
+    def shopping_list(self, request):
+        items = (
+            ShoppingListItem.objects.filter(user=request.user)
+            .select_related("ingredient")
+            .order_by("ingredient__name", "ingredient__measurement_unit")
+        )
+        serializer = self.get_serializer(items, many=True)
+        return Response(serializer.data)
+
     @action(
         methods=[
             "GET",
         ],
         url_path="download_shopping_cart",
-        detail=False
+        detail=False,
+        permission_classes=[IsAuthenticated],
+        renderer_classes=[PlainTextRenderer, CSVRenderer, PDFRenderer],
     )
     def download_shopping_cart(self, request):
-        shopping_list = {}
-        user = request.user
-        recipe_queryset = Recipe.objects.filter(shopping_cart__user=user)
-        for recipe in recipe_queryset:
-            amount_queryset = Amount.objects.filter(recipe=recipe)
-            for amount in amount_queryset:
-                ingredient_str = (
-                    f'{amount.ingredient}'
-                    f'({amount.ingredient.measurement_unit})'
-                )
-                if ingredient_str in shopping_list:
-                    amount_int = shopping_list[ingredient_str]
-                    amount_sum = amount_int + amount.amount
-                    shopping_list[ingredient_str] = amount_sum
-                else:
-                    shopping_list[ingredient_str] = amount.amount
-            print(shopping_list)
-        text = []
-        for key, value in shopping_list.items():
-            text += f'{key} - {value}\n'
-        response = HttpResponse(text, content_type='text/plain')
+        shopping_list = get_shopping_list(request.user)
+        file_format = request.accepted_renderer.format
+        filename = f"shopping_list.{file_format}"
+        if file_format == "pdf":
+            return FileResponse(
+                build_pdf(shopping_list),
+                as_attachment=True,
+                filename=filename,
+                content_type=PDFRenderer.media_type,
+            )
+        stream = stream_csv if file_format == "csv" else stream_txt
+        response = StreamingHttpResponse(
+            stream(shopping_list),
+            content_type=(
+                f"{request.accepted_renderer.media_type}; charset=utf-8"
+            ),
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
         return response
 
 
@@ -48,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -92,6 +93,28 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', '/tmp/foodgram_cache'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 10000)),
+        },
+    }
+}
+
+if os.getenv('MEMCACHED_LOCATION'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': os.getenv('MEMCACHED_LOCATION'),
+    }
+
+REFERENCE_CACHE_TIMEOUT = 60 * 60 * 24
+RECIPE_CACHE_TIMEOUT = 60 * 10
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -141,7 +164,16 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 6
@@ -153,3 +185,60 @@ DJOSER = {
     },
     'HIDE_USERS': False
 }
+
+SHOPPING_LIST_FONT = os.getenv(
+    'SHOPPING_LIST_FONT', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+)
+
+FEED_FANOUT_LIMIT = int(os.getenv('FEED_FANOUT_LIMIT', 5000))
+
+RECIPE_SCORE_WEIGHTS = {
+    'favorite': 1.0,
+    'shopping_cart': 0.5,
+}
+RECIPE_SCORE_HALF_LIFE_DAYS = {
+    'popular': 30,
+    'trending': 3.5,
+}
+
+TOKEN_CACHE_ENABLED = os.getenv('TOKEN_CACHE_ENABLED', 'True') == 'True'
+TOKEN_CACHE_LOCAL_SIZE = int(os.getenv('TOKEN_CACHE_LOCAL_SIZE', 1000))
+TOKEN_CACHE_LOCAL_TIMEOUT = 5
+TOKEN_CACHE_TIMEOUT = 300
+TOKEN_CACHE_SHARED = os.getenv(
+    'TOKEN_CACHE_SHARED', str(bool(os.getenv('MEMCACHED_LOCATION')))
+) == 'True'
+
+RECIPE_IMAGE_WORKERS = int(os.getenv('RECIPE_IMAGE_WORKERS', 2))
+RECIPE_IMAGE_FORMAT = 'WEBP'
+RECIPE_IMAGE_QUALITY = 80
+RECIPE_IMAGE_VARIANTS = {
+    'thumbnail': ('200x200', {'crop': 'center'}),
+    'card': ('600x400', {'crop': 'center'}),
+    'detail': ('1200x800', {}),
+}
+
+INGREDIENT_INDEX_ENABLED = True
+INGREDIENT_SEARCH_LIMIT = 100
+
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', 'False') == 'True'
+ASYNC_READ_WORKERS = int(os.getenv('ASYNC_READ_WORKERS', 8))
+
+QUERY_INSTRUMENTATION = os.getenv('QUERY_INSTRUMENTATION', 'False') == 'True'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.queries': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -2,7 +2,15 @@ from django.contrib import admin
 
 from .models import Amount, Ingredient, Recipe, Tag
 
+
+@admin.register(Recipe)
+class RecipeAdmin(admin.ModelAdmin):
+    list_display = (
+        "name", "author", "favorites_count", "shopping_cart_count"
+    )
+    readonly_fields = ("favorites_count", "shopping_cart_count")
+
+
 admin.site.register(Ingredient)
-admin.site.register(Recipe)
 admin.site.register(Tag)
 admin.site.register(Amount)
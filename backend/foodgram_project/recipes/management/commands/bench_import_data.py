@@ -0,0 +1,92 @@
+import csv
+import io
+import os
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+from django.core.management import BaseCommand, call_command
+from django.db import transaction
+
+from recipes.models import Ingredient
+
+UNITS = ("г", "кг", "мл", "л", "шт.", "по вкусу")
+
+
+class Command(BaseCommand):
+    help = (
+        "Генерирует файл с ингредиентами и дважды загружает его через "
+        "import_data: второй прогон не должен ничего добавить. Все данные "
+        "откатываются после замера."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            default="csv",
+            choices=("csv", "jsonl"),
+        )
+        parser.add_argument("--no-copy", action="store_true")
+        parser.add_argument(
+            "--trace-memory",
+            action="store_true",
+            help="Замерить пиковую память через tracemalloc, "
+            "это заметно замедляет загрузку.",
+        )
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(
+                directory, f"ingredients.{options['file_format']}"
+            )
+            self.write_file(path, options["rows"], options["file_format"])
+            self.stdout.write(
+                f"Файл: {options['rows']} строк, "
+                f"{os.path.getsize(path) / 2 ** 20:.1f} МиБ"
+            )
+            with transaction.atomic():
+                for attempt in ("первый прогон", "повторный прогон"):
+                    self.measure(attempt, path, options)
+                transaction.set_rollback(True)
+
+    @staticmethod
+    def write_file(path, rows, file_format):
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            if file_format == "csv":
+                writer = csv.writer(file)
+                writer.writerow(("name", "measurement_unit"))
+                for i in range(rows):
+                    writer.writerow((f"bench-import-{i}", UNITS[i % 6]))
+            else:
+                for i in range(rows):
+                    file.write(
+                        f'{{"name": "bench-import-{i}", '
+                        f'"measurement_unit": "{UNITS[i % 6]}"}}\n'
+                    )
+
+    def measure(self, label, path, options):
+        before = Ingredient.objects.count()
+        if options["trace_memory"]:
+            tracemalloc.start()
+        started = perf_counter()
+        call_command(
+            "import_data",
+            path,
+            batch_size=options["batch_size"],
+            no_copy=options["no_copy"],
+            stdout=io.StringIO(),
+        )
+        elapsed = perf_counter() - started
+        peak = ""
+        if options["trace_memory"]:
+            _, traced = tracemalloc.get_traced_memory()
+            peak = f", пик памяти {traced / 2 ** 20:.1f} МиБ"
+            tracemalloc.stop()
+        inserted = Ingredient.objects.count() - before
+        self.stdout.write(
+            f"{label}: добавлено {inserted} за {elapsed:.2f} с "
+            f"({options['rows'] / elapsed:.0f} строк/с){peak}"
+        )
@@ -0,0 +1,227 @@
+import random
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from api.cache import INGREDIENTS, RECIPES, bump_version
+from api.counters import repair_counters
+from api.feed import rebuild_feeds
+from api.popularity import rebuild_scores
+from api.search import rebuild_index
+from api.shopping_list import rebuild_shopping_lists
+from recipes.models import (Amount, Favorite, Ingredient, Recipe, ShoppingCart,
+                            Tag)
+from users.models import Subscription, User
+
+PREFIX = "synthetic"
+TAGS = (
+    ("Завтрак", "breakfast", "#E26C2D"),
+    ("Обед", "lunch", "#eb4034"),
+    ("Ужин", "dinner", "#8908a3"),
+)
+
+
+class SkewedSampler:
+    """Выбирает элементы с вероятностью, убывающей по закону Ципфа."""
+
+    def __init__(self, items, skew, rng):
+        self.items = items
+        self.rng = rng
+        self.weights = list(
+            accumulate(1 / (rank ** skew) for rank in range(1, len(items) + 1))
+        )
+
+    def sample(self, count, exclude=None):
+        count = min(count, len(self.items) - (1 if exclude else 0))
+        chosen = set()
+        while len(chosen) < count:
+            item = self.rng.choices(self.items, cum_weights=self.weights)[0]
+            if item != exclude:
+                chosen.add(item)
+        return chosen
+
+
+class Command(BaseCommand):
+    help = (
+        "Генерирует воспроизводимый набор пользователей, рецептов, "
+        "избранного, списков покупок и подписок для нагрузочных замеров."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--recipes-per-user", type=int, default=5)
+        parser.add_argument("--ingredients-per-recipe", type=int, default=8)
+        parser.add_argument("--favorites-per-user", type=int, default=20)
+        parser.add_argument("--cart-per-user", type=int, default=5)
+        parser.add_argument("--subscriptions-per-user", type=int, default=10)
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Показатель распределения Ципфа для популярности авторов "
+            "и рецептов, 0 — равномерно.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Удалить ранее сгенерированные данные перед генерацией.",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+        with transaction.atomic():
+            if options["clear"]:
+                User.objects.filter(username__startswith=f"{PREFIX}-").delete()
+            tags = self.get_tags()
+            ingredients = self.get_ingredients(
+                options["ingredients_per_recipe"], batch_size
+            )
+            users = self.create_users(options["users"], batch_size)
+            recipes = self.create_recipes(
+                users, options["recipes_per_user"], rng, tags, batch_size
+            )
+            self.create_amounts(
+                recipes,
+                ingredients,
+                options["ingredients_per_recipe"],
+                rng,
+                batch_size,
+            )
+            authors = SkewedSampler(users, options["skew"], rng)
+            popular = SkewedSampler(recipes, options["skew"], rng)
+            Subscription.objects.bulk_create(
+                (
+                    Subscription(subscriber_id=user, user_id=author)
+                    for user in users
+                    for author in authors.sample(
+                        options["subscriptions_per_user"], exclude=user
+                    )
+                ),
+                batch_size=batch_size,
+            )
+            for model, per_user in (
+                (Favorite, options["favorites_per_user"]),
+                (ShoppingCart, options["cart_per_user"]),
+            ):
+                model.objects.bulk_create(
+                    (
+                        model(user_id=user, recipe_id=recipe)
+                        for user in users
+                        for recipe in popular.sample(per_user)
+                    ),
+                    batch_size=batch_size,
+                )
+            rebuild_index()
+            repair_counters()
+            rebuild_feeds()
+            rebuild_scores()
+            rebuild_shopping_lists()
+        bump_version(INGREDIENTS)
+        bump_version(RECIPES)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Создано пользователей: {len(users)}, "
+                f"рецептов: {len(recipes)}"
+            )
+        )
+
+    @staticmethod
+    def get_tags():
+        for name, slug, color in TAGS:
+            Tag.objects.get_or_create(
+                slug=slug, defaults={"name": name, "color": color}
+            )
+        return list(Tag.objects.values_list("id", flat=True))
+
+    @staticmethod
+    def get_ingredients(per_recipe, batch_size):
+        ingredients = list(Ingredient.objects.values_list("id", flat=True))
+        if len(ingredients) < per_recipe:
+            Ingredient.objects.bulk_create(
+                (
+                    Ingredient(name=f"{PREFIX}-{i}", measurement_unit="г")
+                    for i in range(per_recipe * 10)
+                ),
+                batch_size=batch_size,
+            )
+            ingredients = list(
+                Ingredient.objects.values_list("id", flat=True)
+            )
+        return ingredients
+
+    @staticmethod
+    def create_users(count, batch_size):
+        start = User.objects.filter(username__startswith=f"{PREFIX}-").count()
+        password = make_password(None)
+        User.objects.bulk_create(
+            (
+                User(
+                    username=f"{PREFIX}-{i}",
+                    email=f"{PREFIX}-{i}@example.com",
+                    first_name="Synthetic",
+                    last_name=str(i),
+                    password=password,
+                )
+                for i in range(start, start + count)
+            ),
+            batch_size=batch_size,
+        )
+        return list(
+            User.objects.filter(username__startswith=f"{PREFIX}-")
+            .order_by("id")
+            .values_list("id", flat=True)[start:]
+        )
+
+    @staticmethod
+    def create_recipes(users, per_user, rng, tags, batch_size):
+        last_id = (
+            Recipe.objects.order_by("-id").values_list("id", flat=True).first()
+            or 0
+        )
+        Recipe.objects.bulk_create(
+            (
+                Recipe(
+                    author_id=user,
+                    name=f"Рецепт {user}-{i}",
+                    text="Сгенерированный рецепт. " * rng.randint(1, 20),
+                    cooking_time=rng.randint(5, 180),
+                )
+                for user in users
+                for i in range(per_user)
+            ),
+            batch_size=batch_size,
+        )
+        recipes = list(
+            Recipe.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        Recipe.tags.through.objects.bulk_create(
+            (
+                Recipe.tags.through(recipe_id=recipe, tag_id=tag)
+                for recipe in recipes
+                for tag in rng.sample(tags, rng.randint(1, len(tags)))
+            ),
+            batch_size=batch_size,
+        )
+        return recipes
+
+    @staticmethod
+    def create_amounts(recipes, ingredients, per_recipe, rng, batch_size):
+        Amount.objects.bulk_create(
+            (
+                Amount(
+                    recipe_id=recipe,
+                    ingredient_id=ingredient,
+                    amount=rng.randint(1, 500),
+                )
+                for recipe in recipes
+                for ingredient in rng.sample(ingredients, per_recipe)
+            ),
+            batch_size=batch_size,
+        )
@@ -1,27 +1,150 @@
-from csv import DictReader
-from pathlib import Path
-from django.core.management import BaseCommand
+import csv
+import io
+import json
+import os
+from itertools import islice
+from time import perf_counter
 
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.cache import INGREDIENTS, bump_version
 from recipes.models import Ingredient
 
-DATA_TABLE = {
-    Ingredient: "ingredients.csv",
-}
-DATA_DIR = Path(__file__).parent.parent.resolve()
+FIELDS = ("name", "measurement_unit")
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+STAGING_TABLE = "import_ingredient"
+
+
+def read_csv(file):
+    return csv.DictReader(file)
+
+
+def read_jsonl(file):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl}
+
+
+def iter_rows(file, file_format):
+    for number, data in enumerate(READERS[file_format](file), start=1):
+        try:
+            name, measurement_unit = (data[field].strip() for field in FIELDS)
+        except (KeyError, AttributeError, TypeError):
+            raise CommandError(f"Запись {number}: ожидаются поля {FIELDS}")
+        if name:
+            yield name, measurement_unit
+
+
+def iter_batches(rows, batch_size):
+    rows = iter(rows)
+    batch = list(islice(rows, batch_size))
+    while batch:
+        yield batch
+        batch = list(islice(rows, batch_size))
 
 
 class Command(BaseCommand):
-    help = "Loads data from foodgram-project/data"
+    help = (
+        "Загружает ингредиенты из CSV или JSON Lines пачками. Уже "
+        "существующие пары (name, measurement_unit) пропускаются, поэтому "
+        "повторный запуск ничего не меняет."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default=os.path.join(settings.BASE_DIR, "data", "ingredients.csv"),
+        )
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=READERS,
+            help="Формат файла, по умолчанию определяется по расширению.",
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument(
+            "--no-copy",
+            action="store_true",
+            help="Не использовать COPY на PostgreSQL.",
+        )
 
     def handle(self, *args, **options):
-        for model, csv_file in DATA_TABLE.items():
-            with open(
-                f'/app/data/{csv_file}',
-                "r",
-                encoding="utf-8",
-            ) as file:
-                reader = DictReader(file)
-                model.objects.bulk_create(model(**data) for data in reader)
+        path = options["path"]
+        file_format = options["file_format"] or FORMATS.get(
+            os.path.splitext(path)[1].lower()
+        )
+        if file_format is None:
+            raise CommandError(
+                "Не удалось определить формат, укажите --format"
+            )
+        use_copy = connection.vendor == "postgresql" and not options["no_copy"]
+        started = perf_counter()
+        before = Ingredient.objects.count()
+        try:
+            with open(path, encoding="utf-8", newline="") as file:
+                rows = iter_rows(file, file_format)
+                batches = iter_batches(rows, options["batch_size"])
+                with transaction.atomic():
+                    load = self.copy if use_copy else self.bulk_create
+                    total = load(batches)
+        except OSError as error:
+            raise CommandError(error)
+        except ValueError as error:
+            raise CommandError(f"Некорректный файл {path}: {error}")
+        inserted = Ingredient.objects.count() - before
+        elapsed = perf_counter() - started
+        bump_version(INGREDIENTS)
         self.stdout.write(
-            self.style.SUCCESS("***Data was succesfully loaded***")
+            self.style.SUCCESS(
+                f"Прочитано {total} строк, добавлено {inserted} за "
+                f"{elapsed:.2f} с ({total / max(elapsed, 1e-9):.0f} строк/с)"
+            )
         )
+
+    @staticmethod
+    def bulk_create(batches):
+        total = 0
+        for batch in batches:
+            Ingredient.objects.bulk_create(
+                (
+                    Ingredient(name=name, measurement_unit=measurement_unit)
+                    for name, measurement_unit in batch
+                ),
+                ignore_conflicts=True,
+            )
+            total += len(batch)
+        return total
+
+    @staticmethod
+    def copy(batches):
+        table = connection.ops.quote_name(Ingredient._meta.db_table)
+        total = 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE {STAGING_TABLE} "
+                "(name varchar(200), measurement_unit varchar(200))"
+            )
+            for batch in batches:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(batch)
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f"COPY {STAGING_TABLE} (name, measurement_unit) "
+                    "FROM STDIN WITH (FORMAT csv, "
+                    "FORCE_NOT_NULL (name, measurement_unit))",
+                    buffer,
+                )
+                total += len(batch)
+            cursor.execute(
+                f"INSERT INTO {table} (name, measurement_unit) "
+                f"SELECT DISTINCT name, measurement_unit FROM {STAGING_TABLE} "
+                "ON CONFLICT (name, measurement_unit) DO NOTHING"
+            )
+            cursor.execute(f"DROP TABLE {STAGING_TABLE}")
+        return total
@@ -0,0 +1,51 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:18
+
+from django.db import migrations
+from django.db.models import Count, Min, Sum
+
+
+def delete_duplicates(model, fields):
+    duplicates = (
+        model.objects.values(*fields)
+        .annotate(keep_id=Min('id'), total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for duplicate in list(duplicates):
+        model.objects.filter(
+            **{field: duplicate[field] for field in fields}
+        ).exclude(id=duplicate['keep_id']).delete()
+
+
+def merge_amounts(Amount):
+    duplicates = (
+        Amount.objects.values('recipe', 'ingredient')
+        .annotate(keep_id=Min('id'), amount_sum=Sum('amount'), total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for duplicate in list(duplicates):
+        rows = Amount.objects.filter(
+            recipe=duplicate['recipe'], ingredient=duplicate['ingredient']
+        )
+        rows.filter(id=duplicate['keep_id']).update(
+            amount=duplicate['amount_sum']
+        )
+        rows.exclude(id=duplicate['keep_id']).delete()
+
+
+def dedupe(apps, schema_editor):
+    delete_duplicates(apps.get_model('recipes', 'Favorite'), ('user', 'recipe'))
+    delete_duplicates(
+        apps.get_model('recipes', 'ShoppingCart'), ('user', 'recipe')
+    )
+    merge_amounts(apps.get_model('recipes', 'Amount'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe, migrations.RunPython.noop),
+    ]
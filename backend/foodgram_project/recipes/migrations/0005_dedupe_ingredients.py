@@ -0,0 +1,45 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:30
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_ingredients(apps, schema_editor):
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    Amount = apps.get_model('recipes', 'Amount')
+    duplicates = (
+        Ingredient.objects.values('name', 'measurement_unit')
+        .annotate(keep_id=Min('id'), total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for duplicate in list(duplicates):
+        keep_id = duplicate['keep_id']
+        extra_ids = list(
+            Ingredient.objects.filter(
+                name=duplicate['name'],
+                measurement_unit=duplicate['measurement_unit'],
+            ).exclude(id=keep_id).values_list('id', flat=True)
+        )
+        for amount in Amount.objects.filter(ingredient_id__in=extra_ids):
+            kept = Amount.objects.filter(
+                recipe_id=amount.recipe_id, ingredient_id=keep_id
+            ).first()
+            if kept:
+                kept.amount += amount.amount
+                kept.save(update_fields=['amount'])
+                amount.delete()
+            else:
+                amount.ingredient_id = keep_id
+                amount.save(update_fields=['ingredient'])
+        Ingredient.objects.filter(id__in=extra_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_unique_user_relations'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_ingredients, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:05
+
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE recipes_recipe_fts USING fts5("
+    "name, text, tokenize = 'unicode61 remove_diacritics 2')",
+    "INSERT INTO recipes_recipe_fts (rowid, name, text) "
+    "SELECT id, name, text FROM recipes_recipe",
+]
+SQLITE_BACKWARD = ["DROP TABLE recipes_recipe_fts"]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': SQLITE_FORWARD}),
+            run({'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
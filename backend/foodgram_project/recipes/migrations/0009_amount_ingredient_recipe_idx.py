@@ -0,0 +1,17 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_recipe_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='amount',
+            index=models.Index(fields=['ingredient', 'recipe'], name='amount_ingredient_recipe_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:44
+
+import time
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import F
+
+
+def fill_scores(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    RecipeScore = apps.get_model('recipes', 'RecipeScore')
+    now = time.time()
+    recipes = Recipe.objects.annotate(
+        value=F('favorites_count') + F('shopping_cart_count') * 0.5
+    ).values_list('id', 'value')
+    RecipeScore.objects.bulk_create(
+        (
+            RecipeScore(
+                recipe_id=recipe, popular=score, trending=score,
+                decayed_at=now,
+            )
+            for recipe, score in recipes.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_feedentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeScore',
+            fields=[
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score', serialize=False, to='recipes.recipe', verbose_name='Рецепт')),
+                ('popular', models.FloatField(default=0, verbose_name='Популярность')),
+                ('trending', models.FloatField(default=0, verbose_name='Популярность за неделю')),
+                ('decayed_at', models.FloatField(verbose_name='Пересчитано')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='recipescore',
+            index=models.Index(fields=['-popular'], name='score_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipescore',
+            index=models.Index(fields=['-trending'], name='score_trending_idx'),
+        ),
+        migrations.RunPython(fill_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:02
+
+import django.contrib.postgres.search
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+INDEX = GinIndex(
+    fields=['search_vector'], name='recipes_recipe_search_vector_gin'
+)
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Recipe.objects.update(
+        search_vector=SearchVector('name', weight='A', config='russian')
+        + SearchVector('text', weight='B', config='russian')
+    )
+    schema_editor.execute(INDEX.create_sql(Recipe, schema_editor))
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Recipe = apps.get_model('recipes', 'Recipe')
+    schema_editor.execute(INDEX.remove_sql(Recipe, schema_editor))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0014_shoppinglistitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -1,6 +1,7 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
-from users.models import User
+from users.models import CounterFieldsMixin, User
 
 COLOR_CHOICES = (
     ("#E26C2D", "Оранжевый"),
@@ -17,6 +18,13 @@ class Ingredient(models.Model):
         max_length=200, verbose_name="Единица измерения"
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["name", "measurement_unit"], name="unique_ingredient"
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -30,7 +38,7 @@ class Tag(models.Model):
         return self.name
 
 
-class Recipe(models.Model):
+class Recipe(CounterFieldsMixin, models.Model):
     name = models.CharField(max_length=200, verbose_name="Название рецепта")
     text = models.TextField(verbose_name="Описание рецепта")
     author = models.ForeignKey(
@@ -49,6 +57,30 @@ class Recipe(models.Model):
     image = models.ImageField(
         "Картинка", upload_to="recipes/", blank=True, null=True
     )
+    image_variants = models.JSONField(
+        "Уменьшенные копии картинки", default=dict, blank=True, editable=False
+    )
+    favorites_count = models.PositiveIntegerField(
+        "В избранном", default=0, editable=False
+    )
+    shopping_cart_count = models.PositiveIntegerField(
+        "В списках покупок", default=0, editable=False
+    )
+    created = models.DateTimeField("Создан", auto_now_add=True)
+    modified = models.DateTimeField("Изменён", auto_now=True)
+    search_vector = SearchVectorField(
+        "Поисковый вектор", null=True, editable=False
+    )
+
+    counter_fields = ("favorites_count", "shopping_cart_count")
+    derived_fields = ("search_vector",)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-created", "-id"], name="recipe_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -69,6 +101,20 @@ class Amount(models.Model):
         verbose_name="Рецепт"
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipe", "ingredient"],
+                name="unique_recipe_ingredient",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["ingredient", "recipe"],
+                name="amount_ingredient_recipe_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.recipe.name}-{self.ingredient.name}"
 
@@ -87,6 +133,13 @@ class Favorite(models.Model):
         verbose_name="Рецепт",
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "recipe"], name="unique_favorite"
+            ),
+        ]
+
 
 class ShoppingCart(models.Model):
     user = models.ForeignKey(
@@ -101,3 +154,97 @@ class ShoppingCart(models.Model):
         related_name="shopping_cart",
         verbose_name="Рецепт",
     )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "recipe"], name="unique_shopping_cart"
+            ),
+        ]
+
+
+class FeedEntry(models.Model):
+    """Запись ленты подписок: рецепт автора, на которого подписан user."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="feed",
+        db_index=False,
+        verbose_name="Читатель",
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Рецепт",
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Автор",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "recipe"], name="unique_feed_entry"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "author"], name="feed_user_author_idx"
+            ),
+        ]
+
+
+class RecipeScore(models.Model):
+    """Популярность рецепта с экспоненциальным затуханием.
+
+    Оценки хранятся приведёнными ко времени decayed_at (unix-время).
+    """
+
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="score",
+        verbose_name="Рецепт",
+    )
+    popular = models.FloatField("Популярность", default=0)
+    trending = models.FloatField("Популярность за неделю", default=0)
+    decayed_at = models.FloatField("Пересчитано")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-popular"], name="score_popular_idx"),
+            models.Index(fields=["-trending"], name="score_trending_idx"),
+        ]
+
+
+class ShoppingListItem(models.Model):
+    """Строка списка покупок: сумма ингредиента по рецептам корзины."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="shopping_list",
+        db_index=False,
+        verbose_name="Пользователь",
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Ингредиент",
+    )
+    total = models.IntegerField("Количество", default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "ingredient"],
+                name="unique_shopping_list_item",
+            ),
+        ]
@@ -2,5 +2,11 @@ from django.contrib import admin
 
 from .models import Subscription, User
 
-admin.site.register(User)
+
+@admin.register(User)
+class UserAdmin(admin.ModelAdmin):
+    list_display = ("username", "email", "recipes_count", "subscribers_count")
+    readonly_fields = ("recipes_count", "subscribers_count")
+
+
 admin.site.register(Subscription)
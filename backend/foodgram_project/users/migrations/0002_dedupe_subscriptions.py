@@ -0,0 +1,28 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:18
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def dedupe(apps, schema_editor):
+    Subscription = apps.get_model('users', 'Subscription')
+    duplicates = (
+        Subscription.objects.values('subscriber', 'user')
+        .annotate(keep_id=Min('id'), total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for duplicate in list(duplicates):
+        Subscription.objects.filter(
+            subscriber=duplicate['subscriber'], user=duplicate['user']
+        ).exclude(id=duplicate['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_dedupe_subscriptions'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='subscription',
+            constraint=models.UniqueConstraint(fields=('subscriber', 'user'), name='unique_subscription'),
+        ),
+    ]
@@ -7,7 +7,38 @@ ADMIN = "admin"
 CHOICES = ((USER, "user"), (ADMIN, "admin"))
 
 
-class User(AbstractUser):
+class CounterFieldsMixin:
+    """Не даёт save() записывать денормализованные счётчики.
+
+    Счётчики меняет только api.counters одним UPDATE с F(), поэтому
+    сохранение экземпляра, загруженного раньше, вернуло бы в них старые
+    значения. Так же исключаются поля из derived_fields, которые
+    пересчитываются вне save(). Новая строка вставляется целиком.
+    """
+
+    counter_fields = ()
+    derived_fields = ()
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None and not (
+            self._state.adding or kwargs.get("force_insert")
+        ):
+            deferred = self.get_deferred_fields()
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred
+            ]
+        if update_fields is not None:
+            update_fields = [
+                name for name in update_fields
+                if name not in self.counter_fields
+                and name not in self.derived_fields
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class User(CounterFieldsMixin, AbstractUser):
     username = models.CharField(
         max_length=150, unique=True, blank=False, null=False
     )
@@ -27,6 +58,14 @@ class User(AbstractUser):
     last_name = models.CharField(
         "Фамилия пользователя", max_length=150, null=False
     )
+    recipes_count = models.PositiveIntegerField(
+        "Рецептов", default=0, editable=False
+    )
+    subscribers_count = models.PositiveIntegerField(
+        "Подписчиков", default=0, editable=False
+    )
+
+    counter_fields = ("recipes_count", "subscribers_count")
 
     class Meta:
         verbose_name = "Пользователь"
@@ -48,3 +87,10 @@ class Subscription(models.Model):
     user = models.ForeignKey(
         User, related_name="subscribing_to", on_delete=models.CASCADE
     )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["subscriber", "user"], name="unique_subscription"
+            ),
+        ]